@@ -1,7 +1,11 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
 
-from .models import CustomUser
+from .models import (
+    CustomUser, ReportJob, Workspace, WorkspaceImage, WorkspaceJob, WorkspacePoolSlot, WorkspacePortLease,
+    WorkspaceSnapshot, WorkspaceUsageSample,
+)
+from .workspace_jobs import cohort_students, enqueue_workspace_job
 
 
 @admin.register(CustomUser)
@@ -13,3 +17,79 @@ class CustomUserAdmin(UserAdmin):
     fieldsets = UserAdmin.fieldsets + (
         ("Custom Fields", {"fields": ("role", "name", "track", "profile_image", "assigned_trainer")}),
     )
+    actions = ["provision_workspaces"]
+
+    @admin.action(description="Provision workspaces (selected students, or the students of selected trainers)")
+    def provision_workspaces(self, request, queryset):
+        students = {user.pk: user for user in queryset.filter(role="student")}
+        for trainer in queryset.filter(role="trainer"):
+            students.update((student.pk, student) for student in cohort_students(trainer=trainer))
+
+        # Jobs run on the shared background pool, which bounds concurrency
+        for student in students.values():
+            enqueue_workspace_job(student)
+        self.message_user(
+            request,
+            f"Queued workspace provisioning for {len(students)} student(s); progress is under Workspace jobs.",
+            messages.SUCCESS,
+        )
+
+
+@admin.register(Workspace)
+class WorkspaceAdmin(admin.ModelAdmin):
+    list_display = ["container_name", "user", "host", "state", "image_digest", "mem_limit", "nano_cpus", "last_activity_at", "suspended_at"]
+    list_filter = ["host", "state", "image_digest"]
+    search_fields = ["container_name", "user__email"]
+
+
+@admin.register(WorkspaceJob)
+class WorkspaceJobAdmin(admin.ModelAdmin):
+    list_display = ["id", "user", "status", "source", "port", "duration_ms", "created_at", "finished_at"]
+    list_filter = ["status", "source"]
+    search_fields = ["user__email"]
+    readonly_fields = ["created_at", "updated_at", "finished_at"]
+
+
+@admin.register(WorkspacePoolSlot)
+class WorkspacePoolSlotAdmin(admin.ModelAdmin):
+    list_display = ["name", "status", "port", "user", "created_at", "claimed_at"]
+    list_filter = ["status"]
+    search_fields = ["name", "user__email"]
+
+
+@admin.register(WorkspacePortLease)
+class WorkspacePortLeaseAdmin(admin.ModelAdmin):
+    list_display = ["port", "state", "container_name", "user", "leased_at"]
+    list_filter = ["state"]
+    search_fields = ["container_name", "user__email"]
+
+
+@admin.register(WorkspaceImage)
+class WorkspaceImageAdmin(admin.ModelAdmin):
+    list_display = ["digest", "reference", "status", "activated_at", "created_at"]
+    list_filter = ["status"]
+    readonly_fields = ["created_at"]
+
+
+@admin.register(WorkspaceSnapshot)
+class WorkspaceSnapshotAdmin(admin.ModelAdmin):
+    list_display = ["user", "kind", "file_count", "changed_count", "size_bytes", "created_at"]
+    list_filter = ["kind"]
+    search_fields = ["user__email"]
+    readonly_fields = ["created_at"]
+
+
+@admin.register(WorkspaceUsageSample)
+class WorkspaceUsageSampleAdmin(admin.ModelAdmin):
+    list_display = ["user", "host", "sampled_at", "cpu_percent", "memory_bytes", "pids"]
+    list_filter = ["host"]
+    search_fields = ["user__email"]
+    date_hierarchy = "sampled_at"
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ["id", "report_type", "format", "status", "rows_written", "rows_total", "requested_by", "created_at", "finished_at"]
+    list_filter = ["report_type", "format", "status"]
+    search_fields = ["params_hash", "requested_by__email"]
+    readonly_fields = ["params_hash", "created_at", "updated_at", "started_at", "finished_at"]
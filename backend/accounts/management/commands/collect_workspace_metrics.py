@@ -0,0 +1,33 @@
+"""
+Django management command to sample resource usage of running workspaces
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.workspace_metrics import collect_workspace_usage, prune_usage_samples
+
+
+class Command(BaseCommand):
+    help = 'Record CPU, memory and I/O usage of every running student workspace'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            metavar='SECONDS',
+            help='Keep running and sample every SECONDS (default: run once)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            sampled = collect_workspace_usage()
+            pruned = prune_usage_samples()
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ Sampled {sampled} workspace(s) in {time.monotonic() - started:.1f}s; pruned {pruned} old sample(s)"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(max(options['loop'] - (time.monotonic() - started), 0))
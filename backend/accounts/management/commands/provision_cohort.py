@@ -0,0 +1,67 @@
+"""
+Django management command to provision workspaces for a whole cohort ahead of time
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser
+from accounts.workspace_jobs import cohort_students, provision_cohort
+
+
+class Command(BaseCommand):
+    help = "Provision workspaces for a trainer's students and/or a track before the batch starts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trainer',
+            metavar='EMAIL',
+            help='Provision workspaces for the students assigned to this trainer',
+        )
+        parser.add_argument(
+            '--track',
+            help='Provision workspaces for the students on this track (e.g. DP, FSD)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help=f'Workspaces provisioned at once (default: {settings.WORKSPACE_JOB_WORKERS})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the students without provisioning anything',
+        )
+
+    def handle(self, *args, **options):
+        if not options['trainer'] and not options['track']:
+            raise CommandError('Give --trainer and/or --track')
+
+        trainer = None
+        if options['trainer']:
+            try:
+                trainer = CustomUser.objects.get(email=options['trainer'], role='trainer')
+            except CustomUser.DoesNotExist:
+                raise CommandError(f"No trainer with email {options['trainer']}")
+
+        students = list(cohort_students(trainer=trainer, track=options['track']))
+        if options['dry_run']:
+            for student in students:
+                self.stdout.write(f"  {student.email}")
+            self.stdout.write(self.style.SUCCESS(f"✓ Would provision {len(students)} workspace(s)"))
+            return
+
+        jobs = provision_cohort(students, concurrency=options['concurrency'])
+        failed = 0
+        for student, job in zip(students, jobs):
+            if job.status == 'failed':
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"  {student.email}: failed - {job.error.get('error', '')}"))
+            else:
+                self.stdout.write(
+                    f"  {student.email}: {job.status}"
+                    + (f" ({job.source}, {job.duration_ms} ms)" if job.duration_ms is not None else "")
+                )
+
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f"✓ Provisioned {len(jobs) - failed} of {len(jobs)} workspace(s), {failed} failed"))
@@ -0,0 +1,75 @@
+"""
+Django management command to suspend idle student workspaces
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.workspace_jobs import prune_workspace_jobs
+from accounts.workspace_lifecycle import reap_idle_workspaces
+
+
+class Command(BaseCommand):
+    help = 'Stop or pause workspace containers idle for longer than WORKSPACE_IDLE_TIMEOUT_MINUTES'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            default=None,
+            metavar='MINUTES',
+            help=f'Idle threshold in minutes (default: {settings.WORKSPACE_IDLE_TIMEOUT_MINUTES})',
+        )
+        parser.add_argument(
+            '--action',
+            choices=['stop', 'pause'],
+            default=None,
+            help=f'How to suspend idle workspaces (default: {settings.WORKSPACE_IDLE_ACTION})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report idle workspaces without suspending them',
+        )
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            metavar='SECONDS',
+            help='Keep running and check every SECONDS (default: run once)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            report = reap_idle_workspaces(
+                timeout_minutes=options['timeout'],
+                action=options['action'],
+                dry_run=options['dry_run'],
+            )
+            for item in report['suspended']:
+                self.stdout.write(
+                    f"  {item['container']}: idle since {item['last_activity']}, "
+                    f"{item['memory_bytes'] / (1024 * 1024):.1f} MB"
+                )
+
+            if report['unreachable']:
+                self.stdout.write(self.style.WARNING(
+                    f"Skipped {len(report['unreachable'])} workspace(s) whose heartbeat could not be read: "
+                    f"{', '.join(report['unreachable'])}"
+                ))
+
+            verb = {'stop': 'Stopped', 'pause': 'Paused'}[report['action']]
+            if report['dry_run']:
+                verb = f"Would {report['action']}"
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {verb} {len(report['suspended'])} of {report['checked']} running workspace(s); "
+                f"reclaimed {report['reclaimed_bytes'] / (1024 * 1024):.1f} MB"
+            ))
+            if not report['dry_run']:
+                pruned = prune_workspace_jobs()
+                if pruned:
+                    self.stdout.write(f"Pruned {pruned} finished workspace job(s)")
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
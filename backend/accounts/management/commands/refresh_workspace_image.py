@@ -0,0 +1,63 @@
+"""
+Django management command to pre-pull and pin the workspace image
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.workspace_images import image_usage, refresh_workspace_image, rollback_workspace_image
+from accounts.workspace_service import WorkspaceError, get_docker_client
+
+
+class Command(BaseCommand):
+    help = 'Pull WORKSPACE_IMAGE on every Docker host and pin it for new workspaces (or roll back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rollback',
+            action='store_true',
+            help='Make the previous image current again instead of pulling',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Pin the pulled image even if it was rolled back from',
+        )
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            metavar='SECONDS',
+            help='Keep running and pull every SECONDS (default: run once)',
+        )
+
+    def handle(self, *args, **options):
+        if get_docker_client() is None:
+            self.stdout.write(self.style.WARNING('Docker not available, workspace image not refreshed'))
+            return
+
+        if options['rollback']:
+            try:
+                image = rollback_workspace_image()
+            except WorkspaceError as e:
+                raise CommandError(e.error)
+            self.stdout.write(self.style.SUCCESS(f"✓ Rolled back to {image.digest}"))
+            return
+
+        while True:
+            try:
+                image, changed = refresh_workspace_image(force=options['force'])
+            except WorkspaceError as e:
+                raise CommandError(f"{e.error}. {e.details}")
+            if changed:
+                self.stdout.write(self.style.SUCCESS(f"✓ Pinned {image.reference} as {image.digest}"))
+            else:
+                self.stdout.write(f"{image.reference} unchanged ({image.digest})")
+            for entry in image_usage()['images']:
+                held = " (held)" if entry['held'] else ""
+                self.stdout.write(
+                    f"  {entry['status']:<8} {entry['digest']}: {entry['workspaces']} workspace(s){held}"
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,39 @@
+"""
+Django management command to keep the warm workspace pool at its target size
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.workspace_pool import pool_metrics, replenish_pool
+
+
+class Command(BaseCommand):
+    help = 'Start pre-warmed code-server containers until the pool reaches WORKSPACE_POOL_SIZE'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            metavar='SECONDS',
+            help='Keep running and replenish every SECONDS (default: run once)',
+        )
+
+    def handle(self, *args, **options):
+        if settings.WORKSPACE_POOL_SIZE <= 0:
+            self.stdout.write(self.style.WARNING('WORKSPACE_POOL_SIZE is 0, pool disabled'))
+            return
+
+        while True:
+            created = replenish_pool()
+            metrics = pool_metrics()
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ Started {created} container(s); "
+                f"{metrics['available']} available, {metrics['warming']} warming, "
+                f"hit rate {metrics['hit_rate']}"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
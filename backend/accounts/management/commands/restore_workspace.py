@@ -0,0 +1,45 @@
+"""
+Django management command to restore a workspace volume from its snapshots
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser, WorkspaceSnapshot
+from accounts.workspace_service import WorkspaceError
+from accounts.workspace_snapshots import restore_workspace
+
+
+class Command(BaseCommand):
+    help = "Restore a student's workspace volume from its latest (or a given) snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='Student whose workspace to restore')
+        parser.add_argument(
+            '--snapshot',
+            type=int,
+            metavar='ID',
+            help='Restore this snapshot instead of the latest',
+        )
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Overwrite the existing volume (stop the workspace first)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            student = CustomUser.objects.get(email=options['email'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+
+        snapshot = None
+        if options['snapshot']:
+            try:
+                snapshot = WorkspaceSnapshot.objects.get(pk=options['snapshot'], user=student)
+            except WorkspaceSnapshot.DoesNotExist:
+                raise CommandError(f"No snapshot {options['snapshot']} for {student.email}")
+
+        try:
+            snapshot = restore_workspace(student, snapshot=snapshot, replace=options['replace'])
+        except WorkspaceError as e:
+            raise CommandError(f"{e.error}. {e.message}" if e.message else e.error)
+        self.stdout.write(self.style.SUCCESS(f"✓ Restored {student.email} from snapshot {snapshot.id}"))
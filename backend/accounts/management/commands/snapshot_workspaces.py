@@ -0,0 +1,61 @@
+"""
+Django management command to snapshot (and optionally archive) workspace volumes
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser, WorkspaceSnapshot
+from accounts.workspace_service import WorkspaceError
+from accounts.workspace_snapshots import archive_workspace, snapshot_workspace
+
+
+class Command(BaseCommand):
+    help = 'Snapshot workspace volumes to compressed archives, incrementally where possible'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'emails',
+            nargs='*',
+            metavar='EMAIL',
+            help='Students whose workspaces to snapshot',
+        )
+        parser.add_argument(
+            '--track',
+            help='Snapshot every student on this track with a workspace (e.g. DP, FSD)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Take a full snapshot even if an incremental one would do',
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Remove the container and volume after snapshotting; the next launch restores them',
+        )
+
+    def handle(self, *args, **options):
+        if not options['emails'] and not options['track']:
+            raise CommandError('Give student emails and/or --track')
+
+        students = CustomUser.objects.filter(role='student', workspace__isnull=False)
+        if options['emails']:
+            students = students.filter(email__in=options['emails'])
+        if options['track']:
+            students = students.filter(track=options['track'])
+
+        take = archive_workspace if options['archive'] else snapshot_workspace
+        failed = 0
+        for student in students.order_by('email'):
+            try:
+                snapshot = take(student, full=options['full'])
+            except WorkspaceError as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"  {student.email}: failed - {e.error}"))
+                continue
+            self.stdout.write(
+                f"  {student.email}: {snapshot.kind}, {snapshot.changed_count} of {snapshot.file_count} "
+                f"entries, {snapshot.size_bytes} bytes"
+            )
+
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f"✓ {WorkspaceSnapshot.objects.count()} snapshot(s) stored, {failed} failed"))
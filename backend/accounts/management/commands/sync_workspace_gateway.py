@@ -0,0 +1,40 @@
+"""
+Django management command to rewrite the workspace gateway map and reload nginx
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.workspace_gateway import gateway_enabled, sync_gateway
+
+
+class Command(BaseCommand):
+    help = 'Write the nginx map routing /workspaces/<user id>/ to containers and reload nginx if it changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rewrite the map and reload nginx even if nothing changed',
+        )
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            metavar='SECONDS',
+            help='Keep running and sync every SECONDS (default: run once)',
+        )
+
+    def handle(self, *args, **options):
+        if not gateway_enabled():
+            self.stdout.write(self.style.WARNING('WORKSPACE_GATEWAY_URL is not set, gateway disabled'))
+            return
+
+        while True:
+            if sync_gateway(force=options['force']):
+                self.stdout.write(self.style.SUCCESS('✓ Gateway map updated, nginx reloaded'))
+            else:
+                self.stdout.write('Gateway map unchanged')
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:48
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_alter_customuser_assigned_trainer_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkspaceJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('pulling', 'Pulling image'), ('creating', 'Creating container'), ('starting', 'Starting container'), ('running', 'Running'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('url', models.CharField(blank=True, max_length=255)),
+                ('port', models.CharField(blank=True, max_length=10)),
+                ('error', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workspace_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'status'], name='accounts_wo_user_id_f23318_idx')],
+            },
+        ),
+    ]
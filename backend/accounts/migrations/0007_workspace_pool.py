@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_workspacejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkspacePoolSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('container_id', models.CharField(blank=True, max_length=64)),
+                ('volume_path', models.CharField(max_length=255)),
+                ('port', models.CharField(blank=True, max_length=10)),
+                ('status', models.CharField(choices=[('warming', 'Warming'), ('available', 'Available'), ('claimed', 'Claimed')], default='warming', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='workspacejob',
+            name='duration_ms',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='workspacejob',
+            name='source',
+            field=models.CharField(blank=True, choices=[('existing', 'Existing container'), ('pool', 'Warm pool'), ('cold', 'Cold start')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='workspacejob',
+            index=models.Index(fields=['source', 'created_at'], name='accounts_wo_source_2a77b7_idx'),
+        ),
+        migrations.AddField(
+            model_name='workspacepoolslot',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='workspace_pool_slots', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='workspacepoolslot',
+            index=models.Index(fields=['status', 'created_at'], name='accounts_wo_status_d5399e_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_workspace'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workspace',
+            name='mem_limit',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='workspace',
+            name='nano_cpus',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='workspace',
+            name='pids_limit',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='workspace',
+            name='state',
+            field=models.CharField(choices=[('starting', 'Starting'), ('running', 'Running'), ('paused', 'Paused'), ('stopped', 'Stopped')], default='running', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='workspacejob',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('waiting', 'Waiting for capacity'), ('pulling', 'Pulling image'), ('creating', 'Creating container'), ('starting', 'Starting container'), ('running', 'Running'), ('failed', 'Failed')], default='queued', max_length=20),
+        ),
+    ]
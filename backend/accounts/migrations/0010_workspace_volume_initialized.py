@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_workspace_quota'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workspace',
+            name='volume_initialized_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_workspace_volume_initialized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkspacePortLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('port', models.PositiveIntegerField(unique=True)),
+                ('container_name', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('container_id', models.CharField(blank=True, max_length=64)),
+                ('state', models.CharField(choices=[('leased', 'Leased'), ('released', 'Released')], default='leased', max_length=20)),
+                ('leased_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='workspace_port_lease', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['port'],
+                'indexes': [models.Index(fields=['state', 'port'], name='accounts_wo_state_990468_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_workspace_port_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workspace',
+            name='host',
+            field=models.CharField(default='local', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='workspace',
+            index=models.Index(fields=['host', 'state'], name='accounts_wo_host_7d6c48_idx'),
+        ),
+    ]
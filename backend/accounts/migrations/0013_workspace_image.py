@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_workspace_host'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkspaceImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference', models.CharField(max_length=255)),
+                ('digest', models.CharField(max_length=100, unique=True)),
+                ('status', models.CharField(choices=[('current', 'Current'), ('previous', 'Previous'), ('retired', 'Retired')], db_index=True, default='current', max_length=20)),
+                ('activated_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-activated_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='workspace',
+            name='image_digest',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='workspacepoolslot',
+            name='image_digest',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
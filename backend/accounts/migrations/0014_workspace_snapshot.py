@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_workspace_image'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workspacejob',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('waiting', 'Waiting for capacity'), ('restoring', 'Restoring snapshot'), ('pulling', 'Pulling image'), ('creating', 'Creating container'), ('starting', 'Starting container'), ('running', 'Running'), ('failed', 'Failed')], default='queued', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='WorkspaceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental')], max_length=20)),
+                ('archive_path', models.CharField(max_length=500)),
+                ('manifest_path', models.CharField(max_length=500)),
+                ('file_count', models.PositiveIntegerField(default=0)),
+                ('changed_count', models.PositiveIntegerField(default=0)),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('base', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='incrementals', to='accounts.workspacesnapshot')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workspace_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='accounts_wo_user_id_6def86_idx')],
+            },
+        ),
+    ]
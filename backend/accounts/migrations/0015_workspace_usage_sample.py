@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_workspace_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkspaceUsageSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('host', models.CharField(default='local', max_length=100)),
+                ('sampled_at', models.DateTimeField()),
+                ('cpu_percent', models.FloatField(default=0)),
+                ('memory_bytes', models.BigIntegerField(default=0)),
+                ('memory_limit', models.BigIntegerField(default=0)),
+                ('pids', models.PositiveIntegerField(default=0)),
+                ('net_rx_bytes', models.BigIntegerField(default=0)),
+                ('net_tx_bytes', models.BigIntegerField(default=0)),
+                ('block_read_bytes', models.BigIntegerField(default=0)),
+                ('block_write_bytes', models.BigIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workspace_usage_samples', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['sampled_at'],
+                'indexes': [models.Index(fields=['user', 'sampled_at'], name='accounts_wo_user_id_ab9a7d_idx'), models.Index(fields=['sampled_at'], name='accounts_wo_sampled_3b841d_idx')],
+            },
+        ),
+    ]
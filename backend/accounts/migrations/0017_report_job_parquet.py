@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_report_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='format',
+            field=models.CharField(choices=[('csv', 'CSV'), ('json', 'JSON'), ('jsonl', 'JSON Lines'), ('parquet', 'Parquet')], default='csv', max_length=10),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_report_job_parquet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workspaceimage',
+            name='held',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,3 +1,6 @@
+import uuid
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 
@@ -76,4 +79,324 @@ class CustomUser(AbstractUser):
         """Check if trainer can accept more students (max 20)"""
         if self.role == 'trainer':
             return self.student_count < 20
-        return False
\ No newline at end of file
+        return False
+
+
+class Workspace(models.Model):
+    """Lifecycle state of a student's code-server container"""
+    STATE_CHOICES = [
+        ("starting", "Starting"),
+        ("running", "Running"),
+        ("paused", "Paused"),
+        ("stopped", "Stopped"),
+    ]
+    # States whose resource limits count against host capacity
+    COMMITTED_STATES = ["starting", "running", "paused"]
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="workspace"
+    )
+    container_name = models.CharField(max_length=100, unique=True)
+    # Docker host the container and its volume live on; workspaces never move
+    host = models.CharField(max_length=100, default="local")
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default="running")
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    suspended_at = models.DateTimeField(null=True, blank=True)
+    # Limits applied at creation, used by host admission control
+    mem_limit = models.BigIntegerField(default=0)  # Bytes
+    nano_cpus = models.BigIntegerField(default=0)
+    pids_limit = models.IntegerField(default=0)
+    # Image id the container was created from
+    image_digest = models.CharField(max_length=100, blank=True, db_index=True)
+    # Set once the bind-mounted directory has been created and chowned for the coder user
+    volume_initialized_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["state", "last_activity_at"]),
+            models.Index(fields=["host", "state"]),
+        ]
+
+    def __str__(self):
+        return f"{self.container_name} ({self.state})"
+
+
+class WorkspaceJob(models.Model):
+    """Background workspace provisioning request and its progress"""
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("waiting", "Waiting for capacity"),
+        ("restoring", "Restoring snapshot"),
+        ("pulling", "Pulling image"),
+        ("creating", "Creating container"),
+        ("starting", "Starting container"),
+        ("running", "Running"),
+        ("failed", "Failed"),
+    ]
+    SOURCE_CHOICES = [
+        ("existing", "Existing container"),
+        ("pool", "Warm pool"),
+        ("cold", "Cold start"),
+    ]
+    ACTIVE_STATUSES = ["queued", "waiting", "restoring", "pulling", "creating", "starting"]
+    FINISHED_STATUSES = ["running", "failed"]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="workspace_jobs"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    url = models.CharField(max_length=255, blank=True)
+    port = models.CharField(max_length=10, blank=True)
+    error = models.JSONField(default=dict, blank=True)
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)  # Provisioning time once picked up
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "status"]),
+            models.Index(fields=["source", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.status}"
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+
+class WorkspacePoolSlot(models.Model):
+    """Pre-started code-server container waiting to be handed to a student"""
+    STATUS_CHOICES = [
+        ("warming", "Warming"),
+        ("available", "Available"),
+        ("claimed", "Claimed"),
+    ]
+
+    name = models.CharField(max_length=100, unique=True)
+    container_id = models.CharField(max_length=64, blank=True)
+    image_digest = models.CharField(max_length=100, blank=True)
+    volume_path = models.CharField(max_length=255)
+    port = models.CharField(max_length=10, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="warming")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="workspace_pool_slots"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class WorkspacePortLease(models.Model):
+    """Host port published by a workspace or pool container"""
+    STATE_CHOICES = [
+        ("leased", "Leased"),
+        ("released", "Released"),
+    ]
+
+    port = models.PositiveIntegerField(unique=True)
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="workspace_port_lease"
+    )
+    container_name = models.CharField(max_length=100, blank=True, db_index=True)
+    container_id = models.CharField(max_length=64, blank=True)
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default="leased")
+    leased_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["port"]
+        indexes = [
+            models.Index(fields=["state", "port"]),
+        ]
+
+    def __str__(self):
+        return f"{self.port} ({self.container_name or self.state})"
+
+
+class WorkspaceImage(models.Model):
+    """A pulled workspace image, pinned by image id"""
+    STATUS_CHOICES = [
+        ("current", "Current"),
+        ("previous", "Previous"),
+        ("retired", "Retired"),
+    ]
+
+    reference = models.CharField(max_length=255)  # Tag it was pulled as
+    digest = models.CharField(max_length=100, unique=True)  # Image id (sha256:...)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="current", db_index=True)
+    activated_at = models.DateTimeField(null=True, blank=True)
+    # Rolled back from; refreshes do not pin it again until forced
+    held = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-activated_at"]
+
+    def __str__(self):
+        return f"{self.reference} {self.digest[:19]} ({self.status})"
+
+
+class WorkspaceSnapshot(models.Model):
+    """Compressed archive of a student's workspace volume"""
+    KIND_CHOICES = [
+        ("full", "Full"),
+        ("incremental", "Incremental"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="workspace_snapshots"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Snapshot this one is applied on top of (incremental snapshots only)
+    base = models.ForeignKey("self", on_delete=models.PROTECT, null=True, blank=True, related_name="incrementals")
+    archive_path = models.CharField(max_length=500)
+    manifest_path = models.CharField(max_length=500)
+    file_count = models.PositiveIntegerField(default=0)  # Files in the volume at snapshot time
+    changed_count = models.PositiveIntegerField(default=0)  # Files stored in this archive
+    size_bytes = models.BigIntegerField(default=0)  # Archive size on disk
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} {self.kind} snapshot ({self.created_at})"
+
+
+class WorkspaceUsageSample(models.Model):
+    """One resource usage reading of a student's workspace container"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="workspace_usage_samples"
+    )
+    host = models.CharField(max_length=100, default="local")
+    sampled_at = models.DateTimeField()
+    cpu_percent = models.FloatField(default=0)  # 100 = one full CPU
+    memory_bytes = models.BigIntegerField(default=0)  # Excluding reclaimable page cache
+    memory_limit = models.BigIntegerField(default=0)
+    pids = models.PositiveIntegerField(default=0)
+    # Counters since the container started
+    net_rx_bytes = models.BigIntegerField(default=0)
+    net_tx_bytes = models.BigIntegerField(default=0)
+    block_read_bytes = models.BigIntegerField(default=0)
+    block_write_bytes = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["sampled_at"]
+        indexes = [
+            models.Index(fields=["user", "sampled_at"]),
+            models.Index(fields=["sampled_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} at {self.sampled_at}: {self.cpu_percent:.1f}% CPU, {self.memory_bytes} bytes"
+
+
+class ReportJob(models.Model):
+    """Background report request, its progress and the file it produced"""
+    REPORT_TYPE_CHOICES = [
+        ("user", "Users"),
+        ("payment", "Payments"),
+        ("batch", "Batch progress"),
+        ("analytics", "Analytics"),
+    ]
+    FORMAT_CHOICES = [
+        ("csv", "CSV"),
+        ("json", "JSON"),
+        ("jsonl", "JSON Lines"),
+        ("parquet", "Parquet"),
+    ]
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+    ACTIVE_STATUSES = ["queued", "running"]
+    FINISHED_STATUSES = ["done", "failed"]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default="csv")
+    params = models.JSONField(default=dict, blank=True)
+    params_hash = models.CharField(max_length=64)  # Identifies identical requests
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    rows_total = models.PositiveIntegerField(null=True, blank=True)
+    rows_written = models.PositiveIntegerField(default=0)
+    file_path = models.CharField(max_length=500, blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="report_jobs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["params_hash", "status", "finished_at"]),
+        ]
+        constraints = [
+            # At most one in-flight job per distinct request
+            models.UniqueConstraint(
+                fields=["params_hash"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="unique_active_report_job",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.report_type} report ({self.format}) - {self.status}"
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    @property
+    def progress(self):
+        """Percentage of rows written, once the row count is known"""
+        if self.status == "done":
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(self.rows_written * 100 // self.rows_total, 99)
@@ -0,0 +1,25 @@
+from rest_framework.permissions import BasePermission
+
+
+def is_platform_admin(user):
+    return bool(
+        user and user.is_authenticated
+        and (user.is_staff or user.role in ("admin", "superadmin"))
+    )
+
+
+class IsPlatformAdmin(BasePermission):
+    """Allow admins, superadmins and staff users"""
+    message = "Only admins can access this endpoint"
+
+    def has_permission(self, request, view):
+        return is_platform_admin(request.user)
+
+
+class IsTrainerOrPlatformAdmin(BasePermission):
+    """Allow trainers as well as admins"""
+    message = "Only trainers and admins can access this endpoint"
+
+    def has_permission(self, request, view):
+        user = request.user
+        return is_platform_admin(user) or bool(user and user.is_authenticated and user.role == "trainer")
@@ -0,0 +1,250 @@
+"""
+Background report generation.
+
+Requests record a ReportJob and hand it to a per-process thread pool, so a
+large export never holds a gunicorn worker. A job is identified by a hash of
+its report type, format and parameters: an identical request made while one
+is queued or running gets that job, and one made within REPORT_CACHE_SECONDS
+of a finished job gets its file from APROVOVA_*_REPORTS_DIR instead of a new
+report. Rows are streamed to the file, and the job's row count is updated
+every ReportGenerator.chunk_size rows so clients can show progress. The pool
+and eager mode come from core.jobs.
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core import report_utils
+from core.jobs import JobRunner, set_status
+from core.report_utils import ReportGenerator
+
+from .models import CustomUser, ReportJob
+
+logger = logging.getLogger(__name__)
+
+def _date(value, name):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+    return parsed
+
+
+def user_rows(role=None, track=None):
+    """One row per user"""
+    users = CustomUser.objects.all()
+    if role:
+        users = users.filter(role=role)
+    if track:
+        users = users.filter(track=track)
+    return users.order_by("id").values(
+        "id", "email", "username", "name", "role", "track", "assigned_trainer__email", "is_active", "created_at",
+    )
+
+
+def payment_rows(status=None, since=None, until=None):
+    """One row per payment, optionally within [since, until]"""
+    from payments.models import Payment
+
+    payments = Payment.objects.all()
+    if status:
+        payments = payments.filter(status=status)
+    if since:
+        payments = payments.filter(created_at__date__gte=_date(since, "since"))
+    if until:
+        payments = payments.filter(created_at__date__lte=_date(until, "until"))
+    return payments.order_by("id").values(
+        "id", "user__email", "stripe_payment_intent", "amount", "currency", "status", "created_at", "updated_at",
+    )
+
+
+def batch_rows(trainer=None, track=None):
+    """Progress of every student in a cohort (a trainer's students and/or a track)"""
+    from curriculum.progress import annotate_student_progress
+    from .workspace_jobs import cohort_students
+
+    if trainer:
+        try:
+            trainer = CustomUser.objects.get(email=trainer, role="trainer")
+        except CustomUser.DoesNotExist:
+            raise ValueError(f"Trainer not found: {trainer}") from None
+    return annotate_student_progress(cohort_students(trainer=trainer or None, track=track)).values(
+        "id", "email", "name", "track", "assigned_trainer__email", "completed_steps", "total_steps",
+        "progress_percentage", "pending_submissions", "last_activity", "activity_status",
+    )
+
+
+def analytics_rows(since=None):
+    """Per-track totals: students, completed steps, and submissions since `since`"""
+    from curriculum.models import ProjectProgressSummary, Submission
+
+    students = CustomUser.objects.filter(role="student").values("track").annotate(
+        students=Count("id"),
+        active_students=Count("id", filter=Q(is_active=True)),
+    ).order_by("track")
+    steps = dict(
+        ProjectProgressSummary.objects.values("project__track__code").annotate(
+            done=Sum("completed_steps"),
+        ).order_by().values_list("project__track__code", "done")
+    )
+    submissions = Submission.objects.all()
+    if since:
+        submissions = submissions.filter(submitted_at__date__gte=_date(since, "since"))
+    reviews = {
+        row["student__track"]: row
+        for row in submissions.values("student__track").annotate(
+            submissions=Count("id"),
+            pending=Count("id", filter=Q(status="PENDING")),
+            approved=Count("id", filter=Q(status="APPROVED")),
+            rejected=Count("id", filter=Q(status="REJECTED")),
+        ).order_by()
+    }
+    return [
+        {
+            "track": row["track"],
+            "students": row["students"],
+            "active_students": row["active_students"],
+            "completed_steps": steps.get(row["track"]) or 0,
+            **{
+                key: reviews.get(row["track"], {}).get(key, 0)
+                for key in ("submissions", "pending", "approved", "rejected")
+            },
+        }
+        for row in students
+    ]
+
+
+# Report type -> (row source, parameters it accepts)
+REPORT_SOURCES = {
+    "user": (user_rows, ("role", "track")),
+    "payment": (payment_rows, ("status", "since", "until")),
+    "batch": (batch_rows, ("trainer", "track")),
+    "analytics": (analytics_rows, ("since",)),
+}
+
+
+def normalize_params(report_type, params):
+    """
+    Parameters as the job stores and hashes them: strings, without empty values
+
+    Raises:
+        ValueError: For an unknown report type or parameter
+    """
+    if report_type not in REPORT_SOURCES:
+        raise ValueError(f"Unknown report type: {report_type}")
+    _, accepted = REPORT_SOURCES[report_type]
+    unknown = sorted(set(params or {}) - set(accepted))
+    if unknown:
+        raise ValueError(f"Unknown parameters for {report_type} report: {', '.join(unknown)}")
+    return {name: str(value) for name, value in (params or {}).items() if value not in (None, "")}
+
+
+def params_hash(report_type, format, params):
+    key = json.dumps([report_type, format, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _record_progress(job, written):
+    job.rows_written = written
+    ReportJob.objects.filter(pk=job.pk).update(rows_written=written, updated_at=timezone.now())
+
+
+def build_report(job_id):
+    """Build the report for a queued job, recording its progress"""
+    job = ReportJob.objects.get(pk=job_id)
+    if job.status != "queued":
+        return
+    set_status(job, "running", started_at=timezone.now())
+    try:
+        source, _ = REPORT_SOURCES[job.report_type]
+        rows = source(**job.params)
+        set_status(job, "running", rows_total=rows.count() if isinstance(rows, QuerySet) else len(rows))
+        stamp = timezone.now().strftime("%Y%m%d_%H%M%S")
+        path = ReportGenerator(job.report_type).stream(
+            rows,
+            job.format,
+            filename=f"{job.report_type}_report_{stamp}_{job.pk.hex[:8]}.{job.format}",
+            progress=lambda written: _record_progress(job, written),
+        )
+    except ValueError as e:
+        # Bad parameters, or nothing to report
+        set_status(job, "failed", error=str(e))
+    except Exception as e:
+        logger.exception(f"Report job {job_id} failed")
+        set_status(job, "failed", error=str(e))
+    else:
+        set_status(job, "done", file_path=path)
+
+
+runner = JobRunner(
+    "report-job",
+    build_report,
+    workers_setting="REPORT_JOB_WORKERS",
+    eager_setting="REPORT_JOBS_EAGER",
+    stale_setting="REPORT_JOB_STALE_SECONDS",
+)
+
+
+def cached_report(jobs):
+    """The newest finished job among `jobs` still within REPORT_CACHE_SECONDS whose file exists"""
+    fresh_after = timezone.now() - timedelta(seconds=settings.REPORT_CACHE_SECONDS)
+    for job in jobs.filter(status="done", finished_at__gte=fresh_after).order_by("-finished_at")[:5]:
+        if job.file_path and os.path.exists(job.file_path):
+            return job
+    return None
+
+
+def enqueue_report(report_type, format="csv", params=None, requested_by=None, executor=None):
+    """
+    Return the in-flight or recently finished job for an identical request,
+    or queue a new one
+
+    Jobs that stopped updating (lost to a worker restart) are failed and
+    replaced rather than reused.
+
+    Args:
+        report_type: Key of REPORT_SOURCES
+        format: csv, json, jsonl or parquet
+        params: Filters accepted by the report's row source
+        requested_by: User asking for the report
+        executor: Pool to run the job on (defaults to the shared report pool)
+
+    Raises:
+        ValueError: For an unknown report type, format or parameter
+    """
+    if format not in dict(ReportJob.FORMAT_CHOICES):
+        raise ValueError(f"Unsupported format: {format}")
+    if format == "parquet" and report_utils.pq is None:
+        # The file would be CSV while the job says parquet
+        raise ValueError("Parquet reports need pyarrow, which is not installed")
+    params = normalize_params(report_type, params)
+    digest = params_hash(report_type, format, params)
+    jobs = ReportJob.objects.filter(params_hash=digest)
+    runner.fail_stale(jobs, "Report job timed out")
+
+    job = jobs.filter(status__in=ReportJob.ACTIVE_STATUSES).first() or cached_report(jobs)
+    if job:
+        return job
+
+    try:
+        with transaction.atomic():
+            job = ReportJob.objects.create(
+                report_type=report_type,
+                format=format,
+                params=params,
+                params_hash=digest,
+                requested_by=requested_by,
+            )
+    except IntegrityError:
+        # An identical request queued its job first
+        return jobs.filter(status__in=ReportJob.ACTIVE_STATUSES).first() or jobs.first()
+    runner.dispatch(job, executor)
+    return job
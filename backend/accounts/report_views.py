@@ -0,0 +1,68 @@
+import os
+
+from django.conf import settings
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework import status
+
+from core.jobs import poll_wait, wait_for_status
+
+from .models import ReportJob
+from .permissions import IsPlatformAdmin
+from .report_jobs import enqueue_report
+from .serializers import ReportJobSerializer, ReportRequestSerializer
+
+@api_view(["POST"])
+@permission_classes([IsPlatformAdmin])
+def request_report(request):
+    """
+    Queue a report, or reuse an identical one that is in flight or recent.
+    Returns immediately with a job to poll via report_job_status.
+    """
+    serializer = ReportRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        job = enqueue_report(requested_by=request.user, **serializer.validated_data)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = ReportJobSerializer(job).data
+    if job.status == "done":
+        return Response(data, status=status.HTTP_200_OK)
+    return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["GET"])
+@permission_classes([IsPlatformAdmin])
+def report_job_status(request, job_id):
+    """
+    Get report job status and progress.
+    Long-polls when `wait` (seconds) is given: returns as soon as the status
+    differs from `status` (defaults to the current one) or the job finishes.
+    """
+    job = get_object_or_404(ReportJob, pk=job_id)
+
+    try:
+        wait = poll_wait(request, settings.REPORT_JOB_MAX_WAIT)
+    except ValueError:
+        return Response({"error": "wait must be a number of seconds"}, status=status.HTTP_400_BAD_REQUEST)
+
+    wait_for_status(job, request.query_params.get("status", job.status), wait)
+
+    return Response(ReportJobSerializer(job).data)
+
+
+@api_view(["GET"])
+@permission_classes([IsPlatformAdmin])
+def report_job_download(request, job_id):
+    """Download the file of a finished report job"""
+    job = get_object_or_404(ReportJob, pk=job_id)
+    if job.status != "done":
+        return Response({"error": f"Report is {job.status}"}, status=status.HTTP_409_CONFLICT)
+    if not os.path.exists(job.file_path):
+        return Response({"error": "Report file no longer exists"}, status=status.HTTP_410_GONE)
+    return FileResponse(open(job.file_path, "rb"), as_attachment=True, filename=os.path.basename(job.file_path))
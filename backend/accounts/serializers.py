@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.db import models
-from .models import CustomUser
+from .models import CustomUser, ReportJob, WorkspaceJob
 from dj_rest_auth.registration.serializers import SocialLoginSerializer
 from dj_rest_auth.registration.serializers import RegisterSerializer
 import logging
@@ -23,6 +23,61 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
+class WorkspaceJobSerializer(serializers.ModelSerializer):
+    """Serializer for workspace provisioning job status"""
+    job_id = serializers.UUIDField(source="id", read_only=True)
+    url = serializers.SerializerMethodField()
+    status_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = WorkspaceJob
+        fields = ["job_id", "status", "url", "port", "error", "status_url", "created_at", "updated_at", "finished_at"]
+        read_only_fields = fields
+
+    def get_url(self, obj):
+        from .workspace_gateway import gateway_link
+        return gateway_link(obj.user_id, obj.url)
+
+    def get_status_url(self, obj):
+        from django.urls import reverse
+        if obj.pk is None:
+            # Already running: nothing to poll
+            return None
+        return reverse("workspace_job_status", kwargs={"job_id": obj.id})
+
+
+class ReportRequestSerializer(serializers.Serializer):
+    """Report to generate in the background"""
+    report_type = serializers.ChoiceField(choices=ReportJob.REPORT_TYPE_CHOICES)
+    format = serializers.ChoiceField(choices=ReportJob.FORMAT_CHOICES, default="csv")
+    params = serializers.DictField(child=serializers.CharField(allow_blank=True), required=False, default=dict)
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """Serializer for report job status"""
+    job_id = serializers.UUIDField(source="id", read_only=True)
+    status_url = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            "job_id", "report_type", "format", "params", "status", "progress", "rows_total", "rows_written",
+            "error", "status_url", "download_url", "created_at", "started_at", "finished_at",
+        ]
+        read_only_fields = fields
+
+    def get_status_url(self, obj):
+        from django.urls import reverse
+        return reverse("report_job_status", kwargs={"job_id": obj.id})
+
+    def get_download_url(self, obj):
+        from django.urls import reverse
+        if obj.status != "done":
+            return None
+        return reverse("report_job_download", kwargs={"job_id": obj.id})
+
+
 class CustomSocialLoginSerializer(SocialLoginSerializer):
     """Custom serializer to include user role in social login response"""
     
@@ -1,12 +1,33 @@
 """
 Unit tests for user authentication, signup, and email verification
 """
-from django.test import TestCase, Client
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import docker
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django.core import mail
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
-from accounts.models import CustomUser
+from accounts.models import CustomUser, ReportJob, Workspace, WorkspaceImage, WorkspaceJob, WorkspacePoolSlot
+from accounts.report_jobs import enqueue_report, normalize_params, params_hash
+from accounts.workspace_gateway import gateway_link, sync_gateway
+from accounts.workspace_metrics import collect_workspace_usage, parse_stats
+from accounts.workspace_images import image_for, image_usage, refresh_workspace_image, rollback_workspace_image
+from accounts.workspace_jobs import provision_cohort, prune_workspace_jobs
+from accounts.workspace_ports import adopt_port, allocate_port, leased_port, release_port
+from accounts.workspace_quota import resource_profile
+from accounts.workspace_scheduler import place_workspace
+from accounts.workspace_service import WorkspaceError, prepare_volume, provision_workspace, user_volume_path
+from accounts.workspace_snapshots import archive_workspace, restore_workspace, snapshot_workspace
+from accounts.workspace_state import ContainerStateCache, get_state_cache
 from allauth.account.models import EmailAddress, EmailConfirmation, EmailConfirmationHMAC
 import json
 
@@ -335,3 +356,1213 @@ class UserProfileTestCase(APITestCase):
         if 'name' in response.data:
             print(f"   Name: {response.data['name']}")
 
+    def test_profile_conditional_get(self):
+        """Test profile ETag answers 304 until the user changes"""
+        url = '/api/users/profile/'
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user.name = 'Renamed User'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Renamed User')
+
+        print(f"✅ Test Passed: Profile conditional GET")
+
+
+def mock_docker_host(testcase, memory=64 * 1024 ** 3, cpus=16):
+    """Mocked Docker client reporting a host of the given size"""
+    client = mock.MagicMock()
+    client.info.return_value = {'MemTotal': memory, 'NCPU': cpus}
+    client.containers.run.return_value.id = 'workspace-container'
+    client.images.get.return_value.id = 'sha256:workspace-image'
+    client.images.pull.return_value.id = 'sha256:workspace-image'
+    for patcher in [
+        mock.patch.dict('accounts.workspace_quota._host_info', clear=True),
+        # No event watcher in tests; the state cache stays offline unless a test seeds it
+        mock.patch('accounts.workspace_state._cache', ContainerStateCache()),
+    ]:
+        patcher.start()
+        testcase.addCleanup(patcher.stop)
+    return client
+
+
+@override_settings(WORKSPACE_JOBS_EAGER=True, WORKSPACE_BASE_PATH=tempfile.gettempdir())
+class WorkspaceJobTestCase(APITestCase):
+    """Test background workspace provisioning jobs"""
+
+    def setUp(self):
+        """Set up authenticated student and a mocked Docker client"""
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='workspace@example.com',
+            email='workspace@example.com',
+            password='TestPass123!@#',
+            role='student'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.docker = mock_docker_host(self)
+        self.docker.containers.get.side_effect = docker.errors.NotFound('missing')
+        patcher = mock.patch('accounts.workspace_service._client', self.docker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_create_workspace_runs_job(self):
+        """Test create returns a job that provisions the container"""
+        response = self.client.post('/api/users/workspace/create/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'running')
+        self.assertTrue(response.data['url'])
+        self.docker.containers.run.assert_called_once()
+
+        job = WorkspaceJob.objects.get(pk=response.data['job_id'])
+        self.assertIsNotNone(job.finished_at)
+
+        status_response = self.client.get(response.data['status_url'])
+        self.assertEqual(status_response.data['status'], 'running')
+
+        print(f"✅ Test Passed: Workspace job provisioned container")
+
+    def test_existing_running_container(self):
+        """Test an already running container is reported without recreating it"""
+        container = mock.MagicMock(status='running')
+        container.attrs = {'HostConfig': {'PortBindings': {'8080/tcp': [{'HostPort': '21000'}]}}}
+        self.docker.containers.get.side_effect = None
+        self.docker.containers.get.return_value = container
+
+        response = self.client.post('/api/users/workspace/create/')
+
+        self.assertEqual(response.data['port'], '21000')
+        self.docker.containers.run.assert_not_called()
+        # The published port is adopted as a lease, so Docker is not asked again
+        self.assertEqual(leased_port(self.user), 21000)
+
+        print(f"✅ Test Passed: Existing workspace reused")
+
+    def test_unpublished_container_gets_port_in_range(self):
+        """Test containers without a usable published port get their own lease from the range"""
+        other = CustomUser.objects.create_user(
+            username='other@example.com', email='other@example.com', password='TestPass123!@#', role='student'
+        )
+        container = mock.MagicMock(status='running')
+        # Gateway mode publishes no port
+        container.attrs = {'HostConfig': {'PortBindings': {}}}
+        self.docker.containers.get.side_effect = None
+        self.docker.containers.get.return_value = container
+
+        provision_workspace(self.user)
+        provision_workspace(other)
+
+        ports = {leased_port(self.user), leased_port(other)}
+        self.assertEqual(len(ports), 2)
+        for port in ports:
+            self.assertTrue(20000 <= port <= 29999)
+
+        # A published port outside the range, or leased to someone else, is not adopted
+        third = CustomUser.objects.create_user(
+            username='third@example.com', email='third@example.com', password='TestPass123!@#', role='student'
+        )
+        self.assertIsNone(adopt_port(third, 'workspace_third', 41000))
+        self.assertIsNone(adopt_port(third, 'workspace_third', leased_port(other)))
+        self.assertIn(leased_port(other), ports)
+
+        print(f"✅ Test Passed: Unpublished containers leased ports in range")
+
+    def test_running_workspace_not_recorded_as_job(self):
+        """Test repeated launches of a running workspace add no job rows"""
+        allocate_port(f'workspace_{self.user.id}', user=self.user)
+        cache = get_state_cache()
+        cache.seed([])
+        cache.apply({'Action': 'start', 'Actor': {'Attributes': {'name': f'workspace_{self.user.id}'}}})
+
+        for _ in range(3):
+            response = self.client.post('/api/users/workspace/create/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['status'], 'running')
+            self.assertIsNone(response.data['job_id'])
+            self.assertIsNone(response.data['status_url'])
+
+        self.assertFalse(WorkspaceJob.objects.filter(user=self.user).exists())
+        self.assertIsNotNone(Workspace.objects.get(user=self.user).last_activity_at)
+
+        print(f"✅ Test Passed: Running workspace answered without job rows")
+
+    def test_prune_finished_jobs(self):
+        """Test finished jobs past the retention period are deleted"""
+        from datetime import timedelta
+
+        old = WorkspaceJob.objects.create(user=self.user, status='running', finished_at=timezone.now() - timedelta(days=30))
+        recent = WorkspaceJob.objects.create(user=self.user, status='failed', finished_at=timezone.now())
+        active = WorkspaceJob.objects.create(user=self.user, status='queued')
+
+        self.assertEqual(prune_workspace_jobs(days=7), 1)
+        self.assertFalse(WorkspaceJob.objects.filter(pk=old.pk).exists())
+        self.assertEqual(set(WorkspaceJob.objects.values_list('pk', flat=True)), {recent.pk, active.pk})
+
+        print(f"✅ Test Passed: Old finished workspace jobs pruned")
+
+    def test_running_workspace_served_from_state_cache(self):
+        """Test a workspace the event cache knows is running skips Docker entirely"""
+        allocate_port(f'workspace_{self.user.id}', user=self.user)
+        cache = get_state_cache()
+        cache.seed([])
+        cache.apply({'Action': 'start', 'Actor': {'Attributes': {'name': 'workspace_pool_abc'}}})
+        cache.apply({
+            'Action': 'rename',
+            'Actor': {'Attributes': {'name': f'workspace_{self.user.id}', 'oldName': '/workspace_pool_abc'}},
+        })
+
+        response = self.client.post('/api/users/workspace/create/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'running')
+        self.docker.containers.get.assert_not_called()
+
+        cache.apply({'Action': 'die', 'Actor': {'Attributes': {'name': f'workspace_{self.user.id}'}}})
+        self.assertEqual(cache.get(f'workspace_{self.user.id}'), 'exited')
+        cache.reset()
+        self.assertIsNone(cache.get(f'workspace_{self.user.id}'))
+
+        print(f"✅ Test Passed: Running workspace served from state cache")
+
+    def test_missing_image_fails_job(self):
+        """Test a missing image is reported on the job"""
+        self.docker.images.get.side_effect = docker.errors.ImageNotFound('missing')
+        self.docker.images.pull.side_effect = docker.errors.APIError('pull failed')
+
+        response = self.client.post('/api/users/workspace/create/')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'failed')
+        self.assertEqual(response.data['error']['error'], 'Code-server image not found')
+
+        print(f"✅ Test Passed: Missing image reported")
+
+    def test_container_gets_track_limits(self):
+        """Test the container is created with the track's resource profile"""
+        self.user.track = 'DP'
+        self.user.save()
+
+        self.client.post('/api/users/workspace/create/')
+
+        kwargs = self.docker.containers.run.call_args.kwargs
+        self.assertEqual(kwargs['mem_limit'], 4 * 1024 ** 3)
+        self.assertEqual(kwargs['nano_cpus'], 2_000_000_000)
+        self.assertEqual(kwargs['pids_limit'], 1024)
+        workspace = Workspace.objects.get(user=self.user)
+        self.assertEqual(workspace.state, 'running')
+        self.assertEqual(workspace.mem_limit, 4 * 1024 ** 3)
+        self.assertIsNotNone(workspace.volume_initialized_at)
+
+        print(f"✅ Test Passed: Track resource limits applied")
+
+    @override_settings(WORKSPACE_ADMISSION_POLICY='reject')
+    def test_saturated_host_rejects(self):
+        """Test a full host fails the job without creating a container"""
+        self.docker.info.return_value = {'MemTotal': 3 * 1024 ** 3, 'NCPU': 1}
+
+        response = self.client.post('/api/users/workspace/create/')
+
+        self.assertEqual(response.data['status'], 'failed')
+        self.assertEqual(response.data['error']['error'], 'Workspace host is at capacity')
+        self.docker.containers.run.assert_not_called()
+        self.assertFalse(Workspace.objects.filter(user=self.user, state='starting').exists())
+
+        print(f"✅ Test Passed: Saturated host rejected")
+
+    def test_saturated_host_queues(self):
+        """Test a full host leaves the job waiting and admits it once capacity frees"""
+        self.docker.info.return_value = {'MemTotal': 4 * 1024 ** 3, 'NCPU': 4}
+        other = CustomUser.objects.create_user(
+            username='busy@example.com', email='busy@example.com', password='TestPass123!@#'
+        )
+        Workspace.objects.create(user=other, container_name=f'workspace_{other.id}', mem_limit=2 * 1024 ** 3)
+
+        response = self.client.post('/api/users/workspace/create/')
+        self.assertEqual(response.data['status'], 'waiting')
+        self.docker.containers.run.assert_not_called()
+
+        Workspace.objects.filter(user=other).update(state='stopped')
+        response = self.client.post('/api/users/workspace/create/')
+        self.assertEqual(response.data['status'], 'running')
+        self.assertEqual(WorkspaceJob.objects.count(), 1)
+
+        print(f"✅ Test Passed: Saturated host queued")
+
+    def test_in_flight_job_is_reused(self):
+        """Test a second request returns the queued job instead of a new one"""
+        job = WorkspaceJob.objects.create(user=self.user, status='creating')
+
+        response = self.client.post('/api/users/workspace/create/')
+
+        self.assertEqual(str(response.data['job_id']), str(job.pk))
+        self.assertEqual(WorkspaceJob.objects.count(), 1)
+
+        print(f"✅ Test Passed: In-flight job reused")
+
+    def test_job_status_is_private(self):
+        """Test users cannot read other users' jobs"""
+        other = CustomUser.objects.create_user(
+            username='other-ws@example.com',
+            email='other-ws@example.com',
+            password='TestPass123!@#'
+        )
+        job = WorkspaceJob.objects.create(user=other)
+
+        response = self.client.get(f'/api/users/workspace/jobs/{job.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        print(f"✅ Test Passed: Job status scoped to owner")
+
+    def test_docker_unavailable(self):
+        """Test create reports 503 when Docker is unreachable"""
+        with mock.patch('accounts.workspace_views.get_docker_client', return_value=None):
+            response = self.client.post('/api/users/workspace/create/')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        print(f"✅ Test Passed: Docker unavailable reported")
+
+
+class WorkspaceVolumeTestCase(TestCase):
+    """Test workspace directory initialization"""
+
+    def setUp(self):
+        """Set up a scratch base directory"""
+        self.base = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base, ignore_errors=True)
+        patcher = mock.patch('accounts.workspace_service.subprocess.run')
+        self.run = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_new_volume_is_not_walked(self):
+        """Test a new directory is created without a recursive chown"""
+        path = os.path.join(self.base, '1')
+
+        prepare_volume(path)
+
+        self.assertTrue(os.path.isdir(path))
+        self.run.assert_not_called()
+
+        print(f"✅ Test Passed: New volume initialized without walking it")
+
+    def test_initialized_volume_is_untouched(self):
+        """Test a recorded volume is reused as-is"""
+        path = os.path.join(self.base, '2')
+        os.makedirs(path)
+
+        prepare_volume(path, initialized=True)
+
+        self.run.assert_not_called()
+
+        print(f"✅ Test Passed: Initialized volume reused")
+
+    def test_unrecorded_volume_is_fixed_once(self):
+        """Test a pre-existing directory gets the recursive fix"""
+        path = os.path.join(self.base, '3')
+        os.makedirs(path)
+
+        prepare_volume(path)
+
+        self.assertEqual(self.run.call_count, 2)
+
+        print(f"✅ Test Passed: Legacy volume fixed")
+
+
+@override_settings(WORKSPACE_PORT_RANGE_START=30000, WORKSPACE_PORT_RANGE_END=30001)
+class WorkspacePortLeaseTestCase(TestCase):
+    """Test host port leases for workspace containers"""
+
+    def setUp(self):
+        """Set up two students"""
+        self.first = CustomUser.objects.create_user(
+            username='port1@example.com', email='port1@example.com', password='TestPass123!@#'
+        )
+        self.second = CustomUser.objects.create_user(
+            username='port2@example.com', email='port2@example.com', password='TestPass123!@#'
+        )
+
+    def test_ports_allocated_from_range(self):
+        """Test leases are unique, stable per user and bounded by the range"""
+        first = allocate_port('workspace_a', user=self.first)
+        second = allocate_port('workspace_b', user=self.second)
+
+        self.assertEqual((first, second), (30000, 30001))
+        self.assertEqual(allocate_port('workspace_a', user=self.first), first)
+        self.assertEqual(leased_port(self.first), first)
+        with self.assertRaises(WorkspaceError):
+            allocate_port('workspace_pool_x')
+
+        print(f"✅ Test Passed: Ports allocated from range")
+
+    def test_released_port_is_reused(self):
+        """Test a released port is handed out again"""
+        allocate_port('workspace_a', user=self.first)
+        second = allocate_port('workspace_b', user=self.second)
+        release_port(second)
+
+        self.assertIsNone(leased_port(self.second))
+        self.assertEqual(allocate_port('workspace_pool_x'), second)
+
+        print(f"✅ Test Passed: Released port reused")
+
+
+@override_settings(WORKSPACE_JOBS_EAGER=True, WORKSPACE_GATEWAY_URL='https://apranova.example/workspaces')
+class WorkspaceGatewayTestCase(APITestCase):
+    """Test the nginx routing gateway for workspaces"""
+
+    def setUp(self):
+        """Set up a student, a scratch map path and a mocked Docker client"""
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='gateway@example.com', email='gateway@example.com', password='TestPass123!@#'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        base = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base, ignore_errors=True)
+        self.map_path = os.path.join(base, 'gateway', 'workspaces.map')
+        settings_patcher = override_settings(WORKSPACE_BASE_PATH=base, WORKSPACE_GATEWAY_MAP_PATH=self.map_path)
+        settings_patcher.enable()
+        self.addCleanup(settings_patcher.disable)
+
+        self.docker = mock_docker_host(self)
+        self.docker.containers.get.side_effect = docker.errors.NotFound('missing')
+        self.nginx = mock.MagicMock()
+        self.nginx.exec_run.return_value = mock.MagicMock(exit_code=0)
+        patcher = mock.patch('accounts.workspace_service._client', self.docker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_workspace_routed_without_host_port(self):
+        """Test a new workspace is published through the gateway map only"""
+        with mock.patch('accounts.workspace_gateway.reload_nginx', return_value=True) as reload_nginx:
+            response = self.client.post('/api/users/workspace/create/')
+
+        self.assertTrue(response.data['url'].startswith(
+            f'https://apranova.example/workspaces/{self.user.id}/?workspace_token='
+        ))
+        self.assertEqual(self.docker.containers.run.call_args.kwargs['ports'], {})
+        with open(self.map_path) as f:
+            self.assertIn(f'{self.user.id} workspace_{self.user.id}:8080;', f.read())
+        reload_nginx.assert_called_once()
+
+        print(f"✅ Test Passed: Workspace routed through gateway")
+
+    def test_unchanged_map_skips_reload(self):
+        """Test nginx is only reloaded when the map changes"""
+        Workspace.objects.create(user=self.user, container_name=f'workspace_{self.user.id}')
+        self.docker.containers.get.side_effect = None
+        self.docker.containers.get.return_value = self.nginx
+
+        self.assertTrue(sync_gateway())
+        self.assertFalse(sync_gateway())
+        self.nginx.exec_run.assert_called_once_with(['nginx', '-s', 'reload'])
+
+        print(f"✅ Test Passed: Unchanged gateway map not reloaded")
+
+    def test_gateway_requires_owner_link_or_session(self):
+        """Test nginx is only let through with the owner's link token or the session cookie it sets"""
+        other = CustomUser.objects.create_user(
+            username='gateway2@example.com', email='gateway2@example.com', password='TestPass123!@#'
+        )
+        link = gateway_link(self.user.id, f'https://apranova.example/workspaces/{self.user.id}/')
+        original_uri = f'/workspaces/{self.user.id}/{link.split("/")[-1]}'
+        anonymous = APIClient()
+
+        def check(workspace_id, uri=f'/workspaces/{self.user.id}/'):
+            return anonymous.get(
+                '/api/users/workspace/gateway-auth/',
+                HTTP_X_WORKSPACE_ID=str(workspace_id), HTTP_X_ORIGINAL_URI=uri,
+            )
+
+        self.assertEqual(check(self.user.id).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(check(other.id, original_uri).status_code, status.HTTP_401_UNAUTHORIZED)
+        with override_settings(WORKSPACE_GATEWAY_LINK_MAX_AGE=-1):
+            self.assertEqual(check(self.user.id, original_uri).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = check(self.user.id, original_uri)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        cookie = response.cookies['apranova_workspace']
+        self.assertEqual(cookie['path'], f'/workspaces/{self.user.id}/')
+        self.assertTrue(cookie['httponly'])
+
+        # Later requests (assets, WebSockets) carry only the cookie
+        self.assertEqual(check(self.user.id).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(check(other.id, f'/workspaces/{other.id}/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        print(f"✅ Test Passed: Gateway authorizes only the workspace owner")
+
+
+@override_settings(
+    WORKSPACE_JOBS_EAGER=True,
+    WORKSPACE_BASE_PATH=tempfile.gettempdir(),
+    WORKSPACE_DOCKER_HOSTS={'worker-1': {'url': 'tcp://10.0.0.5:2376', 'address': '10.0.0.5'}},
+)
+class WorkspaceSchedulerTestCase(APITestCase):
+    """Test workspace placement across Docker hosts"""
+
+    def setUp(self):
+        """Set up a student, a busy local host and an idle remote host"""
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='placed@example.com', email='placed@example.com', password='TestPass123!@#'
+        )
+        self.client.force_authenticate(user=self.user)
+        other = CustomUser.objects.create_user(
+            username='neighbour@example.com', email='neighbour@example.com', password='TestPass123!@#'
+        )
+        Workspace.objects.create(user=other, container_name=f'workspace_{other.id}', mem_limit=8 * 1024 ** 3)
+
+        self.local = mock_docker_host(self, memory=16 * 1024 ** 3, cpus=8)
+        self.remote = mock.MagicMock()
+        self.remote.info.return_value = {'MemTotal': 16 * 1024 ** 3, 'NCPU': 8}
+        self.remote.containers.run.return_value.id = 'remote-container'
+        self.remote.images.get.return_value.id = 'sha256:workspace-image'
+        for client in (self.local, self.remote):
+            client.containers.get.side_effect = docker.errors.NotFound('missing')
+        for patcher in [
+            mock.patch('accounts.workspace_service._client', self.local),
+            mock.patch.dict('accounts.workspace_service._remote_clients', {'worker-1': self.remote}),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_new_workspace_placed_on_least_loaded_host(self):
+        """Test a new workspace goes to the emptier host with its volume prepared there"""
+        response = self.client.post('/api/users/workspace/create/')
+
+        self.assertEqual(response.data['status'], 'running')
+        self.local.containers.run.assert_not_called()
+        # One short-lived container initializes the volume, then the workspace starts
+        self.assertEqual(self.remote.containers.run.call_count, 2)
+        self.assertEqual(Workspace.objects.get(user=self.user).host, 'worker-1')
+
+        print(f"✅ Test Passed: Workspace placed on least-loaded host")
+
+    def test_workspace_sticks_to_its_host(self):
+        """Test a workspace with a volume is never moved to another host"""
+        Workspace.objects.create(
+            user=self.user,
+            container_name=f'workspace_{self.user.id}',
+            host='worker-1',
+            state='stopped',
+            volume_initialized_at=timezone.now(),
+        )
+        Workspace.objects.exclude(user=self.user).update(state='stopped')
+
+        self.assertEqual(place_workspace(self.user, resource_profile(self.user)), 'worker-1')
+
+        print(f"✅ Test Passed: Workspace kept on its host")
+
+
+@override_settings(WORKSPACE_JOBS_EAGER=True, WORKSPACE_BASE_PATH=tempfile.gettempdir())
+class CohortProvisioningTestCase(TestCase):
+    """Test provisioning a cohort's workspaces ahead of time"""
+
+    def setUp(self):
+        """Set up a trainer with two students and a mocked Docker client"""
+        self.trainer = CustomUser.objects.create_user(
+            username='cohort-trainer@example.com', email='cohort-trainer@example.com',
+            password='TestPass123!@#', role='trainer'
+        )
+        self.students = [
+            CustomUser.objects.create_user(
+                username=f'cohort{i}@example.com', email=f'cohort{i}@example.com',
+                password='TestPass123!@#', role='student', assigned_trainer=self.trainer
+            )
+            for i in range(2)
+        ]
+        CustomUser.objects.create_user(
+            username='elsewhere@example.com', email='elsewhere@example.com', password='TestPass123!@#'
+        )
+
+        self.docker = mock_docker_host(self)
+        self.docker.containers.get.side_effect = docker.errors.NotFound('missing')
+        patcher = mock.patch('accounts.workspace_service._client', self.docker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_provision_trainer_cohort(self):
+        """Test every student of the trainer gets a workspace and a report line"""
+        out = StringIO()
+        call_command('provision_cohort', trainer='cohort-trainer@example.com', concurrency=2, stdout=out)
+
+        self.assertEqual(self.docker.containers.run.call_count, 2)
+        self.assertEqual(
+            set(WorkspaceJob.objects.filter(status='running').values_list('user', flat=True)),
+            {student.pk for student in self.students},
+        )
+        self.assertIn('Provisioned 2 of 2 workspace(s), 0 failed', out.getvalue())
+
+        print(f"✅ Test Passed: Cohort provisioned")
+
+    def test_failures_are_reported(self):
+        """Test a failed student is listed without stopping the rest"""
+        self.docker.images.get.side_effect = docker.errors.ImageNotFound('missing')
+        self.docker.images.pull.side_effect = docker.errors.APIError('pull failed')
+        out = StringIO()
+
+        call_command('provision_cohort', trainer='cohort-trainer@example.com', stdout=out)
+
+        self.assertIn('cohort0@example.com: failed - Code-server image not found', out.getvalue())
+        self.assertIn('0 of 2 workspace(s), 2 failed', out.getvalue())
+
+        print(f"✅ Test Passed: Cohort failures reported")
+
+    def start_workspace(self, student):
+        """Make the state cache report the student's workspace as running"""
+        allocate_port(f'workspace_{student.id}', user=student)
+        cache = get_state_cache()
+        cache.seed([])
+        cache.apply({'Action': 'start', 'Actor': {'Attributes': {'name': f'workspace_{student.id}'}}})
+
+    def test_cohort_with_running_workspace(self):
+        """Test a student whose workspace is already running gets an unsaved running job"""
+        self.start_workspace(self.students[0])
+
+        jobs = provision_cohort(self.students)
+
+        self.assertEqual([job.status for job in jobs], ['running', 'running'])
+        self.assertIsNone(jobs[0].pk)
+        self.assertEqual(jobs[0].source, 'existing')
+        self.assertIsNotNone(jobs[1].pk)
+        self.assertEqual(self.docker.containers.run.call_count, 1)
+
+        print(f"✅ Test Passed: Cohort with a running workspace provisioned")
+
+    def test_rerun_reports_running_workspaces(self):
+        """Test a re-run lists already running workspaces alongside new ones"""
+        self.start_workspace(self.students[0])
+        out = StringIO()
+
+        call_command('provision_cohort', trainer='cohort-trainer@example.com', stdout=out)
+
+        self.assertIn('cohort0@example.com: running (existing, 0 ms)', out.getvalue())
+        self.assertIn('cohort1@example.com: running (cold', out.getvalue())
+        self.assertIn('Provisioned 2 of 2 workspace(s), 0 failed', out.getvalue())
+
+        print(f"✅ Test Passed: Cohort re-run reports running workspaces")
+
+
+@override_settings(WORKSPACE_JOBS_EAGER=True, WORKSPACE_BASE_PATH=tempfile.gettempdir())
+class WorkspaceImageTestCase(APITestCase):
+    """Test workspace image pinning, rollout and rollback"""
+
+    def setUp(self):
+        """Set up a student and a mocked Docker client"""
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='image@example.com', email='image@example.com', password='TestPass123!@#'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.docker = mock_docker_host(self)
+        self.docker.containers.get.side_effect = docker.errors.NotFound('missing')
+        patcher = mock.patch('accounts.workspace_service._client', self.docker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def pull(self, digest):
+        self.docker.images.pull.return_value.id = digest
+        return refresh_workspace_image()
+
+    def test_refresh_pins_and_keeps_previous(self):
+        """Test a new pull becomes current and the old image is kept for rollback"""
+        _, changed = self.pull('sha256:v1')
+        self.assertTrue(changed)
+        _, changed = self.pull('sha256:v1')
+        self.assertFalse(changed)
+        self.pull('sha256:v2')
+
+        self.assertEqual(image_for(), 'sha256:v2')
+        self.assertEqual(WorkspaceImage.objects.get(status='previous').digest, 'sha256:v1')
+
+        rollback_workspace_image()
+        self.assertEqual(image_for(), 'sha256:v1')
+
+        print(f"✅ Test Passed: Image pinned with rollback")
+
+    def test_refresh_after_rollback_keeps_rolled_back_image(self):
+        """Test the image rolled back from is not re-pinned until the tag moves or it is forced"""
+        self.pull('sha256:v1')
+        self.pull('sha256:v2')
+        rollback_workspace_image()
+
+        # The tag still points at v2
+        _, changed = self.pull('sha256:v2')
+        self.assertFalse(changed)
+        self.assertEqual(image_for(), 'sha256:v1')
+        self.assertTrue(WorkspaceImage.objects.get(digest='sha256:v2').held)
+
+        self.docker.images.pull.return_value.id = 'sha256:v2'
+        _, changed = refresh_workspace_image(force=True)
+        self.assertTrue(changed)
+        self.assertEqual(image_for(), 'sha256:v2')
+        self.assertFalse(WorkspaceImage.objects.get(digest='sha256:v2').held)
+
+        rollback_workspace_image()
+        _, changed = self.pull('sha256:v3')
+        self.assertTrue(changed)
+        self.assertEqual(image_for(), 'sha256:v3')
+
+        print(f"✅ Test Passed: Rollback held against re-pinning")
+
+    def test_workspace_runs_and_records_pinned_image(self):
+        """Test new containers run the pinned image id, honoring the rollout share"""
+        self.pull('sha256:v1')
+        self.pull('sha256:v2')
+        self.docker.images.get.side_effect = lambda ref: mock.MagicMock(id=ref)
+
+        with override_settings(WORKSPACE_IMAGE_ROLLOUT_PERCENT=0):
+            self.client.post('/api/users/workspace/create/')
+
+        self.assertEqual(self.docker.containers.run.call_args.args[0], 'sha256:v1')
+        self.assertEqual(Workspace.objects.get(user=self.user).image_digest, 'sha256:v1')
+        usage = {image['digest']: image['workspaces'] for image in image_usage()['images']}
+        self.assertEqual(usage, {'sha256:v2': 0, 'sha256:v1': 1})
+
+        print(f"✅ Test Passed: Workspace runs pinned image")
+
+
+@override_settings(WORKSPACE_JOBS_EAGER=True, WORKSPACE_POOL_SIZE=2)
+class WorkspacePoolTestCase(APITestCase):
+    """Test the warm workspace container pool"""
+
+    def setUp(self):
+        """Set up a student, a temporary workspace root and a mocked Docker client"""
+        from accounts.workspace_pool import replenish_pool
+
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='pool@example.com',
+            email='pool@example.com',
+            password='TestPass123!@#',
+            role='student'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.base_path = tempfile.mkdtemp()
+        settings_patch = override_settings(WORKSPACE_BASE_PATH=self.base_path)
+        settings_patch.enable()
+        self.addCleanup(settings_patch.disable)
+
+        self.docker = mock_docker_host(self)
+        self.docker.containers.get.side_effect = docker.errors.NotFound('missing')
+        patcher = mock.patch('accounts.workspace_service._client', self.docker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.docker.containers.run.return_value.id = 'pool-container'
+        self.assertEqual(replenish_pool(), 2)
+        self.docker.containers.get.side_effect = None
+
+    def test_first_workspace_claims_pool_slot(self):
+        """Test a first-time student gets a pre-started container"""
+        self.docker.containers.get.side_effect = [docker.errors.NotFound('missing'), mock.MagicMock()]
+        self.docker.containers.run.reset_mock()
+
+        response = self.client.post('/api/users/workspace/create/')
+
+        self.assertEqual(response.data['status'], 'running')
+        self.docker.containers.run.assert_not_called()
+        self.assertTrue(os.path.islink(os.path.join(self.base_path, str(self.user.id))))
+
+        slot = WorkspacePoolSlot.objects.get(user=self.user)
+        self.assertEqual(slot.status, 'claimed')
+        self.assertEqual(response.data['port'], slot.port)
+        self.assertEqual(WorkspaceJob.objects.get().source, 'pool')
+
+        print(f"✅ Test Passed: Pool slot claimed")
+
+    def test_existing_volume_skips_pool(self):
+        """Test students with an existing workspace directory keep their files"""
+        os.makedirs(os.path.join(self.base_path, str(self.user.id)))
+        self.docker.containers.get.side_effect = docker.errors.NotFound('missing')
+        self.docker.containers.run.reset_mock()
+
+        self.client.post('/api/users/workspace/create/')
+
+        self.docker.containers.run.assert_called_once()
+        self.assertEqual(WorkspacePoolSlot.objects.filter(status='available').count(), 2)
+        self.assertEqual(WorkspaceJob.objects.get().source, 'cold')
+
+        print(f"✅ Test Passed: Existing volume bypasses pool")
+
+    def test_pool_metrics(self):
+        """Test pool metrics report occupancy and hit rate"""
+        admin = CustomUser.objects.create_user(
+            username='pool-admin@example.com',
+            email='pool-admin@example.com',
+            password='TestPass123!@#',
+            role='admin'
+        )
+        WorkspaceJob.objects.create(user=self.user, status='running', source='pool', duration_ms=40)
+        WorkspaceJob.objects.create(user=self.user, status='running', source='cold', duration_ms=4000)
+
+        response = self.client.get('/api/users/workspace/pool/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=admin)
+        response = self.client.get('/api/users/workspace/pool/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available'], 2)
+        self.assertEqual(response.data['hit_rate'], 0.5)
+        self.assertEqual(response.data['avg_claim_ms'], 40)
+
+        print(f"✅ Test Passed: Pool metrics reported")
+
+
+class WorkspaceLifecycleTestCase(APITestCase):
+    """Test idle workspace reaping and resume"""
+
+    def setUp(self):
+        """Set up students and a mocked Docker client"""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.idle_user = CustomUser.objects.create_user(
+            username='idle@example.com', email='idle@example.com', password='TestPass123!@#'
+        )
+        self.active_user = CustomUser.objects.create_user(
+            username='active@example.com', email='active@example.com', password='TestPass123!@#'
+        )
+        Workspace.objects.create(
+            user=self.idle_user,
+            container_name=f'workspace_{self.idle_user.id}',
+            last_activity_at=timezone.now() - timedelta(hours=3),
+        )
+        Workspace.objects.create(
+            user=self.active_user,
+            container_name=f'workspace_{self.active_user.id}',
+            last_activity_at=timezone.now(),
+        )
+
+        self.idle = mock.MagicMock()
+        self.idle.name = f'workspace_{self.idle_user.id}'
+        self.idle.stats.return_value = {'memory_stats': {'usage': 512 * 1024 * 1024}}
+        self.active = mock.MagicMock()
+        self.active.name = f'workspace_{self.active_user.id}'
+        pool = mock.MagicMock()
+        pool.name = 'workspace_pool_abc'
+
+        self.docker = mock_docker_host(self)
+        self.docker.containers.list.return_value = [self.idle, self.active, pool]
+        for target, value in [
+            ('accounts.workspace_service._client', self.docker),
+            ('accounts.workspace_lifecycle.code_server_heartbeat', mock.MagicMock(return_value=None)),
+        ]:
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_idle_workspace_stopped(self):
+        """Test only idle student workspaces are stopped"""
+        from accounts.workspace_lifecycle import reap_idle_workspaces
+
+        report = reap_idle_workspaces(timeout_minutes=60, action='stop')
+
+        self.idle.stop.assert_called_once()
+        self.active.stop.assert_not_called()
+        self.assertEqual(report['checked'], 2)
+        self.assertEqual(report['reclaimed_bytes'], 512 * 1024 * 1024)
+        self.assertEqual(Workspace.objects.get(user=self.idle_user).state, 'stopped')
+
+        print(f"✅ Test Passed: Idle workspace stopped")
+
+    def test_dry_run_leaves_containers(self):
+        """Test dry run only reports"""
+        from accounts.workspace_lifecycle import reap_idle_workspaces
+
+        report = reap_idle_workspaces(timeout_minutes=60, action='pause', dry_run=True)
+
+        self.idle.pause.assert_not_called()
+        self.assertEqual(len(report['suspended']), 1)
+        self.assertEqual(Workspace.objects.get(user=self.idle_user).state, 'running')
+
+        print(f"✅ Test Passed: Dry run reported idle workspace")
+
+    @override_settings(WORKSPACE_DOCKER_HOSTS={'worker-1': {'url': 'tcp://10.0.0.5:2376', 'address': '10.0.0.5'}})
+    def test_remote_heartbeat_through_host_address(self):
+        """Test remote workspaces are probed through the host address and published port, and skipped when unreachable"""
+        from datetime import timedelta
+        from accounts.workspace_lifecycle import reap_idle_workspaces
+
+        self.idle.attrs = {'HostConfig': {'PortBindings': {'8080/tcp': [{'HostPort': '20001'}]}}}
+        self.active.attrs = {'HostConfig': {'PortBindings': {'8080/tcp': [{'HostPort': '20002'}]}}}
+        Workspace.objects.filter(user=self.active_user).update(last_activity_at=timezone.now() - timedelta(hours=3))
+        remote = mock_docker_host(self)
+        remote.containers.list.return_value = [self.idle, self.active]
+        self.docker.containers.list.return_value = []
+        heartbeats = {
+            'http://10.0.0.5:20001/healthz': timezone.now() - timedelta(hours=2),
+            'http://10.0.0.5:20002/healthz': timezone.now(),
+        }
+
+        with mock.patch('accounts.workspace_lifecycle.get_docker_client',
+                        side_effect=lambda host='local': remote if host == 'worker-1' else self.docker), \
+                mock.patch('accounts.workspace_lifecycle.code_server_heartbeat', side_effect=heartbeats.get):
+            report = reap_idle_workspaces(timeout_minutes=60, action='stop')
+
+        self.idle.stop.assert_called_once()
+        self.active.stop.assert_not_called()
+        self.assertEqual(report['unreachable'], [])
+
+        # Without a published port the heartbeat cannot be read, so the workspace is left alone
+        self.idle.reset_mock()
+        self.idle.attrs = {'HostConfig': {'PortBindings': {}}}
+        with mock.patch('accounts.workspace_lifecycle.get_docker_client',
+                        side_effect=lambda host='local': remote if host == 'worker-1' else self.docker), \
+                mock.patch('accounts.workspace_lifecycle.code_server_heartbeat', side_effect=heartbeats.get):
+            report = reap_idle_workspaces(timeout_minutes=60, action='stop')
+
+        self.idle.stop.assert_not_called()
+        self.assertEqual(report['unreachable'], [self.idle.name])
+
+        print(f"✅ Test Passed: Remote heartbeat read through host address")
+
+    @override_settings(WORKSPACE_JOBS_EAGER=True)
+    def test_paused_workspace_resumed(self):
+        """Test create_workspace unpauses a suspended workspace"""
+        self.idle.status = 'paused'
+        self.idle.attrs = {'HostConfig': {'PortBindings': {'8080/tcp': [{'HostPort': '42000'}]}}}
+        self.docker.containers.get.return_value = self.idle
+
+        client = APIClient()
+        client.force_authenticate(user=self.idle_user)
+        response = client.post('/api/users/workspace/create/')
+
+        self.assertEqual(response.data['status'], 'running')
+        self.idle.unpause.assert_called_once()
+        workspace = Workspace.objects.get(user=self.idle_user)
+        self.assertEqual(workspace.state, 'running')
+        self.assertIsNone(workspace.suspended_at)
+
+        print(f"✅ Test Passed: Paused workspace resumed")
+
+
+@override_settings(WORKSPACE_JOBS_EAGER=True)
+class WorkspaceSnapshotTestCase(APITestCase):
+    """Test workspace snapshots, restores and archiving"""
+
+    def setUp(self):
+        """Set up a student with a workspace volume and scratch snapshot storage"""
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        override = self.settings(
+            WORKSPACE_BASE_PATH=os.path.join(root, 'workspaces'),
+            WORKSPACE_SNAPSHOT_PATH=os.path.join(root, 'snapshots'),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = CustomUser.objects.create_user(
+            username='snapshot@example.com', email='snapshot@example.com', password='TestPass123!@#', role='student'
+        )
+        Workspace.objects.create(user=self.user, container_name=f'workspace_{self.user.id}', state='running')
+        self.volume = user_volume_path(self.user)
+        self.write('main.py', 'print("hello")\n')
+        self.write('notes/todo.md', '- finish project\n')
+
+        self.docker = mock_docker_host(self)
+        self.docker.containers.get.side_effect = docker.errors.NotFound('missing')
+        patcher = mock.patch('accounts.workspace_service._client', self.docker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, rel, content, mtime=None):
+        path = os.path.join(self.volume, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def read(self, rel):
+        with open(os.path.join(self.volume, rel)) as f:
+            return f.read()
+
+    def test_incremental_snapshot_archives_only_changes(self):
+        """Test a second snapshot carries only changed entries and restores deletions"""
+        full = snapshot_workspace(self.user)
+        self.write('main.py', 'print("hello, world")\n', mtime=2_000_000_000)
+        os.remove(os.path.join(self.volume, 'notes/todo.md'))
+
+        incremental = snapshot_workspace(self.user)
+
+        self.assertEqual(full.kind, 'full')
+        self.assertEqual(incremental.kind, 'incremental')
+        self.assertEqual(incremental.base, full)
+        # main.py, and notes/ whose mtime moved when todo.md was deleted
+        self.assertEqual(incremental.changed_count, 2)
+        self.assertLess(incremental.changed_count, full.changed_count)
+
+        shutil.rmtree(self.volume)
+        restore_workspace(self.user)
+
+        self.assertEqual(self.read('main.py'), 'print("hello, world")\n')
+        self.assertFalse(os.path.exists(os.path.join(self.volume, 'notes/todo.md')))
+        self.assertTrue(os.path.isdir(os.path.join(self.volume, 'notes')))
+        self.assertIsNotNone(Workspace.objects.get(user=self.user).volume_initialized_at)
+
+        print(f"✅ Test Passed: Incremental snapshot restored")
+
+    def test_restore_refuses_existing_volume(self):
+        """Test a restore never overwrites a volume unless asked to"""
+        snapshot = snapshot_workspace(self.user)
+        self.write('main.py', 'changed\n')
+
+        with self.assertRaises(WorkspaceError):
+            restore_workspace(self.user)
+        restore_workspace(self.user, snapshot=snapshot, replace=True)
+
+        self.assertEqual(self.read('main.py'), 'print("hello")\n')
+
+        print(f"✅ Test Passed: Existing volume protected")
+
+    def test_archived_workspace_restored_on_launch(self):
+        """Test archiving frees the volume and the next launch brings it back"""
+        out = StringIO()
+        call_command('snapshot_workspaces', self.user.email, '--archive', stdout=out)
+
+        self.assertFalse(os.path.exists(self.volume))
+        self.assertEqual(Workspace.objects.get(user=self.user).state, 'stopped')
+        self.assertIn('full', out.getvalue())
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post('/api/users/workspace/create/')
+
+        self.assertEqual(response.data['status'], 'running')
+        self.assertEqual(self.read('notes/todo.md'), '- finish project\n')
+        self.assertEqual(WorkspaceJob.objects.get(pk=response.data['job_id']).source, 'cold')
+
+        print(f"✅ Test Passed: Archived workspace restored on launch")
+
+    def test_failed_archive_restarts_workspace(self):
+        """Test a failed snapshot leaves the workspace running with its volume and port"""
+        container = mock.MagicMock(status='running')
+        container.name = f'workspace_{self.user.id}'
+        self.docker.containers.get.side_effect = None
+        self.docker.containers.get.return_value = container
+        port = allocate_port(container.name, user=self.user)
+
+        with mock.patch('accounts.workspace_snapshots.snapshot_workspace', side_effect=OSError('No space left')):
+            with self.assertRaises(OSError):
+                archive_workspace(self.user)
+
+        container.stop.assert_called_once()
+        container.start.assert_called_once()
+        container.remove.assert_not_called()
+        self.assertEqual(leased_port(self.user), port)
+        self.assertTrue(os.path.exists(self.volume))
+        self.assertEqual(Workspace.objects.get(user=self.user).state, 'running')
+
+        container.start.side_effect = docker.errors.APIError('start failed')
+        with mock.patch('accounts.workspace_snapshots.snapshot_workspace', side_effect=OSError('No space left')):
+            with self.assertRaises(OSError):
+                archive_workspace(self.user)
+        self.assertEqual(Workspace.objects.get(user=self.user).state, 'stopped')
+
+        print(f"✅ Test Passed: Failed archive restarts the workspace")
+
+
+def container_stats(cpu_total, memory):
+    """Docker stats response for a container that used `cpu_total` ns of CPU over 1s on 4 CPUs"""
+    return {
+        'cpu_stats': {'cpu_usage': {'total_usage': 10_000 + cpu_total}, 'system_cpu_usage': 5_000_000_000, 'online_cpus': 4},
+        'precpu_stats': {'cpu_usage': {'total_usage': 10_000}, 'system_cpu_usage': 1_000_000_000},
+        'memory_stats': {'usage': memory + 1024, 'limit': 2 * 1024 ** 3, 'stats': {'inactive_file': 1024}},
+        'pids_stats': {'current': 12},
+        'networks': {'eth0': {'rx_bytes': 100, 'tx_bytes': 50}, 'eth1': {'rx_bytes': 1, 'tx_bytes': 2}},
+        'blkio_stats': {'io_service_bytes_recursive': [
+            {'op': 'read', 'value': 4096}, {'op': 'write', 'value': 8192}, {'op': 'Read', 'value': 4096},
+        ]},
+    }
+
+
+class WorkspaceMetricsTestCase(APITestCase):
+    """Test workspace usage sampling and the usage API"""
+
+    def setUp(self):
+        """Set up a trainer with one of two running student workspaces"""
+        self.trainer = CustomUser.objects.create_user(
+            username='metrics-trainer@example.com', email='metrics-trainer@example.com',
+            password='TestPass123!@#', role='trainer'
+        )
+        self.student = CustomUser.objects.create_user(
+            username='metrics1@example.com', email='metrics1@example.com', password='TestPass123!@#',
+            role='student', assigned_trainer=self.trainer
+        )
+        self.other = CustomUser.objects.create_user(
+            username='metrics2@example.com', email='metrics2@example.com', password='TestPass123!@#', role='student'
+        )
+
+        containers = []
+        for user, cpu in [(self.student, 1_000_000_000), (self.other, 4_000_000_000)]:
+            Workspace.objects.create(user=user, container_name=f'workspace_{user.id}', state='running')
+            container = mock.MagicMock()
+            container.name = f'workspace_{user.id}'
+            container.stats.return_value = container_stats(cpu, memory=512 * 1024 * 1024)
+            containers.append(container)
+
+        self.docker = mock_docker_host(self)
+        self.docker.containers.list.return_value = containers
+        patcher = mock.patch('accounts.workspace_service._client', self.docker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse_stats(self):
+        """Test CPU, memory and I/O are derived like docker stats"""
+        sample = parse_stats(container_stats(1_000_000_000, memory=512 * 1024 * 1024))
+
+        self.assertEqual(sample['cpu_percent'], 100.0)
+        self.assertEqual(sample['memory_bytes'], 512 * 1024 * 1024)
+        self.assertEqual(sample['net_rx_bytes'], 101)
+        self.assertEqual(sample['block_read_bytes'], 8192)
+        self.assertEqual(sample['block_write_bytes'], 8192)
+        self.assertEqual(parse_stats({})['cpu_percent'], 0.0)
+
+        print(f"✅ Test Passed: Container stats parsed")
+
+    def test_usage_scoped_to_trainer(self):
+        """Test trainers see their own students, admins everyone, students nothing"""
+        self.assertEqual(collect_workspace_usage(), 2)
+        client = APIClient()
+
+        client.force_authenticate(user=self.student)
+        self.assertEqual(client.get('/api/users/workspace/usage/').status_code, status.HTTP_403_FORBIDDEN)
+
+        client.force_authenticate(user=self.trainer)
+        response = client.get('/api/users/workspace/usage/')
+        self.assertEqual([row['email'] for row in response.data['usage']], [self.student.email])
+        detail = client.get(f'/api/users/workspace/usage/{self.other.id}/')
+        self.assertEqual(detail.status_code, status.HTTP_404_NOT_FOUND)
+        detail = client.get(f'/api/users/workspace/usage/{self.student.id}/')
+        self.assertEqual(len(detail.data['samples']), 1)
+
+        self.trainer.role = 'admin'
+        self.trainer.save()
+        response = client.get('/api/users/workspace/usage/')
+        self.assertEqual(response.data['usage'][0]['email'], self.other.email)
+        self.assertEqual(response.data['usage'][0]['max_cpu_percent'], 400.0)
+
+        print(f"✅ Test Passed: Usage scoped by role")
+
+
+@override_settings(REPORT_JOBS_EAGER=True)
+class ReportJobTestCase(APITestCase):
+    """Test background report jobs, their deduplication and result reuse"""
+
+    def setUp(self):
+        """Set up an admin, two students and a temporary report directory"""
+        reports_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, reports_dir, ignore_errors=True)
+        settings_patcher = override_settings(APROVOVA_USER_REPORTS_DIR=Path(reports_dir))
+        settings_patcher.enable()
+        self.addCleanup(settings_patcher.disable)
+
+        self.admin = CustomUser.objects.create_user(
+            username='reports-admin@example.com', email='reports-admin@example.com',
+            password='TestPass123!@#', role='admin'
+        )
+        for number in range(2):
+            CustomUser.objects.create_user(
+                username=f'reports{number}@example.com', email=f'reports{number}@example.com',
+                password='TestPass123!@#', role='student', track='DP'
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_report_generated_and_downloaded(self):
+        """Test an admin's report is built with progress and served as a file"""
+        response = self.client.post(
+            '/api/users/reports/', {'report_type': 'user', 'format': 'csv', 'params': {'role': 'student'}}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(response.data['rows_total'], 2)
+        self.assertEqual(response.data['rows_written'], 2)
+        self.assertEqual(response.data['progress'], 100)
+
+        download = self.client.get(response.data['download_url'])
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        lines = b''.join(download.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('reports0@example.com', lines[1])
+
+        student = CustomUser.objects.get(email='reports0@example.com')
+        self.client.force_authenticate(user=student)
+        self.assertEqual(self.client.get(response.data['status_url']).status_code, status.HTTP_403_FORBIDDEN)
+
+        print(f"✅ Test Passed: Report generated in the background and downloaded")
+
+    def test_in_flight_request_deduplicated(self):
+        """Test identical requests share the in-flight job and stale jobs are replaced"""
+        from datetime import timedelta
+
+        params = normalize_params('user', {'track': 'DP', 'role': ''})
+        self.assertEqual(params, {'track': 'DP'})
+        queued = ReportJob.objects.create(
+            report_type='user', format='csv', params=params, params_hash=params_hash('user', 'csv', params)
+        )
+
+        self.assertEqual(enqueue_report('user', 'csv', {'track': 'DP'}).pk, queued.pk)
+        self.assertNotEqual(enqueue_report('user', 'json', {'track': 'DP'}).pk, queued.pk)
+
+        ReportJob.objects.filter(pk=queued.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        replacement = enqueue_report('user', 'csv', {'track': 'DP'})
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'failed')
+        self.assertEqual(replacement.status, 'done')
+
+        with self.assertRaises(ValueError):
+            enqueue_report('user', 'csv', {'trainer': 'someone@example.com'})
+
+        print(f"✅ Test Passed: In-flight report requests deduplicated")
+
+    def test_recent_report_reused(self):
+        """Test a recent identical report is served from its file until it expires or is deleted"""
+        first = enqueue_report('user', 'csv', requested_by=self.admin)
+        self.assertEqual(enqueue_report('user', 'csv').pk, first.pk)
+
+        os.remove(first.file_path)
+        second = enqueue_report('user', 'csv')
+        self.assertNotEqual(second.pk, first.pk)
+        self.assertTrue(os.path.exists(second.file_path))
+
+        with override_settings(REPORT_CACHE_SECONDS=0):
+            self.assertNotEqual(enqueue_report('user', 'csv').pk, second.pk)
+
+        print(f"✅ Test Passed: Recent report reused")
+
+    def test_parquet_report(self):
+        """Test a Parquet report keeps nullable columns typed, and is refused without pyarrow"""
+        from core import report_utils
+
+        with mock.patch('core.report_utils.ReportGenerator.chunk_size', 1):
+            response = self.client.post(
+                '/api/users/reports/', {'report_type': 'user', 'format': 'parquet'}, format='json'
+            )
+        self.assertEqual(response.data['status'], 'done')
+        job = ReportJob.objects.get(pk=response.data['job_id'])
+        self.assertTrue(job.file_path.endswith('.parquet'))
+        schema = report_utils.pq.read_schema(job.file_path)
+        self.assertEqual(schema.field('assigned_trainer__email').type, report_utils.pa.string())
+
+        with mock.patch.object(report_utils, 'pq', None):
+            response = self.client.post(
+                '/api/users/reports/', {'report_type': 'user', 'format': 'parquet', 'params': {'role': 'student'}},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('pyarrow', response.data['error'])
+
+        print(f"✅ Test Passed: Parquet report typed, refused without pyarrow")
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views, workspace_views
+from . import report_views, views, workspace_views
 
 urlpatterns = [
     path("profile/", views.get_user_profile, name="user-profile"),
@@ -18,4 +18,14 @@ urlpatterns = [
     path("check-email", views.check_email_exists, name="check_email_exists_no_slash"),  # Without trailing slash
     path("workspace/create/", workspace_views.create_workspace, name="create_workspace"),
     path("workspace/create", workspace_views.create_workspace, name="create_workspace_no_slash"),  # Without trailing slash
+    path("workspace/jobs/<uuid:job_id>/", workspace_views.workspace_job_status, name="workspace_job_status"),
+    path("workspace/gateway-auth/", workspace_views.workspace_gateway_auth, name="workspace_gateway_auth"),
+    path("workspace/pool/", workspace_views.workspace_pool_status, name="workspace_pool_status"),
+    path("workspace/capacity/", workspace_views.workspace_capacity, name="workspace_capacity"),
+    path("workspace/images/", workspace_views.workspace_images, name="workspace_images"),
+    path("workspace/usage/", workspace_views.workspace_usage, name="workspace_usage"),
+    path("workspace/usage/<int:user_id>/", workspace_views.workspace_usage_detail, name="workspace_usage_detail"),
+    path("reports/", report_views.request_report, name="request_report"),
+    path("reports/jobs/<uuid:job_id>/", report_views.report_job_status, name="report_job_status"),
+    path("reports/jobs/<uuid:job_id>/download/", report_views.report_job_download, name="report_job_download"),
 ]
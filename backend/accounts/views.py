@@ -1,5 +1,8 @@
+from math import ceil
+
 from allauth.socialaccount.models import SocialAccount
 from django.contrib.auth import get_user_model, authenticate
+from django.db.models import Count, F, Window
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -7,11 +10,25 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from dj_rest_auth.registration.views import RegisterView
+from core.conditional import etag_conditional, make_etag
+from curriculum.progress import annotate_student_progress
 from .serializers import CustomRegisterSerializer
 from .serializers import UserSerializer
 
 User = get_user_model()
 
+# get_my_students pagination and the fields it can be ordered by
+MY_STUDENTS_PAGE_SIZE = 50
+MY_STUDENTS_MAX_PAGE_SIZE = 200
+MY_STUDENTS_ORDERING = {
+    'name': 'name',
+    'email': 'email',
+    'track': 'track',
+    'progress': 'progress_percentage',
+    'last_activity': 'last_activity',
+    'created_at': 'created_at',
+}
+
 
 class CustomRegisterView(RegisterView):
     serializer_class = CustomRegisterSerializer
@@ -51,8 +68,20 @@ def get_tokens_for_user(user):
     }
 
 
+def profile_etag(request):
+    """Profile version: the user's and their assigned trainer's last update"""
+    user = request.user
+    trainer_updated_at = None
+    if user.assigned_trainer_id:
+        trainer_updated_at = User.objects.filter(
+            pk=user.assigned_trainer_id
+        ).values_list('updated_at', flat=True).first()
+    return make_etag('profile', user.pk, user.updated_at, user.assigned_trainer_id, trainer_updated_at)
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@etag_conditional(profile_etag)
 def get_user_profile(request):
     """Get current user profile"""
     serializer = UserSerializer(request.user)
@@ -62,7 +91,10 @@ def get_user_profile(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_my_students(request):
-    """Get list of students assigned to the trainer"""
+    """
+    Get a page of the students assigned to the trainer, with their progress and activity.
+    Query params: page, page_size (default 50, max 200), ordering (e.g. -progress)
+    """
     import logging
     logger = logging.getLogger(__name__)
     
@@ -75,13 +107,34 @@ def get_my_students(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    # Get all students assigned to this trainer
-    students = User.objects.filter(
-        assigned_trainer=request.user,
-        role='student'
-    ).order_by('-created_at')
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = min(max(int(request.query_params.get('page_size', MY_STUDENTS_PAGE_SIZE)), 1), MY_STUDENTS_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response(
+            {"error": "page and page_size must be integers"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    ordering = request.query_params.get('ordering', '-created_at')
+    if ordering.lstrip('-') not in MY_STUDENTS_ORDERING:
+        return Response(
+            {"error": f"ordering must be one of {', '.join(MY_STUDENTS_ORDERING)} (prefix - for descending)"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    field = F(MY_STUDENTS_ORDERING[ordering.lstrip('-')])
+    order = field.desc(nulls_last=True) if ordering.startswith('-') else field.asc(nulls_last=True)
     
-    logger.info(f"Found {students.count()} students for trainer {request.user.email}")
+    # Progress, activity and the roster size come back with the page in one query
+    students = annotate_student_progress(
+        User.objects.filter(assigned_trainer=request.user, role='student')
+    ).annotate(total_count=Window(Count('id'))).order_by(order, 'id')
+    offset = (page - 1) * page_size
+    students = list(students[offset:offset + page_size])
+    if students:
+        count = students[0].total_count
+    else:
+        count = User.objects.filter(assigned_trainer=request.user, role='student').count()
+    logger.info(f"Found {count} students for trainer {request.user.email}")
     
     # Serialize student data
     students_data = []
@@ -91,14 +144,21 @@ def get_my_students(request):
             'name': student.name or student.username,
             'email': student.email,
             'track': student.track or 'Not Set',
-            'progress': 0,  # TODO: Calculate from actual progress
-            'status': 'Active',  # TODO: Calculate from last activity
+            'progress': student.progress_percentage,
+            'completed_steps': student.completed_steps,
+            'total_steps': student.total_steps,
+            'status': student.activity_status,
+            'last_activity': student.last_activity.isoformat() if student.last_activity else None,
+            'pending_submissions': student.pending_submissions,
             'created_at': student.created_at.isoformat() if student.created_at else None,
         })
     
     logger.info(f"Returning {len(students_data)} students")
     return Response({
-        'count': len(students_data),
+        'count': count,
+        'page': page,
+        'page_size': page_size,
+        'num_pages': ceil(count / page_size),
         'students': students_data
     })
 
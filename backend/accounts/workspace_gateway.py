@@ -0,0 +1,152 @@
+"""
+Routing gateway for workspaces.
+
+With WORKSPACE_GATEWAY_URL set, nginx serves every workspace under
+/workspaces/<user id>/ and proxies (including code-server's WebSockets) to the
+container by name on WORKSPACE_NETWORK, so containers publish no host ports.
+The backend writes the user id -> container map that nginx includes and
+reloads nginx only when the map changes; a reload is graceful, so open
+sessions are kept.
+
+Containers run code-server without a password, so nginx authorizes every
+request (WebSockets included) with an auth_request to the backend. Workspace
+URLs handed to the owner carry a short-lived signed link token; the first
+request with it gets an HttpOnly session cookie scoped to that workspace's
+path, and later requests are let through on the cookie alone.
+"""
+import logging
+import os
+import threading
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from django.conf import settings
+from django.core import signing
+
+from .models import Workspace, WorkspacePortLease
+from .workspace_service import LOCAL_HOST, get_docker_client
+
+logger = logging.getLogger(__name__)
+
+CODE_SERVER_PORT = 8080
+
+# Query parameter carrying the link token, and the session cookie it is exchanged for
+GATEWAY_TOKEN_PARAM = "workspace_token"
+GATEWAY_SESSION_COOKIE = "apranova_workspace"
+
+_LINK_SALT = "accounts.workspace_gateway.link"
+_SESSION_SALT = "accounts.workspace_gateway.session"
+
+_sync_lock = threading.Lock()
+
+
+def gateway_enabled():
+    return bool(settings.WORKSPACE_GATEWAY_URL)
+
+
+def gateway_link(user_id, url):
+    """`url` with a link token that lets user `user_id` open their workspace through the gateway"""
+    if not gateway_enabled() or not url:
+        return url
+    token = signing.TimestampSigner(salt=_LINK_SALT).sign(str(user_id))
+    return f"{url}?{urlencode({GATEWAY_TOKEN_PARAM: token})}"
+
+
+def _signed_for(value, salt, max_age, workspace_id):
+    try:
+        return signing.TimestampSigner(salt=salt).unsign(value, max_age=max_age) == str(workspace_id)
+    except signing.BadSignature:
+        return False
+
+
+def session_valid(cookie, workspace_id):
+    return bool(cookie) and _signed_for(
+        cookie, _SESSION_SALT, settings.WORKSPACE_GATEWAY_SESSION_MAX_AGE, workspace_id
+    )
+
+
+def link_valid(original_uri, workspace_id):
+    """Whether the proxied request's query string holds a current link token for the workspace"""
+    tokens = parse_qs(urlsplit(original_uri or "").query).get(GATEWAY_TOKEN_PARAM, [])
+    return any(
+        _signed_for(token, _LINK_SALT, settings.WORKSPACE_GATEWAY_LINK_MAX_AGE, workspace_id)
+        for token in tokens
+    )
+
+
+def set_session_cookie(response, workspace_id):
+    """Let later requests to the workspace through on a cookie, without the link token"""
+    response.set_cookie(
+        GATEWAY_SESSION_COOKIE,
+        signing.TimestampSigner(salt=_SESSION_SALT).sign(str(workspace_id)),
+        max_age=settings.WORKSPACE_GATEWAY_SESSION_MAX_AGE,
+        path=f"{urlsplit(settings.WORKSPACE_GATEWAY_URL).path.rstrip('/')}/{workspace_id}/",
+        secure=settings.WORKSPACE_GATEWAY_URL.startswith("https://"),
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def render_gateway_map():
+    """
+    Body of the nginx map from user id to code-server upstream
+
+    Local containers are reached by name on WORKSPACE_NETWORK; containers on
+    other Docker hosts through the host's address and their published port.
+    """
+    ports = dict(WorkspacePortLease.objects.filter(user__isnull=False).values_list("user_id", "port"))
+    lines = ["# Generated by the ApraNova backend (sync_workspace_gateway); do not edit\n"]
+    workspaces = Workspace.objects.order_by("user_id").values_list("user_id", "container_name", "host")
+    for user_id, container_name, host in workspaces:
+        if host == LOCAL_HOST:
+            lines.append(f"{user_id} {container_name}:{CODE_SERVER_PORT};\n")
+        elif host in settings.WORKSPACE_DOCKER_HOSTS and user_id in ports:
+            lines.append(f"{user_id} {settings.WORKSPACE_DOCKER_HOSTS[host]['address']}:{ports[user_id]};\n")
+    return "".join(lines)
+
+
+def reload_nginx():
+    client = get_docker_client()
+    if client is None:
+        return False
+    result = client.containers.get(settings.WORKSPACE_GATEWAY_NGINX_CONTAINER).exec_run(["nginx", "-s", "reload"])
+    if result.exit_code != 0:
+        logger.warning(f"nginx reload failed: {result.output!r}")
+        return False
+    return True
+
+
+def sync_gateway(force=False):
+    """
+    Rewrite the gateway map and reload nginx if it changed
+
+    Returns:
+        True if nginx was reloaded
+    """
+    path = settings.WORKSPACE_GATEWAY_MAP_PATH
+    with _sync_lock:
+        content = render_gateway_map()
+        try:
+            with open(path) as f:
+                unchanged = f.read() == content
+        except FileNotFoundError:
+            unchanged = False
+        if unchanged and not force:
+            return False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so nginx never reads a half-written map
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        return reload_nginx()
+
+
+def sync_gateway_safely():
+    """Sync after a workspace appears; failures must not fail provisioning"""
+    if not gateway_enabled():
+        return
+    try:
+        sync_gateway()
+    except Exception:
+        logger.exception("Workspace gateway sync failed")
@@ -0,0 +1,152 @@
+"""
+Workspace image pinning and rollout.
+
+refresh_workspace_image() pulls WORKSPACE_IMAGE on every Docker host ahead
+of time and pins the resulting image id as "current", keeping the one it
+replaces as "previous" for rollback. New containers run the pinned id rather
+than the moving tag, so a new image never means a cold pull during a
+student's launch, and WORKSPACE_IMAGE_ROLLOUT_PERCENT lets it reach students
+gradually. Each Workspace records the image id it was created from.
+"""
+import logging
+
+import docker
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Workspace, WorkspaceImage
+from .workspace_service import LOCAL_HOST, WorkspaceError, docker_hosts, get_docker_client
+
+logger = logging.getLogger(__name__)
+
+
+def image_for(user=None):
+    """
+    Pinned image id new containers should run, or None before the first refresh
+
+    Students outside WORKSPACE_IMAGE_ROLLOUT_PERCENT stay on the previous image.
+    """
+    images = {image.status: image.digest for image in WorkspaceImage.objects.filter(status__in=["current", "previous"])}
+    if (
+        user is not None
+        and "previous" in images
+        and user.id % 100 >= settings.WORKSPACE_IMAGE_ROLLOUT_PERCENT
+    ):
+        return images["previous"]
+    return images.get("current")
+
+
+def pin_image(digest, force=False):
+    """
+    Make `digest` the current image, demoting the current one to previous
+
+    An image held by a rollback is left alone unless `force` is set, which
+    also releases the hold.
+
+    Returns:
+        (WorkspaceImage, changed)
+    """
+    with transaction.atomic():
+        current = WorkspaceImage.objects.select_for_update().filter(status="current").first()
+        if current and current.digest == digest:
+            return current, False
+        if current and not force and WorkspaceImage.objects.filter(digest=digest, held=True).exists():
+            logger.warning(f"{digest} was rolled back from; keeping {current.digest}")
+            return current, False
+        WorkspaceImage.objects.filter(status="previous").update(status="retired")
+        if current:
+            current.status = "previous"
+            current.save(update_fields=["status"])
+        image, _ = WorkspaceImage.objects.update_or_create(
+            digest=digest,
+            defaults={
+                "reference": settings.WORKSPACE_IMAGE,
+                "status": "current",
+                "activated_at": timezone.now(),
+                "held": False,
+            },
+        )
+    return image, True
+
+
+def refresh_workspace_image(force=False):
+    """
+    Pull WORKSPACE_IMAGE on every reachable host and pin it
+
+    Images built locally rather than pushed to a registry are pinned as found.
+    After a rollback the tag usually still points at the image rolled back
+    from; that image stays unpinned until the tag moves or `force` is set.
+
+    Returns:
+        (WorkspaceImage, changed)
+
+    Raises:
+        WorkspaceError: If no host has the image
+    """
+    digests = {}
+    for host in docker_hosts():
+        client = get_docker_client(host)
+        if client is None:
+            continue
+        try:
+            image = client.images.pull(settings.WORKSPACE_IMAGE)
+        except docker.errors.APIError:
+            try:
+                image = client.images.get(settings.WORKSPACE_IMAGE)
+            except docker.errors.ImageNotFound:
+                logger.warning(f"{settings.WORKSPACE_IMAGE} not available on Docker host {host}")
+                continue
+        digests[host] = image.id
+
+    if not digests:
+        raise WorkspaceError(
+            "Code-server image not found",
+            message=f"The {settings.WORKSPACE_IMAGE} image needs to be built first.",
+            details=f"Run: docker build -t {settings.WORKSPACE_IMAGE} ./backend/apra-nova-code-server",
+        )
+    if len(set(digests.values())) > 1:
+        logger.warning(f"Docker hosts disagree on {settings.WORKSPACE_IMAGE}: {digests}")
+    return pin_image(digests.get(LOCAL_HOST) or next(iter(digests.values())), force=force)
+
+
+def rollback_workspace_image():
+    """
+    Swap the current and previous images, holding the one rolled back from
+
+    Raises:
+        WorkspaceError: If there is no previous image
+    """
+    with transaction.atomic():
+        previous = WorkspaceImage.objects.select_for_update().filter(status="previous").first()
+        if previous is None:
+            raise WorkspaceError("No previous workspace image to roll back to")
+        WorkspaceImage.objects.filter(status="current").update(status="previous", held=True)
+        previous.status = "current"
+        previous.activated_at = timezone.now()
+        previous.save(update_fields=["status", "activated_at"])
+    return previous
+
+
+def image_usage():
+    """Pinned images and how many workspaces run each image id"""
+    usage = dict(
+        Workspace.objects.exclude(image_digest="").values_list("image_digest").annotate(count=Count("id"))
+    )
+    return {
+        "reference": settings.WORKSPACE_IMAGE,
+        "rollout_percent": settings.WORKSPACE_IMAGE_ROLLOUT_PERCENT,
+        "images": [
+            {
+                "digest": image.digest,
+                "status": image.status,
+                "activated_at": image.activated_at,
+                "held": image.held,
+                "workspaces": usage.pop(image.digest, 0),
+            }
+            for image in WorkspaceImage.objects.exclude(status="retired")
+        ],
+        # Workspaces still on retired or never-pinned images
+        "other": usage,
+    }
@@ -0,0 +1,178 @@
+"""
+Background execution of workspace provisioning.
+
+Requests only record a WorkspaceJob and hand it to a per-process thread pool
+(see core.jobs), so Docker latency never holds a gunicorn worker. Job state
+lives in the database, so any worker can answer status polls.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from core.jobs import JobRunner, set_status
+
+from .models import WorkspaceJob
+from .workspace_gateway import sync_gateway_safely
+from .workspace_lifecycle import record_activity, touch_activity
+from .workspace_quota import WorkspaceCapacityError
+from .workspace_service import WorkspaceError, container_name_for, provision_workspace, running_workspace
+
+logger = logging.getLogger(__name__)
+
+
+def provision_job(job_id):
+    """Provision the workspace for a queued job, recording each stage"""
+    job = WorkspaceJob.objects.select_related("user").get(pk=job_id)
+    started = time.monotonic()
+    try:
+        result = provision_workspace(job.user, on_stage=lambda stage: set_status(job, stage))
+    except WorkspaceCapacityError as e:
+        if _can_wait(job):
+            set_status(job, "waiting", error=e.as_dict())
+            _retry_later(job)
+        else:
+            set_status(job, "failed", error=e.as_dict())
+    except WorkspaceError as e:
+        set_status(job, "failed", error=e.as_dict())
+    except Exception as e:
+        logger.exception(f"Workspace job {job_id} failed")
+        set_status(job, "failed", error={"error": str(e)})
+    else:
+        set_status(
+            job, "running",
+            error={},
+            url=result["url"],
+            port=str(result["port"]),
+            source=result["source"],
+            duration_ms=int((time.monotonic() - started) * 1000),
+        )
+        record_activity(job.user, container_name_for(job.user))
+        if result["source"] != "existing":
+            sync_gateway_safely()
+
+
+runner = JobRunner(
+    "workspace-job",
+    provision_job,
+    workers_setting="WORKSPACE_JOB_WORKERS",
+    eager_setting="WORKSPACE_JOBS_EAGER",
+    stale_setting="WORKSPACE_JOB_STALE_SECONDS",
+)
+
+
+def _can_wait(job):
+    if settings.WORKSPACE_ADMISSION_POLICY != "queue":
+        return False
+    waited = (timezone.now() - job.created_at).total_seconds()
+    return waited + settings.WORKSPACE_ADMISSION_RETRY_SECONDS <= settings.WORKSPACE_ADMISSION_MAX_WAIT
+
+
+def _retry_later(job):
+    """Try admission again after WORKSPACE_ADMISSION_RETRY_SECONDS"""
+    if runner.eager:
+        # Nothing runs in the background; the next create_workspace call retries
+        return
+    timer = threading.Timer(settings.WORKSPACE_ADMISSION_RETRY_SECONDS, lambda: runner.submit(job.pk))
+    timer.daemon = True
+    timer.start()
+
+
+def enqueue_workspace_job(user, executor=None):
+    """
+    Return the user's in-flight job, or queue a new one
+
+    A workspace that is already running is answered with an unsaved job
+    (no id or status URL), so repeated launches do not add rows.
+
+    Jobs that stopped updating (lost to a worker restart) are failed and
+    replaced rather than reused.
+
+    Args:
+        user: Workspace owner
+        executor: Pool to run the job on (defaults to the shared job pool)
+    """
+    with transaction.atomic():
+        # Serialise concurrent requests from the same user on their row
+        type(user).objects.select_for_update().filter(pk=user.pk).first()
+
+        jobs = WorkspaceJob.objects.filter(user=user)
+        runner.fail_stale(jobs, {"error": "Provisioning job timed out"})
+
+        job = jobs.filter(status__in=WorkspaceJob.ACTIVE_STATUSES).first()
+        if job and job.status == "waiting" and runner.eager:
+            # Eager mode has no retry timer, so a new request is the retry
+            runner.dispatch(job, executor)
+        if job:
+            return job
+
+        # Already running: answer from the state cache without a background job.
+        # Nothing was provisioned, so the answer is not stored as a job.
+        result = running_workspace(user)
+        if result:
+            now = timezone.now()
+            touch_activity(user, container_name_for(user))
+            return WorkspaceJob(
+                id=None,
+                user=user,
+                status="running",
+                url=result["url"],
+                port=str(result["port"]),
+                source=result["source"],
+                duration_ms=0,
+                created_at=now,
+                updated_at=now,
+                finished_at=now,
+            )
+
+        job = WorkspaceJob.objects.create(user=user)
+        runner.dispatch(job, executor)
+    return job
+
+
+def prune_workspace_jobs(days=None):
+    """Delete finished jobs older than WORKSPACE_JOB_RETENTION_DAYS"""
+    days = settings.WORKSPACE_JOB_RETENTION_DAYS if days is None else days
+    deleted, _ = WorkspaceJob.objects.filter(
+        status__in=WorkspaceJob.FINISHED_STATUSES,
+        finished_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
+
+
+def cohort_students(trainer=None, track=None):
+    """Active students assigned to `trainer` and/or on `track`"""
+    students = get_user_model().objects.filter(role="student", is_active=True)
+    if trainer is not None:
+        students = students.filter(assigned_trainer=trainer)
+    if track:
+        students = students.filter(track=track)
+    return students.order_by("id")
+
+
+def provision_cohort(users, concurrency=None):
+    """
+    Provision workspaces for many students ahead of time, at most
+    `concurrency` (default WORKSPACE_JOB_WORKERS) at once
+
+    Blocks until every job has run. Jobs left waiting for capacity keep
+    retrying in the background.
+
+    Returns:
+        The WorkspaceJob of each user, in order (unsaved for workspaces
+        that were already running)
+    """
+    concurrency = concurrency or settings.WORKSPACE_JOB_WORKERS
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="workspace-cohort") as executor:
+        jobs = [enqueue_workspace_job(user, executor=executor) for user in users]
+    for job in jobs:
+        # Already running workspaces are answered with an unsaved job
+        if job.pk is not None:
+            job.refresh_from_db()
+    return jobs
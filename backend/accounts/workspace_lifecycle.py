@@ -0,0 +1,195 @@
+"""
+Idle workspace reaping.
+
+Workspace containers run with restart policy unless-stopped and would
+otherwise live forever. The reaper stops or pauses containers whose last
+activity is older than the idle timeout; provision_workspace resumes them on
+the student's next create_workspace call. Activity is the later of the last
+provisioning request and code-server's own heartbeat (/healthz), read by name
+on the shared network for local containers and through the host's address and
+published port for containers on other Docker hosts.
+"""
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Workspace
+from .workspace_pool import POOL_NAME_PREFIX
+from .workspace_service import LOCAL_HOST, docker_hosts, get_docker_client
+
+logger = logging.getLogger(__name__)
+
+WORKSPACE_NAME_PREFIX = "workspace_"
+HEARTBEAT_TIMEOUT = 2
+CODE_SERVER_PORT = 8080
+# Far below any idle timeout, so throttled activity never lets a workspace be reaped
+ACTIVITY_INTERVAL = 60
+
+
+def record_activity(user, container_name, state="running"):
+    """Mark the user's workspace as active now"""
+    now = timezone.now()
+    Workspace.objects.update_or_create(
+        user=user,
+        defaults={
+            "container_name": container_name,
+            "state": state,
+            "last_activity_at": now,
+            "suspended_at": None,
+        },
+    )
+
+
+def touch_activity(user, container_name):
+    """
+    record_activity at most once per ACTIVITY_INTERVAL seconds, for callers
+    that may run on every request
+    """
+    if cache.add(f"workspace:activity:{user.pk}", 1, ACTIVITY_INTERVAL):
+        record_activity(user, container_name)
+
+
+def heartbeat_url(host, container):
+    """
+    Where code-server's /healthz is reachable from the backend
+
+    Returns:
+        URL, or None for a container on another host without a published
+        port or a configured host address
+    """
+    if host == LOCAL_HOST:
+        return f"http://{container.name}:{CODE_SERVER_PORT}/healthz"
+    address = settings.WORKSPACE_DOCKER_HOSTS.get(host, {}).get("address")
+    bindings = (container.attrs.get("HostConfig", {}).get("PortBindings") or {}).get(f"{CODE_SERVER_PORT}/tcp")
+    if not address or not bindings:
+        return None
+    return f"http://{address}:{bindings[0]['HostPort']}/healthz"
+
+
+def code_server_heartbeat(url):
+    """
+    Last heartbeat reported by code-server at `url`
+
+    Returns:
+        Aware datetime, or None if the container cannot be reached
+    """
+    try:
+        response = requests.get(url, timeout=HEARTBEAT_TIMEOUT)
+        heartbeat = response.json().get("lastHeartbeat")
+    except (requests.RequestException, ValueError):
+        return None
+    if not heartbeat:
+        return None
+    return datetime.fromtimestamp(heartbeat / 1000, tz=dt_timezone.utc)
+
+
+def _started_at(container):
+    """Container start time, used when nothing else reports activity"""
+    started = container.attrs.get("State", {}).get("StartedAt", "")
+    try:
+        # Docker reports nanoseconds; fromisoformat accepts at most microseconds
+        return datetime.fromisoformat(started[:26].rstrip("Z") + "+00:00")
+    except ValueError:
+        return None
+
+
+def _memory_usage(container):
+    try:
+        stats = container.stats(stream=False)
+        return stats.get("memory_stats", {}).get("usage", 0) or 0
+    except Exception:
+        return 0
+
+
+def student_containers(client, status="running"):
+    """Student workspace containers (pool containers excluded)"""
+    containers = client.containers.list(filters={"name": WORKSPACE_NAME_PREFIX, "status": status})
+    return [
+        c for c in containers
+        if c.name.startswith(WORKSPACE_NAME_PREFIX) and not c.name.startswith(POOL_NAME_PREFIX)
+    ]
+
+
+def reap_idle_workspaces(timeout_minutes=None, action=None, dry_run=False):
+    """
+    Suspend workspaces idle for longer than the timeout
+
+    Args:
+        timeout_minutes: Idle threshold (defaults to WORKSPACE_IDLE_TIMEOUT_MINUTES)
+        action: "stop" or "pause" (defaults to WORKSPACE_IDLE_ACTION)
+        dry_run: Report what would be suspended without touching containers
+
+    Returns:
+        Dict with the suspended containers, total memory reclaimed in bytes,
+        and the containers on other hosts skipped because their heartbeat
+        could not be read
+    """
+    if timeout_minutes is None:
+        timeout_minutes = settings.WORKSPACE_IDLE_TIMEOUT_MINUTES
+    action = action or settings.WORKSPACE_IDLE_ACTION
+    if action not in ("stop", "pause"):
+        raise ValueError(f"Unsupported idle action: {action}")
+
+    report = {
+        "action": action, "dry_run": dry_run, "checked": 0, "suspended": [], "reclaimed_bytes": 0, "unreachable": [],
+    }
+    containers = []
+    for host in docker_hosts():
+        client = get_docker_client(host)
+        if client is not None:
+            containers.extend((host, container) for container in student_containers(client))
+
+    cutoff = timezone.now() - timedelta(minutes=timeout_minutes)
+    report["checked"] = len(containers)
+    workspaces = {
+        w.container_name: w
+        for w in Workspace.objects.filter(container_name__in=[c.name for _, c in containers])
+    }
+
+    for host, container in containers:
+        workspace = workspaces.get(container.name)
+        activity = [workspace.last_activity_at] if workspace and workspace.last_activity_at else []
+        url = heartbeat_url(host, container)
+        heartbeat = code_server_heartbeat(url) if url else None
+        if heartbeat:
+            activity.append(heartbeat)
+        elif host != LOCAL_HOST:
+            # last_activity_at only moves on launch, so it cannot tell an
+            # unreachable remote workspace that is in use from an idle one
+            report["unreachable"].append(container.name)
+            continue
+        last_activity = max(activity) if activity else _started_at(container)
+
+        if last_activity is None or last_activity >= cutoff:
+            continue
+
+        memory = _memory_usage(container)
+        if not dry_run:
+            try:
+                if action == "pause":
+                    container.pause()
+                else:
+                    container.stop()
+            except Exception as e:
+                logger.warning(f"Could not {action} {container.name}: {e}")
+                continue
+
+        report["suspended"].append({
+            "container": container.name,
+            "last_activity": last_activity.isoformat(),
+            "memory_bytes": memory,
+        })
+        # Paused containers keep their memory; only stopping gives it back
+        if action == "stop":
+            report["reclaimed_bytes"] += memory
+
+        if workspace and not dry_run:
+            workspace.state = "paused" if action == "pause" else "stopped"
+            workspace.suspended_at = timezone.now()
+            workspace.save(update_fields=["state", "suspended_at", "updated_at"])
+
+    return report
@@ -0,0 +1,183 @@
+"""
+Workspace resource usage metrics.
+
+collect_workspace_usage() reads one-shot container stats for every running
+student workspace on every Docker host, in parallel, and stores one
+WorkspaceUsageSample per container. Run it on an interval (the
+collect_workspace_metrics command) to build a time series per student; the
+reports below aggregate it for host sizing and for spotting workspaces that
+use far more than their share.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Min
+from django.utils import timezone
+
+from .models import Workspace, WorkspaceUsageSample
+from .workspace_lifecycle import student_containers
+from .workspace_service import docker_hosts, get_docker_client
+
+logger = logging.getLogger(__name__)
+
+
+def parse_stats(stats):
+    """
+    Sample fields from a Docker stats response
+
+    CPU is computed the way `docker stats` does, from the difference between
+    the current and previous readings that a non-streaming stats call returns.
+    """
+    cpu, precpu = stats.get("cpu_stats", {}), stats.get("precpu_stats", {})
+    cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - precpu.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    online_cpus = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    cpu_percent = cpu_delta / system_delta * online_cpus * 100 if cpu_delta > 0 and system_delta > 0 else 0.0
+
+    memory = stats.get("memory_stats", {})
+    details = memory.get("stats", {})
+    # Page cache the kernel can reclaim: inactive_file on cgroup v2, total_inactive_file on v1
+    cache = details.get("inactive_file", details.get("total_inactive_file", 0))
+
+    networks = (stats.get("networks") or {}).values()
+    block = (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []
+
+    return {
+        "cpu_percent": round(cpu_percent, 2),
+        "memory_bytes": max(memory.get("usage", 0) - cache, 0),
+        "memory_limit": memory.get("limit", 0),
+        "pids": stats.get("pids_stats", {}).get("current", 0),
+        "net_rx_bytes": sum(n.get("rx_bytes", 0) for n in networks),
+        "net_tx_bytes": sum(n.get("tx_bytes", 0) for n in networks),
+        "block_read_bytes": sum(e.get("value", 0) for e in block if e.get("op", "").lower() == "read"),
+        "block_write_bytes": sum(e.get("value", 0) for e in block if e.get("op", "").lower() == "write"),
+    }
+
+
+def _read_stats(container):
+    try:
+        return parse_stats(container.stats(stream=False))
+    except Exception as e:
+        logger.warning(f"Could not read stats of {container.name}: {e}")
+        return None
+
+
+def prune_usage_samples(days=None):
+    """Delete samples older than WORKSPACE_METRICS_RETENTION_DAYS"""
+    days = settings.WORKSPACE_METRICS_RETENTION_DAYS if days is None else days
+    deleted, _ = WorkspaceUsageSample.objects.filter(sampled_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
+
+
+def collect_workspace_usage():
+    """
+    Sample every running student workspace once
+
+    Each stats call blocks for about a second while Docker takes its second
+    CPU reading, so containers are sampled on WORKSPACE_METRICS_WORKERS threads.
+
+    Returns:
+        Number of samples stored
+    """
+    containers = []
+    for host in docker_hosts():
+        client = get_docker_client(host)
+        if client is not None:
+            containers.extend((host, container) for container in student_containers(client))
+    if not containers:
+        return 0
+
+    users = dict(
+        Workspace.objects.filter(container_name__in=[c.name for _, c in containers]).values_list(
+            "container_name", "user_id"
+        )
+    )
+    containers = [(host, c) for host, c in containers if c.name in users]
+
+    now = timezone.now()
+    with ThreadPoolExecutor(max_workers=settings.WORKSPACE_METRICS_WORKERS) as executor:
+        readings = executor.map(_read_stats, [c for _, c in containers])
+        samples = [
+            WorkspaceUsageSample(user_id=users[container.name], host=host, sampled_at=now, **reading)
+            for (host, container), reading in zip(containers, readings)
+            if reading is not None
+        ]
+    WorkspaceUsageSample.objects.bulk_create(samples)
+    return len(samples)
+
+
+def usage_report(hours=24, users=None):
+    """
+    Usage per student over the last `hours`, heaviest CPU users first
+
+    Args:
+        users: Restrict to these users (a queryset or list of ids)
+
+    Network and disk figures are counter growth over the window, so they
+    undercount for containers restarted within it.
+    """
+    since = timezone.now() - timedelta(hours=hours)
+    samples = WorkspaceUsageSample.objects.filter(sampled_at__gte=since)
+    if users is not None:
+        samples = samples.filter(user__in=users)
+
+    rows = samples.values("user_id", "user__email").annotate(
+        samples=Count("id"),
+        avg_cpu_percent=Avg("cpu_percent"),
+        max_cpu_percent=Max("cpu_percent"),
+        avg_memory_bytes=Avg("memory_bytes"),
+        max_memory_bytes=Max("memory_bytes"),
+        min_net_rx=Min("net_rx_bytes"),
+        max_net_rx=Max("net_rx_bytes"),
+        min_net_tx=Min("net_tx_bytes"),
+        max_net_tx=Max("net_tx_bytes"),
+        min_block_read=Min("block_read_bytes"),
+        max_block_read=Max("block_read_bytes"),
+        min_block_write=Min("block_write_bytes"),
+        max_block_write=Max("block_write_bytes"),
+        last_sampled_at=Max("sampled_at"),
+    ).order_by("-avg_cpu_percent")
+
+    students = [
+        {
+            "user_id": row["user_id"],
+            "email": row["user__email"],
+            "samples": row["samples"],
+            "avg_cpu_percent": round(row["avg_cpu_percent"], 2),
+            "max_cpu_percent": row["max_cpu_percent"],
+            "avg_memory_bytes": int(row["avg_memory_bytes"]),
+            "max_memory_bytes": row["max_memory_bytes"],
+            "net_rx_bytes": row["max_net_rx"] - row["min_net_rx"],
+            "net_tx_bytes": row["max_net_tx"] - row["min_net_tx"],
+            "block_read_bytes": row["max_block_read"] - row["min_block_read"],
+            "block_write_bytes": row["max_block_write"] - row["min_block_write"],
+            "last_sampled_at": row["last_sampled_at"],
+        }
+        for row in rows
+    ]
+
+    totals = samples.aggregate(
+        samples=Count("id"),
+        avg_cpu_percent=Avg("cpu_percent"),
+        avg_memory_bytes=Avg("memory_bytes"),
+        max_memory_bytes=Max("memory_bytes"),
+    )
+    return {
+        "window_hours": hours,
+        "students": len(students),
+        **totals,
+        "usage": students,
+    }
+
+
+def usage_series(user, hours=24):
+    """The user's samples over the last `hours`, oldest first"""
+    since = timezone.now() - timedelta(hours=hours)
+    return list(
+        WorkspaceUsageSample.objects.filter(user=user, sampled_at__gte=since).values(
+            "sampled_at", "host", "cpu_percent", "memory_bytes", "memory_limit", "pids",
+            "net_rx_bytes", "net_tx_bytes", "block_read_bytes", "block_write_bytes",
+        )
+    )
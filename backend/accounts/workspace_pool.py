@@ -0,0 +1,204 @@
+"""
+Warm pool of pre-started code-server containers.
+
+Pool containers run against their own directory under
+WORKSPACE_BASE_PATH/pool. Claiming one renames the container to the student's
+workspace name and links WORKSPACE_BASE_PATH/<user id> to the slot directory,
+so the container never restarts and its bind mount source stays valid across
+later restarts. Students who already have a workspace directory always go
+through the normal path so their files are kept.
+"""
+import logging
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Q
+from django.utils import timezone
+
+from .models import WorkspaceJob, WorkspacePoolSlot
+from .workspace_images import image_for
+from .workspace_ports import allocate_port, release_port, set_container_id, transfer_port
+from .workspace_quota import has_capacity, resource_profile
+from .workspace_service import (
+    container_name_for, ensure_image, get_docker_client, prepare_volume,
+    run_workspace_container, user_volume_path,
+)
+
+logger = logging.getLogger(__name__)
+
+POOL_NAME_PREFIX = "workspace_pool_"
+REPLENISH_LOCK_KEY = "workspace:pool:replenish"
+REPLENISH_LOCK_TIMEOUT = 300
+
+
+def pool_directory():
+    return os.path.join(settings.WORKSPACE_BASE_PATH, "pool")
+
+
+def claim_pool_slot(client, user):
+    """
+    Hand an available pool container to `user`
+
+    Returns:
+        The claimed WorkspacePoolSlot, or None on a pool miss
+    """
+    if settings.WORKSPACE_POOL_SIZE <= 0:
+        return None
+
+    user_volume = user_volume_path(user)
+    if os.path.lexists(user_volume):
+        return None
+
+    with transaction.atomic():
+        slot = WorkspacePoolSlot.objects.select_for_update(skip_locked=True).filter(
+            status="available"
+        ).first()
+        if slot is None:
+            return None
+        slot.status = "claimed"
+        slot.user = user
+        slot.claimed_at = timezone.now()
+        slot.save()
+
+    try:
+        os.symlink(os.path.relpath(slot.volume_path, settings.WORKSPACE_BASE_PATH), user_volume)
+        client.containers.get(slot.container_id).rename(container_name_for(user))
+        transfer_port(int(slot.port), user, container_name_for(user))
+    except Exception as e:
+        logger.warning(f"Could not claim pool slot {slot.name}: {e}")
+        if os.path.islink(user_volume):
+            os.unlink(user_volume)
+        discard_slot(client, slot)
+        return None
+
+    schedule_replenish()
+    return slot
+
+
+def discard_slot(client, slot):
+    try:
+        client.containers.get(slot.container_id or slot.name).remove(force=True)
+    except Exception as e:
+        logger.warning(f"Could not remove pool container {slot.name}: {e}")
+    if slot.port:
+        release_port(int(slot.port))
+    slot.delete()
+
+
+def create_pool_slot(client):
+    """Start one unassigned pool container"""
+    token = uuid.uuid4().hex[:12]
+    slot = WorkspacePoolSlot.objects.create(
+        name=f"{POOL_NAME_PREFIX}{token}",
+        volume_path=os.path.join(pool_directory(), token),
+    )
+    port = None
+    try:
+        image = ensure_image(client)
+        port = allocate_port(slot.name)
+        prepare_volume(slot.volume_path)
+        container = run_workspace_container(client, slot.name, slot.volume_path, port, resource_profile(), image=image)
+    except Exception:
+        if port is not None:
+            release_port(port)
+        slot.delete()
+        raise
+
+    set_container_id(port, container.id)
+    slot.container_id = container.id
+    slot.image_digest = image
+    slot.port = str(port)
+    slot.status = "available"
+    slot.save()
+    return slot
+
+
+def replenish_pool():
+    """
+    Start containers until the pool holds WORKSPACE_POOL_SIZE unclaimed slots
+
+    Returns:
+        Number of containers started
+    """
+    client = get_docker_client()
+    if client is None or settings.WORKSPACE_POOL_SIZE <= 0:
+        return 0
+
+    # One replenisher at a time across processes
+    if not cache.add(REPLENISH_LOCK_KEY, os.getpid(), REPLENISH_LOCK_TIMEOUT):
+        return 0
+
+    created = 0
+    try:
+        # Slots left warming by a crashed replenisher never become available
+        stale = timezone.now() - timedelta(seconds=REPLENISH_LOCK_TIMEOUT)
+        for slot in WorkspacePoolSlot.objects.filter(status="warming", created_at__lt=stale):
+            discard_slot(client, slot)
+
+        # Idle slots on an image that is no longer current are replaced
+        current = image_for()
+        if current:
+            for slot in WorkspacePoolSlot.objects.filter(status="available").exclude(image_digest=current):
+                discard_slot(client, slot)
+
+        unclaimed = WorkspacePoolSlot.objects.exclude(status="claimed").count()
+        for _ in range(settings.WORKSPACE_POOL_SIZE - unclaimed):
+            # Never let idle pool containers crowd out real workspaces
+            if not has_capacity(client, resource_profile()):
+                logger.warning("Workspace host at capacity, pool not refilled")
+                break
+            create_pool_slot(client)
+            created += 1
+    finally:
+        cache.delete(REPLENISH_LOCK_KEY)
+    return created
+
+
+def schedule_replenish():
+    """Refill the pool in the background after a claim"""
+    from .workspace_jobs import runner
+    if runner.eager:
+        return
+    transaction.on_commit(lambda: runner.executor().submit(_replenish_safely))
+
+
+def _replenish_safely():
+    try:
+        replenish_pool()
+    except Exception:
+        logger.exception("Workspace pool replenish failed")
+
+
+def pool_metrics(hours=24):
+    """Pool occupancy plus hit rate and claim latency over the last `hours`"""
+    slots = WorkspacePoolSlot.objects.aggregate(
+        available=Count("id", filter=Q(status="available")),
+        warming=Count("id", filter=Q(status="warming")),
+        claimed=Count("id", filter=Q(status="claimed")),
+    )
+
+    since = timezone.now() - timedelta(hours=hours)
+    jobs = WorkspaceJob.objects.filter(created_at__gte=since, source__in=["pool", "cold"]).aggregate(
+        hits=Count("id", filter=Q(source="pool")),
+        misses=Count("id", filter=Q(source="cold")),
+        avg_claim_ms=Avg("duration_ms", filter=Q(source="pool")),
+        max_claim_ms=Max("duration_ms", filter=Q(source="pool")),
+        avg_cold_ms=Avg("duration_ms", filter=Q(source="cold")),
+    )
+    requests = jobs["hits"] + jobs["misses"]
+
+    return {
+        "target_size": settings.WORKSPACE_POOL_SIZE,
+        **slots,
+        "window_hours": hours,
+        "hits": jobs["hits"],
+        "misses": jobs["misses"],
+        "hit_rate": round(jobs["hits"] / requests, 3) if requests else None,
+        "avg_claim_ms": jobs["avg_claim_ms"],
+        "max_claim_ms": jobs["max_claim_ms"],
+        "avg_cold_start_ms": jobs["avg_cold_ms"],
+    }
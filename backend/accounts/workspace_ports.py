@@ -0,0 +1,107 @@
+"""
+Host port leases for workspace containers.
+
+Ports come from WORKSPACE_PORT_RANGE_START..END and are recorded in
+WorkspacePortLease, so concurrent provisioning never hands out the same port
+and the port of an existing workspace is a single indexed read. Released
+ports are reused before the range grows.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import WorkspacePortLease
+from .workspace_service import WorkspaceError
+
+ALLOCATE_ATTEMPTS = 5
+
+
+def _in_range(queryset):
+    return queryset.filter(port__gte=settings.WORKSPACE_PORT_RANGE_START, port__lte=settings.WORKSPACE_PORT_RANGE_END)
+
+
+def allocate_port(container_name, user=None):
+    """
+    Lease a host port for `container_name`
+
+    A user keeps the port they already hold.
+
+    Raises:
+        WorkspaceError: If every port in the range is leased
+    """
+    fields = {"container_name": container_name, "container_id": "", "state": "leased", "leased_at": timezone.now()}
+    if user is not None:
+        lease = WorkspacePortLease.objects.filter(user=user).first()
+        if lease:
+            WorkspacePortLease.objects.filter(pk=lease.pk).update(**fields)
+            return lease.port
+
+    with transaction.atomic():
+        lease = _in_range(WorkspacePortLease.objects.select_for_update(skip_locked=True)).filter(
+            state="released"
+        ).order_by("port").first()
+        if lease:
+            WorkspacePortLease.objects.filter(pk=lease.pk).update(user=user, **fields)
+            return lease.port
+
+    for _ in range(ALLOCATE_ATTEMPTS):
+        highest = _in_range(WorkspacePortLease.objects).aggregate(port=Max("port"))["port"]
+        port = highest + 1 if highest is not None else settings.WORKSPACE_PORT_RANGE_START
+        if port > settings.WORKSPACE_PORT_RANGE_END:
+            break
+        try:
+            # Another process taking the same port trips the unique constraint; try the next one
+            with transaction.atomic():
+                WorkspacePortLease.objects.create(port=port, user=user, **fields)
+            return port
+        except IntegrityError:
+            continue
+
+    raise WorkspaceError(
+        "No workspace ports available",
+        message="All workspace ports are in use. Please try again in a few minutes.",
+    )
+
+
+def leased_port(user):
+    """Port of the user's workspace, or None if they hold no lease"""
+    return WorkspacePortLease.objects.filter(user=user, state="leased").values_list("port", flat=True).first()
+
+
+def adopt_port(user, container_name, port):
+    """
+    Record the published port of a container created before leases existed
+
+    Returns:
+        The port, or None when there is none, it is outside the range, or
+        someone else holds its lease
+    """
+    if port is None or not settings.WORKSPACE_PORT_RANGE_START <= port <= settings.WORKSPACE_PORT_RANGE_END:
+        return None
+    with transaction.atomic():
+        if WorkspacePortLease.objects.select_for_update().filter(port=port, state="leased").exclude(user=user).exists():
+            return None
+        WorkspacePortLease.objects.filter(user=user).exclude(port=port).update(user=None, state="released")
+        WorkspacePortLease.objects.update_or_create(
+            port=port,
+            defaults={"user": user, "container_name": container_name, "state": "leased", "leased_at": timezone.now()},
+        )
+    return port
+
+
+def set_container_id(port, container_id):
+    WorkspacePortLease.objects.filter(port=port).update(container_id=container_id)
+
+
+def transfer_port(port, user, container_name):
+    """Hand a pool container's lease to the student who claimed it"""
+    with transaction.atomic():
+        WorkspacePortLease.objects.filter(user=user).exclude(port=port).update(user=None, state="released")
+        WorkspacePortLease.objects.filter(port=port).update(user=user, container_name=container_name)
+
+
+def release_port(port):
+    WorkspacePortLease.objects.filter(port=port).update(
+        user=None, container_name="", container_id="", state="released"
+    )
@@ -0,0 +1,167 @@
+"""
+Per-workspace resource limits and host admission control.
+
+Every workspace container is created with the memory/CPU/PID limits of the
+student's track profile. Before a container is created or started, the
+admission controller adds its limits to those already committed (workspaces
+starting, running or paused, plus unclaimed pool containers) and refuses when
+the host's capacity, less the backend's reservation, would be exceeded.
+Reservations are recorded on the Workspace row under a cache lock so
+concurrent admissions across processes see each other. Capacity is tracked
+per Docker host; the warm pool only runs on the local host.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from docker.utils import parse_bytes
+
+from .models import Workspace, WorkspacePoolSlot
+from .workspace_service import LOCAL_HOST, WorkspaceError, container_name_for, docker_hosts, get_docker_client
+
+ADMISSION_LOCK_KEY = "workspace:admission"
+ADMISSION_LOCK_TIMEOUT = 30
+ADMISSION_LOCK_WAIT = 5
+HOST_INFO_TTL = 300
+
+# Host name -> {"expires", "memory", "nano_cpus"} from docker info
+_host_info = {}
+
+
+class WorkspaceCapacityError(WorkspaceError):
+    """The Docker host cannot fit another workspace right now"""
+
+    def __init__(self):
+        super().__init__(
+            "Workspace host is at capacity",
+            message="All workspace resources are in use. Please try again in a few minutes.",
+        )
+
+
+def _bytes(value):
+    return parse_bytes(value) if isinstance(value, str) else int(value)
+
+
+def resource_profile(user=None):
+    """
+    Container limits for the user's track
+
+    Returns:
+        Dict with mem_limit (bytes), nano_cpus and pids_limit
+    """
+    profiles = settings.WORKSPACE_RESOURCE_PROFILES
+    profile = profiles.get(getattr(user, "track", None) or "default", profiles["default"])
+    return {
+        "mem_limit": _bytes(profile["mem_limit"]),
+        "nano_cpus": int(profile["nano_cpus"]),
+        "pids_limit": int(profile["pids_limit"]),
+    }
+
+
+def host_capacity(client, host=LOCAL_HOST):
+    """Memory (bytes) and CPU (nano CPUs) available to workspaces on the host"""
+    info = _host_info.get(host)
+    if info is None or info["expires"] < time.monotonic():
+        docker_info = client.info()
+        info = _host_info[host] = {
+            "memory": docker_info.get("MemTotal", 0),
+            "nano_cpus": docker_info.get("NCPU", 0) * 1_000_000_000,
+            "expires": time.monotonic() + HOST_INFO_TTL,
+        }
+
+    memory = info["memory"] - _bytes(settings.WORKSPACE_HOST_RESERVED_MEMORY)
+    return (
+        int(max(memory, 0) * settings.WORKSPACE_MEMORY_OVERCOMMIT),
+        int(info["nano_cpus"] * settings.WORKSPACE_CPU_OVERCOMMIT),
+    )
+
+
+def committed_resources(exclude_user=None, host=LOCAL_HOST):
+    """Memory and CPU limits already promised to workspaces and the warm pool on the host"""
+    workspaces = Workspace.objects.filter(host=host, state__in=Workspace.COMMITTED_STATES)
+    if exclude_user is not None:
+        workspaces = workspaces.exclude(user=exclude_user)
+    totals = workspaces.aggregate(memory=Sum("mem_limit"), nano_cpus=Sum("nano_cpus"))
+
+    unclaimed = 0
+    if host == LOCAL_HOST:
+        unclaimed = WorkspacePoolSlot.objects.exclude(status="claimed").count()
+    pool = resource_profile()
+    return (
+        (totals["memory"] or 0) + unclaimed * pool["mem_limit"],
+        (totals["nano_cpus"] or 0) + unclaimed * pool["nano_cpus"],
+    )
+
+
+def host_load(client, profile, exclude_user=None, host=LOCAL_HOST):
+    """
+    Fraction of the host's memory or CPU (whichever is fuller) in use once
+    `profile` is added; above 1 the workspace does not fit
+    """
+    memory, nano_cpus = host_capacity(client, host)
+    committed_memory, committed_cpus = committed_resources(exclude_user, host)
+    if not memory or not nano_cpus:
+        return float("inf")
+    return max(
+        (committed_memory + profile["mem_limit"]) / memory,
+        (committed_cpus + profile["nano_cpus"]) / nano_cpus,
+    )
+
+
+def has_capacity(client, profile, exclude_user=None, host=LOCAL_HOST):
+    return host_load(client, profile, exclude_user, host) <= 1
+
+
+def admit_workspace(client, user, profile, host=LOCAL_HOST):
+    """
+    Reserve capacity on `host` for the user's workspace
+
+    Raises:
+        WorkspaceCapacityError: If the host is saturated
+    """
+    deadline = time.monotonic() + ADMISSION_LOCK_WAIT
+    while not cache.add(ADMISSION_LOCK_KEY, 1, ADMISSION_LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            raise WorkspaceCapacityError()
+        time.sleep(0.05)
+    try:
+        if not has_capacity(client, profile, exclude_user=user, host=host):
+            raise WorkspaceCapacityError()
+        reserve_workspace(user, profile, host=host)
+    finally:
+        cache.delete(ADMISSION_LOCK_KEY)
+
+
+def reserve_workspace(user, profile, state="starting", host=LOCAL_HOST):
+    Workspace.objects.update_or_create(
+        user=user,
+        defaults={"container_name": container_name_for(user), "host": host, "state": state, **profile},
+    )
+
+
+def release_workspace(user):
+    """Give back a reservation whose container never started"""
+    Workspace.objects.filter(user=user, state="starting").update(state="stopped")
+
+
+def capacity_report():
+    """Capacity and commitments of every reachable Docker host"""
+    hosts = []
+    for host in docker_hosts():
+        client = get_docker_client(host)
+        if client is None:
+            hosts.append({"host": host, "available": False})
+            continue
+        memory, nano_cpus = host_capacity(client, host)
+        committed_memory, committed_cpus = committed_resources(host=host)
+        hosts.append({
+            "host": host,
+            "available": True,
+            "memory_capacity": memory,
+            "memory_committed": committed_memory,
+            "cpu_capacity": nano_cpus / 1_000_000_000,
+            "cpu_committed": committed_cpus / 1_000_000_000,
+            "workspaces": Workspace.objects.filter(host=host, state__in=Workspace.COMMITTED_STATES).count(),
+        })
+    return {"hosts": hosts, "policy": settings.WORKSPACE_ADMISSION_POLICY}
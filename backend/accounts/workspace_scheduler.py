@@ -0,0 +1,67 @@
+"""
+Placement of workspaces across Docker hosts.
+
+A workspace stays on the host recorded on its Workspace row, since its
+container and volume live there. New workspaces go to the least-loaded
+reachable host, measured as the fuller of memory and CPU once the new
+workspace's limits are added. Placement is optimistic; admit_workspace
+re-checks the chosen host under the admission lock, and a lost race surfaces
+as WorkspaceCapacityError so the job waits and is placed again.
+"""
+import logging
+
+from .models import Workspace
+from .workspace_quota import WorkspaceCapacityError, admit_workspace, host_load
+from .workspace_service import WorkspaceError, docker_hosts, get_docker_client
+
+logger = logging.getLogger(__name__)
+
+
+def place_workspace(user, profile):
+    """
+    Host for the user's workspace
+
+    Raises:
+        WorkspaceCapacityError: If no reachable host has room
+    """
+    # Once a volume exists the workspace is pinned to its host
+    placed = Workspace.objects.filter(user=user, volume_initialized_at__isnull=False).values_list(
+        "host", flat=True
+    ).first()
+    if placed in docker_hosts():
+        return placed
+
+    loads = []
+    for host in docker_hosts():
+        client = get_docker_client(host)
+        if client is None:
+            continue
+        try:
+            load = host_load(client, profile, exclude_user=user, host=host)
+        except Exception as e:
+            logger.warning(f"Could not read load of Docker host {host}: {e}")
+            continue
+        if load <= 1:
+            loads.append((load, host))
+
+    if not loads:
+        raise WorkspaceCapacityError()
+    return min(loads)[1]
+
+
+def schedule_workspace(user, profile):
+    """
+    Place the user's workspace and reserve capacity for it there
+
+    Returns:
+        Name of the chosen host
+    """
+    host = place_workspace(user, profile)
+    client = get_docker_client(host)
+    if client is None:
+        raise WorkspaceError(
+            "Workspace host unavailable",
+            message="The server holding your workspace is not reachable. Please try again shortly.",
+        )
+    admit_workspace(client, user, profile, host=host)
+    return host
@@ -0,0 +1,369 @@
+"""
+Workspace provisioning for code-server containers.
+
+The Docker work that used to run inside the request lives here so it can be
+driven from background jobs. provision_workspace() reports its stages through
+a callback so callers can surface queued/pulling/creating/running to clients.
+"""
+import logging
+import os
+import shlex
+import subprocess
+import threading
+from pathlib import Path
+
+import docker
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Workspace
+
+logger = logging.getLogger(__name__)
+
+# UID of the coder user in the code-server image
+CODER_UID = 1000
+
+# The daemon behind /var/run/docker.sock, which shares WORKSPACE_BASE_PATH with the backend
+LOCAL_HOST = "local"
+
+_client = None
+_remote_clients = {}
+_client_lock = threading.Lock()
+
+
+class WorkspaceError(Exception):
+    """Provisioning failure with a user-facing message"""
+
+    def __init__(self, error, message="", details=""):
+        super().__init__(error)
+        self.error = error
+        self.message = message
+        self.details = details
+
+    def as_dict(self):
+        data = {"error": self.error}
+        if self.message:
+            data["message"] = self.message
+        if self.details:
+            data["details"] = self.details
+        return data
+
+
+def docker_hosts():
+    """Names of the Docker hosts workspaces can be placed on"""
+    return [LOCAL_HOST, *settings.WORKSPACE_DOCKER_HOSTS]
+
+
+def get_docker_client(host=LOCAL_HOST):
+    """
+    Return the shared Docker client for `host`, or None when it is not reachable
+
+    Clients are safe to share between threads; each HTTP connection pool
+    holds up to WORKSPACE_DOCKER_POOL_SIZE connections to its daemon.
+    """
+    global _client
+    with _client_lock:
+        if host == LOCAL_HOST:
+            if _client is None:
+                # Only connect to Docker if available (prevents crash on Render)
+                try:
+                    _client = docker.from_env(max_pool_size=settings.WORKSPACE_DOCKER_POOL_SIZE)
+                except Exception as e:
+                    logger.warning(f"Docker not available: {e}")
+                    return None
+            return _client
+
+        if host not in _remote_clients:
+            try:
+                _remote_clients[host] = docker.DockerClient(
+                    base_url=settings.WORKSPACE_DOCKER_HOSTS[host]["url"],
+                    max_pool_size=settings.WORKSPACE_DOCKER_POOL_SIZE,
+                )
+            except Exception as e:
+                logger.warning(f"Docker host {host} not available: {e}")
+                return None
+        return _remote_clients[host]
+
+
+def workspace_host(user):
+    """Host the user's workspace lives on (the local host until one is placed)"""
+    host = Workspace.objects.filter(user=user).values_list("host", flat=True).first()
+    return host if host in docker_hosts() else LOCAL_HOST
+
+
+def container_name_for(user):
+    return f"workspace_{user.id}"
+
+
+def workspace_url(user, port):
+    if settings.WORKSPACE_GATEWAY_URL:
+        return f"{settings.WORKSPACE_GATEWAY_URL.rstrip('/')}/{user.id}/"
+
+    # Use localhost URL for development
+    use_localhost = os.getenv("DEBUG", "False").lower() == "true"
+    if use_localhost:
+        return f"http://localhost:{port}"
+    return f"http://workspace-{user.id}.apranova.com"
+
+
+def _published_port(container):
+    """Host port code-server is published on, or None (gateway mode publishes none)"""
+    bindings = (container.attrs['HostConfig'].get('PortBindings') or {}).get('8080/tcp')
+    if bindings and bindings[0].get('HostPort'):
+        return int(bindings[0]['HostPort'])
+    return None
+
+
+def _noop_stage(stage):
+    pass
+
+
+def ensure_image(client, user=None):
+    """
+    Make sure the workspace image is available locally, pulling it if needed
+
+    Returns:
+        Image id to run: the pinned image for `user` when it is on the host,
+        otherwise whatever WORKSPACE_IMAGE currently resolves to
+    """
+    from .workspace_images import image_for
+
+    pinned = image_for(user)
+    if pinned:
+        try:
+            return client.images.get(pinned).id
+        except docker.errors.ImageNotFound:
+            logger.warning(f"Pinned workspace image {pinned} missing, falling back to {settings.WORKSPACE_IMAGE}")
+
+    image = settings.WORKSPACE_IMAGE
+    try:
+        return client.images.get(image).id
+    except docker.errors.ImageNotFound:
+        try:
+            return client.images.pull(image).id
+        except docker.errors.APIError:
+            raise WorkspaceError(
+                "Code-server image not found",
+                message=f"The {image} image needs to be built first.",
+                details=f"Run: docker build -t {image} ./backend/apra-nova-code-server",
+            )
+
+
+def user_volume_path(user):
+    return f"{settings.WORKSPACE_BASE_PATH}/{user.id}"
+
+
+def prepare_volume(user_volume, initialized=False):
+    """
+    Make sure a workspace directory exists and is writable by the coder user
+
+    A new directory is empty, so only the directory itself is chowned. The
+    recursive walk is kept for directories created before initialization was
+    recorded, and runs once for those.
+
+    Args:
+        user_volume: Directory to bind-mount into the container
+        initialized: The directory is already known to be set up
+    """
+    path = Path(user_volume)
+    if initialized and path.is_dir():
+        return user_volume
+
+    try:
+        path.mkdir(parents=True)
+    except FileExistsError:
+        # Set permissions for coder user (UID 1000 in code-server container)
+        # This ensures the coder user can write to the workspace
+        subprocess.run(["chown", "-R", f"{CODER_UID}:{CODER_UID}", user_volume], check=False)
+        subprocess.run(["chmod", "-R", "755", user_volume], check=False)
+        return user_volume
+
+    try:
+        os.chown(path, CODER_UID, CODER_UID)
+        path.chmod(0o755)
+    except OSError as e:
+        logger.warning(f"Could not set ownership of {user_volume}: {e}")
+    return user_volume
+
+
+def prepare_host_volume(client, host, user_volume, initialized=False):
+    """
+    prepare_volume() on the host the workspace lives on
+
+    Remote hosts do not share WORKSPACE_BASE_PATH with the backend, so the
+    directory is created there by a short-lived root container.
+    """
+    if host == LOCAL_HOST:
+        return prepare_volume(user_volume, initialized)
+    if not initialized:
+        path = shlex.quote(user_volume)
+        client.containers.run(
+            settings.WORKSPACE_IMAGE,
+            entrypoint=["sh", "-c", f"mkdir -p {path} && chown {CODER_UID}:{CODER_UID} {path} && chmod 755 {path}"],
+            user="root",
+            volumes={settings.WORKSPACE_BASE_PATH: {"bind": settings.WORKSPACE_BASE_PATH, "mode": "rw"}},
+            remove=True,
+        )
+    return user_volume
+
+
+def volume_initialized(user):
+    return Workspace.objects.filter(user=user, volume_initialized_at__isnull=False).exists()
+
+
+def mark_volume_initialized(user):
+    Workspace.objects.filter(user=user).update(volume_initialized_at=timezone.now())
+
+
+def run_workspace_container(client, name, user_volume, port, profile, host=LOCAL_HOST, image=None):
+    """
+    Start a code-server container serving `user_volume` with the profile's limits
+
+    Behind the routing gateway nginx reaches local containers over
+    WORKSPACE_NETWORK, so only containers on remote hosts publish their port.
+    """
+    publish = not settings.WORKSPACE_GATEWAY_URL or host != LOCAL_HOST
+    return client.containers.run(
+        image or settings.WORKSPACE_IMAGE,
+        name=name,
+        detach=True,
+        ports={"8080/tcp": port} if publish else {},
+        environment={
+            "PASSWORD": "",  # Clear the password - this disables password authentication
+        },
+        entrypoint=["/usr/bin/entrypoint.sh", "--auth", "none", "--bind-addr", "0.0.0.0:8080", "."],  # Override entrypoint with --auth none
+        volumes={user_volume: {"bind": "/home/coder/project", "mode": "rw"}},
+        network=settings.WORKSPACE_NETWORK,  # Use the same network as other containers
+        restart_policy={"Name": "unless-stopped"},
+        mem_limit=profile["mem_limit"],
+        nano_cpus=profile["nano_cpus"],
+        pids_limit=profile["pids_limit"],
+    )
+
+
+def running_workspace(user):
+    """
+    The user's workspace if the state cache knows it is running
+
+    Answered from memory and the port lease, without a Docker round-trip.
+
+    Returns:
+        Result dict as from provision_workspace, or None
+    """
+    from .workspace_ports import leased_port
+    from .workspace_state import container_state
+
+    if container_state(container_name_for(user)) != "running":
+        return None
+    port = leased_port(user)
+    if port is None:
+        return None
+    return {"url": workspace_url(user, port), "port": port, "status": "running", "source": "existing"}
+
+
+def provision_workspace(user, on_stage=_noop_stage):
+    """
+    Start the user's code-server container, creating it if needed
+
+    Args:
+        user: Workspace owner
+        on_stage: Called with "restoring", "pulling", "creating" or "starting" as work progresses
+
+    Returns:
+        Dict with url, port, status ("running", "started" or "created") and
+        source ("existing", "pool" or "cold")
+
+    Raises:
+        WorkspaceError: If Docker is unavailable or the image is missing
+        WorkspaceCapacityError: If no host can admit another workspace
+    """
+    from .workspace_pool import claim_pool_slot
+    from .workspace_ports import adopt_port, allocate_port, leased_port, release_port, set_container_id
+    from .workspace_quota import admit_workspace, release_workspace, reserve_workspace, resource_profile
+    from .workspace_scheduler import schedule_workspace
+    from .workspace_snapshots import restore_if_archived
+
+    host = workspace_host(user)
+    client = get_docker_client(host)
+    if client is None and host == LOCAL_HOST:
+        raise WorkspaceError(
+            "Workspace feature not available",
+            message="Docker is not accessible from the backend container. This feature requires Docker-in-Docker configuration with proper permissions.",
+            details="Please contact your administrator to enable workspace provisioning.",
+        )
+    if client is None:
+        raise WorkspaceError(
+            "Workspace host unavailable",
+            message="The server holding your workspace is not reachable. Please try again shortly.",
+        )
+
+    result = running_workspace(user)
+    if result:
+        return result
+
+    container_name = container_name_for(user)
+    profile = resource_profile(user)
+    try:
+        # Check if container already exists
+        container = client.containers.get(container_name)
+        port = (
+            leased_port(user)
+            or adopt_port(user, container_name, _published_port(container))
+            or allocate_port(container_name, user=user)
+        )
+
+        if container.status == "running":
+            return {"url": workspace_url(user, port), "port": port, "status": "running", "source": "existing"}
+
+        # Resume workspaces suspended by the idle reaper; paused ones still hold their resources
+        if container.status == "paused":
+            on_stage("starting")
+            container.unpause()
+        else:
+            admit_workspace(client, user, profile, host=host)
+            on_stage("starting")
+            try:
+                container.start()
+            except Exception:
+                release_workspace(user)
+                raise
+        return {"url": workspace_url(user, port), "port": port, "status": "started", "source": "existing"}
+    except docker.errors.NotFound:
+        pass
+
+    # Archived workspaces get their files back before anything else; the
+    # restored volume also keeps them out of the warm pool
+    restored = restore_if_archived(user, on_stage)
+
+    # The warm pool runs on the local host only
+    local_client = get_docker_client()
+    slot = claim_pool_slot(local_client, user) if local_client is not None else None
+    if slot is not None:
+        # Pool containers run with the default profile and were admitted when created
+        reserve_workspace(user, resource_profile())
+        mark_volume_initialized(user)
+        Workspace.objects.filter(user=user).update(image_digest=slot.image_digest)
+        port = int(slot.port)
+        return {"url": workspace_url(user, port), "port": port, "status": "running", "source": "pool"}
+
+    host = schedule_workspace(user, profile)
+    client = get_docker_client(host)
+    port = None
+    try:
+        on_stage("pulling")
+        image = ensure_image(client, user)
+
+        on_stage("creating")
+        port = allocate_port(container_name, user=user)
+        initialized = restored or volume_initialized(user)
+        user_volume = prepare_host_volume(client, host, user_volume_path(user), initialized=initialized)
+        mark_volume_initialized(user)
+        container = run_workspace_container(client, container_name, user_volume, port, profile, host=host, image=image)
+        Workspace.objects.filter(user=user).update(image_digest=image)
+        set_container_id(port, container.id)
+    except Exception:
+        release_workspace(user)
+        if port is not None:
+            release_port(port)
+        raise
+    return {"url": workspace_url(user, port), "port": port, "status": "created", "source": "cold"}
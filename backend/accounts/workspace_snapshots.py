@@ -0,0 +1,239 @@
+"""
+Snapshots of workspace volumes.
+
+A snapshot streams the student's directory into a gzip-compressed tarball
+under WORKSPACE_SNAPSHOT_PATH/<user id>, one file at a time, so volumes are
+never held in memory. Next to each archive is a manifest of every entry's
+(mtime_ns, size) at snapshot time. An incremental snapshot only archives
+entries whose mtime or size differ from the previous manifest, and restoring
+replays the chain from the last full snapshot, then drops anything the final
+manifest no longer lists. Archived workspaces are restored automatically the
+next time the student launches their workspace. Only volumes on the local
+Docker host can be snapshotted.
+"""
+import gzip
+import json
+import logging
+import os
+import shutil
+import tarfile
+
+import docker
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Workspace, WorkspaceSnapshot
+from .workspace_service import (
+    CODER_UID, LOCAL_HOST, WorkspaceError, container_name_for, get_docker_client,
+    user_volume_path, workspace_host,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_directory(user):
+    return os.path.join(settings.WORKSPACE_SNAPSHOT_PATH, str(user.id))
+
+
+def scan_volume(path):
+    """Relative path -> [mtime_ns, size] for every entry under `path`"""
+    manifest = {}
+    for root, dirs, files in os.walk(path):
+        # Symlinks to directories are listed in dirs but not descended into
+        for name in dirs + files:
+            full = os.path.join(root, name)
+            st = os.lstat(full)
+            manifest[os.path.relpath(full, path)] = [st.st_mtime_ns, st.st_size]
+    return manifest
+
+
+def load_manifest(snapshot):
+    with gzip.open(snapshot.manifest_path, "rt") as f:
+        return json.load(f)
+
+
+def snapshot_chain(snapshot):
+    """Snapshots to apply to rebuild `snapshot`, full snapshot first"""
+    chain = []
+    while snapshot is not None:
+        chain.append(snapshot)
+        snapshot = snapshot.base
+    return chain[::-1]
+
+
+def _local_volume(user):
+    if workspace_host(user) != LOCAL_HOST:
+        raise WorkspaceError("Only workspaces on the local Docker host can be snapshotted")
+    path = user_volume_path(user)
+    if not os.path.isdir(path):
+        raise WorkspaceError("Workspace volume not found", message=f"{path} does not exist.")
+    return path
+
+
+def snapshot_workspace(user, full=False):
+    """
+    Archive the user's volume, incrementally when a recent full snapshot exists
+
+    Best taken while the container is stopped; files written during the
+    snapshot may be captured in either state.
+    """
+    path = _local_volume(user)
+    latest = WorkspaceSnapshot.objects.filter(user=user).first()
+
+    kind, base, previous = "full", None, {}
+    if latest and not full and len(snapshot_chain(latest)) <= settings.WORKSPACE_SNAPSHOT_FULL_EVERY:
+        kind, base, previous = "incremental", latest, load_manifest(latest)
+
+    manifest = scan_volume(path)
+    changed = sorted(rel for rel, entry in manifest.items() if previous.get(rel) != entry)
+
+    directory = snapshot_directory(user)
+    os.makedirs(directory, exist_ok=True)
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%S%f")
+    archive_path = os.path.join(directory, f"{stamp}-{kind}.tar.gz")
+    manifest_path = os.path.join(directory, f"{stamp}.manifest.json.gz")
+    partial_path = f"{archive_path}.partial"
+    try:
+        with tarfile.open(partial_path, "w:gz") as tar:
+            for rel in changed:
+                try:
+                    tar.add(os.path.join(path, rel), arcname=rel, recursive=False)
+                except FileNotFoundError:
+                    # Deleted since the scan
+                    manifest.pop(rel, None)
+        with gzip.open(manifest_path, "wt") as f:
+            json.dump(manifest, f)
+        os.replace(partial_path, archive_path)
+    except Exception:
+        for leftover in (partial_path, manifest_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+
+    return WorkspaceSnapshot.objects.create(
+        user=user,
+        kind=kind,
+        base=base,
+        archive_path=archive_path,
+        manifest_path=manifest_path,
+        file_count=len(manifest),
+        changed_count=len(changed),
+        size_bytes=os.path.getsize(archive_path),
+    )
+
+
+def _remove_volume(path):
+    """Delete a workspace directory, following the link a pool claim leaves"""
+    target = os.path.realpath(path)
+    if not target.startswith(os.path.realpath(settings.WORKSPACE_BASE_PATH) + os.sep):
+        raise WorkspaceError(f"Refusing to remove {target} outside WORKSPACE_BASE_PATH")
+    if os.path.islink(path):
+        os.unlink(path)
+    shutil.rmtree(target, ignore_errors=True)
+
+
+def restore_workspace(user, snapshot=None, replace=False):
+    """
+    Rebuild the user's volume from `snapshot` (default: the latest)
+
+    The volume is assembled next to its final location and swapped in, so a
+    failed restore leaves nothing half-written.
+
+    Raises:
+        WorkspaceError: If there is no snapshot, or the volume exists and
+            `replace` is not set
+    """
+    snapshot = snapshot or WorkspaceSnapshot.objects.filter(user=user).first()
+    if snapshot is None:
+        raise WorkspaceError("No workspace snapshot to restore")
+    path = user_volume_path(user)
+    if os.path.lexists(path) and not replace:
+        raise WorkspaceError("Workspace volume already exists", message=f"{path} is in use.")
+
+    staging = f"{path}.restoring"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        for layer in snapshot_chain(snapshot):
+            # Stream mode reads each archive front to back without seeking
+            with tarfile.open(layer.archive_path, "r|gz") as tar:
+                tar.extractall(staging, filter="tar")
+
+        # Entries deleted between snapshots are still present from older layers
+        keep = load_manifest(snapshot)
+        for root, dirs, files in os.walk(staging, topdown=False):
+            for name in files + dirs:
+                full = os.path.join(root, name)
+                if os.path.relpath(full, staging) not in keep:
+                    if os.path.isdir(full) and not os.path.islink(full):
+                        shutil.rmtree(full)
+                    else:
+                        os.remove(full)
+        try:
+            os.chown(staging, CODER_UID, CODER_UID)
+            os.chmod(staging, 0o755)
+        except OSError as e:
+            logger.warning(f"Could not set ownership of {staging}: {e}")
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if os.path.lexists(path):
+        _remove_volume(path)
+    os.replace(staging, path)
+    Workspace.objects.filter(user=user).update(volume_initialized_at=timezone.now())
+    return snapshot
+
+
+def restore_if_archived(user, on_stage=None):
+    """Restore the latest snapshot when the student's volume is gone; True if restored"""
+    if workspace_host(user) != LOCAL_HOST or os.path.lexists(user_volume_path(user)):
+        return False
+    if not WorkspaceSnapshot.objects.filter(user=user).exists():
+        return False
+    if on_stage:
+        on_stage("restoring")
+    restore_workspace(user)
+    return True
+
+
+def archive_workspace(user, full=False):
+    """
+    Snapshot the user's workspace, then remove its container and volume
+
+    The student's next launch restores the snapshot into a new container.
+    If the snapshot fails, a container that was running is started again
+    and nothing is removed.
+    """
+    from .workspace_ports import leased_port, release_port
+
+    client = get_docker_client()
+    container = None
+    was_running = False
+    if client is not None:
+        try:
+            container = client.containers.get(container_name_for(user))
+            was_running = container.status == "running"
+            container.stop()
+        except docker.errors.NotFound:
+            pass
+
+    try:
+        snapshot = snapshot_workspace(user, full=full)
+    except Exception:
+        if was_running:
+            try:
+                container.start()
+            except docker.errors.APIError as e:
+                logger.warning(f"Could not restart {container.name} after a failed snapshot: {e}")
+                Workspace.objects.filter(user=user).update(state="stopped", suspended_at=timezone.now())
+        raise
+
+    if container is not None:
+        container.remove(force=True)
+    port = leased_port(user)
+    if port is not None:
+        release_port(port)
+    _remove_volume(user_volume_path(user))
+    Workspace.objects.filter(user=user).update(state="stopped", suspended_at=timezone.now())
+    return snapshot
@@ -0,0 +1,117 @@
+"""
+In-memory workspace container state, fed by the Docker events stream.
+
+Each process keeps a map of container name -> status, seeded from a container
+listing and kept current by start/pause/unpause/die/destroy/rename events, so
+create_workspace can answer "already running" without asking the daemon. The
+cache only answers while the stream is connected; otherwise callers fall back
+to the Docker API.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from .workspace_lifecycle import WORKSPACE_NAME_PREFIX
+from .workspace_service import get_docker_client
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = 30
+
+# Container event -> resulting status (None removes the container)
+EVENT_STATES = {
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+    "destroy": None,
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ContainerStateCache:
+    """Container statuses kept in sync with Docker events on a daemon thread"""
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+        self.live = False
+
+    def get(self, name):
+        """Cached status, or None when unknown or the stream is down"""
+        with self._lock:
+            if not self.live:
+                return None
+            return self._states.get(name)
+
+    def seed(self, containers):
+        with self._lock:
+            self._states = {c.name: c.status for c in containers}
+            self.live = True
+
+    def reset(self):
+        with self._lock:
+            self._states.clear()
+            self.live = False
+
+    def apply(self, event):
+        action = event.get("Action", "")
+        attributes = event.get("Actor", {}).get("Attributes", {})
+        name = attributes.get("name", "")
+        if not name.startswith(WORKSPACE_NAME_PREFIX):
+            return
+
+        with self._lock:
+            if action == "rename":
+                # Pool claims rename the container; its status carries over
+                status = self._states.pop(attributes.get("oldName", "").lstrip("/"), None)
+                if status:
+                    self._states[name] = status
+            elif action in EVENT_STATES:
+                if EVENT_STATES[action] is None:
+                    self._states.pop(name, None)
+                else:
+                    self._states[name] = EVENT_STATES[action]
+
+    def start(self):
+        threading.Thread(target=self._watch, name="workspace-events", daemon=True).start()
+
+    def _watch(self):
+        backoff = 1
+        while True:
+            client = get_docker_client()
+            if client is not None:
+                try:
+                    # Replaying events from just before the listing closes the gap between the two
+                    since = int(time.time()) - 1
+                    self.seed(client.containers.list(all=True, filters={"name": WORKSPACE_NAME_PREFIX}))
+                    for event in client.events(since=since, decode=True, filters={"type": "container"}):
+                        self.apply(event)
+                        backoff = 1
+                except Exception as e:
+                    logger.warning(f"Docker event stream lost: {e}")
+                self.reset()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+
+def get_state_cache():
+    """The process's state cache, starting its event watcher on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ContainerStateCache()
+            if settings.WORKSPACE_STATE_CACHE:
+                _cache.start()
+    return _cache
+
+
+def container_state(name):
+    """Status of the named container from the event-fed cache, or None if unknown"""
+    return get_state_cache().get(name)
@@ -1,35 +1,33 @@
-import docker
-import socket
-import os
-from pathlib import Path
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.conf import settings
 
-# Only connect to Docker if available (prevents crash on Render)
-try:
-    client = docker.from_env()
-except Exception as e:
-    client = None
-    print(f"Docker not available: {e}")
-
-def get_free_port():
-    """Find an available port for user container."""
-    s = socket.socket()
-    s.bind(('', 0))
-    port = s.getsockname()[1]
-    s.close()
-    return port
+from core.jobs import poll_wait, wait_for_status
+
+from .models import CustomUser, WorkspaceJob
+from .permissions import IsPlatformAdmin, IsTrainerOrPlatformAdmin, is_platform_admin
+from .serializers import WorkspaceJobSerializer
+from .workspace_jobs import enqueue_workspace_job
+from .workspace_gateway import GATEWAY_SESSION_COOKIE, link_valid, session_valid, set_session_cookie
+from .workspace_images import image_usage
+from .workspace_metrics import usage_report, usage_series
+from .workspace_pool import pool_metrics
+from .workspace_quota import capacity_report
+from .workspace_service import get_docker_client
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def create_workspace(request):
-    """Provision code-server container for the user"""
+    """
+    Queue provisioning of the user's code-server container.
+    Returns immediately with a job to poll via workspace_job_status.
+    """
 
     # Check if Docker is available
-    if client is None:
+    if get_docker_client() is None:
         return Response(
             {
                 "error": "Workspace feature not available",
@@ -38,89 +36,119 @@ def create_workspace(request):
             },
             status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
-    
-    user = request.user
-    container_name = f"workspace_{user.id}"
+
+    job = enqueue_workspace_job(request.user)
+    serializer = WorkspaceJobSerializer(job)
+    if job.status == "running":
+        return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def workspace_job_status(request, job_id):
+    """
+    Get workspace provisioning job status.
+    Long-polls when `wait` (seconds) is given: returns as soon as the status
+    differs from `status` (defaults to the current one) or the job finishes.
+    """
+    job = get_object_or_404(WorkspaceJob, pk=job_id, user=request.user)
+
     try:
-        # Check if container already exists
-        container = client.containers.get(container_name)
-        container.reload()
-
-        # Get the port mapping
-        port_bindings = container.attrs['HostConfig']['PortBindings']
-        if port_bindings and '8080/tcp' in port_bindings:
-            port = port_bindings['8080/tcp'][0]['HostPort']
-        else:
-            port = "8080"
-
-        # Use localhost URL for development
-        use_localhost = os.getenv("DEBUG", "False").lower() == "true"
-        if use_localhost:
-            url = f"http://localhost:{port}"
-        else:
-            url = f"http://workspace-{user.id}.apranova.com"
-
-        if container.status == "running":
-            return Response(
-                {"url": url, "port": port, "status": "running"},
-                status=status.HTTP_200_OK,
-            )
-        else:
-            container.start()
-            return Response(
-                {"url": url, "port": port, "status": "started"},
-                status=status.HTTP_200_OK,
-            )
-    except docker.errors.NotFound:
-        port = get_free_port()
-
-        # Create workspace directory if it doesn't exist
-        workspace_base = os.getenv("WORKSPACE_BASE_PATH", "/app/workspaces")
-        user_volume = f"{workspace_base}/{user.id}"
-        Path(user_volume).mkdir(parents=True, exist_ok=True)
-        
-        # Set permissions for coder user (UID 1000 in code-server container)
-        # This ensures the coder user can write to the workspace
-        import subprocess
-        subprocess.run(["chown", "-R", "1000:1000", user_volume], check=False)
-        subprocess.run(["chmod", "-R", "755", user_volume], check=False)
-
-        # Use localhost URL for development
-        use_localhost = os.getenv("DEBUG", "False").lower() == "true"
-
-        try:
-            container = client.containers.run(
-                "apra-nova-code-server:latest",
-                name=container_name,
-                detach=True,
-                ports={"8080/tcp": port},
-                environment={
-                    "PASSWORD": "",  # Clear the password - this disables password authentication
-                },
-                entrypoint=["/usr/bin/entrypoint.sh", "--auth", "none", "--bind-addr", "0.0.0.0:8080", "."],  # Override entrypoint with --auth none
-                volumes={user_volume: {"bind": "/home/coder/project", "mode": "rw"}},
-                network="apranova_network",  # Use the same network as other containers
-                restart_policy={"Name": "unless-stopped"},
-            )
-
-            # Return localhost URL for development
-            if use_localhost:
-                url = f"http://localhost:{port}"
-            else:
-                url = f"http://workspace-{user.id}.apranova.com"
-
-            return Response(
-                {"url": url, "port": port, "msg": "Workspace created successfully."},
-                status=status.HTTP_201_CREATED,
-            )
-        except docker.errors.ImageNotFound:
-            return Response(
-                {
-                    "error": "Code-server image not found",
-                    "message": "The apra-nova-code-server:latest image needs to be built first.",
-                    "details": "Run: docker build -t apra-nova-code-server:latest ./backend/apra-nova-code-server"
-                },
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-    except Exception as e:
-        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        wait = poll_wait(request, settings.WORKSPACE_JOB_MAX_WAIT)
+    except ValueError:
+        return Response({"error": "wait must be a number of seconds"}, status=status.HTTP_400_BAD_REQUEST)
+
+    wait_for_status(job, request.query_params.get("status", job.status), wait)
+
+    return Response(WorkspaceJobSerializer(job).data)
+
+
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def workspace_gateway_auth(request):
+    """
+    nginx auth_request check for a request to /workspaces/<X-Workspace-Id>/.
+    204 when it carries the workspace's session cookie, or a current link
+    token (which sets the cookie); 401 otherwise.
+    """
+    workspace_id = request.headers.get("X-Workspace-Id", "")
+    if not workspace_id.isdigit() or not CustomUser.objects.filter(pk=workspace_id, is_active=True).exists():
+        return Response(status=status.HTTP_401_UNAUTHORIZED)
+
+    if session_valid(request.COOKIES.get(GATEWAY_SESSION_COOKIE), workspace_id):
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    if link_valid(request.headers.get("X-Original-URI"), workspace_id):
+        response = Response(status=status.HTTP_204_NO_CONTENT)
+        set_session_cookie(response, workspace_id)
+        return response
+    return Response(status=status.HTTP_401_UNAUTHORIZED)
+
+
+@api_view(["GET"])
+@permission_classes([IsPlatformAdmin])
+def workspace_pool_status(request):
+    """Warm pool occupancy, hit rate and claim latency (`hours` window, default 24)"""
+    try:
+        hours = int(request.query_params.get("hours", 24))
+    except ValueError:
+        return Response({"error": "hours must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(pool_metrics(hours=hours))
+
+
+@api_view(["GET"])
+@permission_classes([IsPlatformAdmin])
+def workspace_capacity(request):
+    """Per-host capacity versus the limits committed to workspaces and the warm pool"""
+    if get_docker_client() is None:
+        return Response({"error": "Workspace feature not available"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return Response(capacity_report())
+
+
+@api_view(["GET"])
+@permission_classes([IsPlatformAdmin])
+def workspace_images(request):
+    """Pinned workspace images and how many workspaces run each"""
+    return Response(image_usage())
+
+
+def _visible_students(user):
+    """Students whose usage the user may see: all for admins, assigned ones for trainers"""
+    if is_platform_admin(user):
+        return None
+    return CustomUser.objects.filter(assigned_trainer=user)
+
+
+def _hours(request):
+    try:
+        return int(request.query_params.get("hours", 24))
+    except ValueError:
+        return None
+
+
+@api_view(["GET"])
+@permission_classes([IsTrainerOrPlatformAdmin])
+def workspace_usage(request):
+    """Per-student workspace CPU, memory and I/O over the last `hours` (default 24)"""
+    hours = _hours(request)
+    if hours is None:
+        return Response({"error": "hours must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(usage_report(hours=hours, users=_visible_students(request.user)))
+
+
+@api_view(["GET"])
+@permission_classes([IsTrainerOrPlatformAdmin])
+def workspace_usage_detail(request, user_id):
+    """One student's usage samples over the last `hours` (default 24)"""
+    hours = _hours(request)
+    if hours is None:
+        return Response({"error": "hours must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    students = _visible_students(request.user)
+    student = get_object_or_404(CustomUser if students is None else students, pk=user_id)
+    return Response({
+        "user_id": student.id,
+        "email": student.email,
+        "window_hours": hours,
+        "samples": usage_series(student, hours=hours),
+    })
@@ -0,0 +1,109 @@
+"""
+Conditional GET helpers for DRF views.
+
+ETags are derived from cheap version fingerprints rather than the rendered
+body, so a matching If-None-Match is answered with 304 before any serializer
+or nested query runs.
+"""
+
+import hashlib
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from version fingerprint parts
+
+    Args:
+        parts: Values that change whenever the representation changes
+
+    Returns:
+        Quoted ETag value
+    """
+    fingerprint = ':'.join(str(part) for part in parts)
+    return '"%s"' % hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+
+def etag_matches(request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    candidates = [tag.strip() for tag in header.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def finalize_conditional_response(response, etag: str):
+    """Attach validators so clients revalidate instead of reusing blindly"""
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+def conditional_response(request, etag: Optional[str], render: Callable[[], Response]) -> Response:
+    """
+    Return 304 when the client already has `etag`, otherwise render the response
+
+    Args:
+        request: Incoming request
+        etag: Current ETag, or None to skip conditional handling
+        render: Callable producing the full response
+
+    Returns:
+        304 Not Modified or the rendered response carrying the ETag
+    """
+    if etag is None:
+        return render()
+    if etag_matches(request, etag):
+        return finalize_conditional_response(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+    response = render()
+    if response.status_code == status.HTTP_200_OK:
+        finalize_conditional_response(response, etag)
+    return response
+
+
+def etag_conditional(etag_func: Callable[..., Optional[str]]):
+    """
+    Decorator for function-based DRF views (apply below @api_view)
+
+    Args:
+        etag_func: Callable taking (request, *args, **kwargs) and returning the ETag
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            etag = etag_func(request, *args, **kwargs)
+            return conditional_response(request, etag, lambda: view(request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin answering list/retrieve with 304 when the ETag from
+    get_etag() matches If-None-Match. The view (or a later mixin) must
+    implement get_etag(request), returning None to skip the check.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.get_etag(request),
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.get_etag(request),
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
@@ -0,0 +1,129 @@
+"""
+Background jobs recorded in the database.
+
+Workspace provisioning and report generation both record a job row, hand its
+id to a per-process thread pool and let clients long-poll the row, so slow
+work never holds a gunicorn worker and any worker can answer status checks.
+JobRunner holds what they share: the pool, eager inline execution for tests,
+and failing jobs lost to a worker restart. Job models define ACTIVE_STATUSES,
+FINISHED_STATUSES, `error`, `finished_at` and `updated_at`.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+# Interval between status checks while long-polling a job
+JOB_POLL_INTERVAL = 0.5
+
+
+class JobRunner:
+    """
+    Runs one kind of job on its own thread pool
+
+    Settings are looked up by name on each use, so override_settings applies.
+
+    Args:
+        name: Thread name prefix of the pool
+        target: Does the work, given a job id
+        workers_setting: Setting with the number of worker threads per process
+        eager_setting: Setting that runs jobs inline instead (tests/debugging)
+        stale_setting: Setting with the seconds after which an active job that
+            stopped updating is treated as lost
+    """
+
+    def __init__(self, name: str, target: Callable[[Any], None], workers_setting: str, eager_setting: str,
+                 stale_setting: str):
+        self.name = name
+        self.target = target
+        self.workers_setting = workers_setting
+        self.eager_setting = eager_setting
+        self.stale_setting = stale_setting
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def eager(self) -> bool:
+        return getattr(settings, self.eager_setting)
+
+    def executor(self) -> ThreadPoolExecutor:
+        """The shared pool, created on first use"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, self.workers_setting),
+                    thread_name_prefix=self.name,
+                )
+        return self._executor
+
+    def run(self, job_id: Any) -> None:
+        """Run the target for a job, then release the thread's database connection"""
+        try:
+            self.target(job_id)
+        finally:
+            if not self.eager:
+                close_old_connections()
+
+    def submit(self, job_id: Any, executor: Optional[ThreadPoolExecutor] = None) -> None:
+        """Run the job on `executor` (defaults to the shared pool)"""
+        (executor or self.executor()).submit(self.run, job_id)
+
+    def dispatch(self, job, executor: Optional[ThreadPoolExecutor] = None) -> None:
+        """Run the job inline when eager, otherwise on the pool once the row is committed"""
+        if self.eager:
+            self.run(job.pk)
+            job.refresh_from_db()
+            return
+        transaction.on_commit(lambda: self.submit(job.pk, executor))
+
+    def fail_stale(self, jobs, error: Any) -> int:
+        """
+        Fail the active jobs among `jobs` that stopped updating, so they are
+        replaced rather than reused
+
+        Returns:
+            Number of jobs failed
+        """
+        stale_before = timezone.now() - timedelta(seconds=getattr(settings, self.stale_setting))
+        return jobs.filter(status__in=jobs.model.ACTIVE_STATUSES, updated_at__lt=stale_before).update(
+            status="failed",
+            error=error,
+            finished_at=timezone.now(),
+        )
+
+
+def set_status(job, status: str, **fields: Any) -> None:
+    """Save a new status and fields on the job, stamping finished_at once it finishes"""
+    job.status = status
+    for name, value in fields.items():
+        setattr(job, name, value)
+    if status in job.FINISHED_STATUSES:
+        job.finished_at = timezone.now()
+    job.save()
+
+
+def poll_wait(request, max_wait: float) -> float:
+    """
+    Seconds a status request asked to long-poll (`wait`), capped at `max_wait`
+
+    Raises:
+        ValueError: If `wait` is not a number
+    """
+    return min(float(request.query_params.get("wait", 0)), max_wait)
+
+
+def wait_for_status(job, known_status: str, wait: float) -> None:
+    """
+    Refresh `job` until its status differs from `known_status`, it finishes,
+    or `wait` seconds pass
+    """
+    deadline = time.monotonic() + wait
+    while job.status == known_status and not job.is_finished and time.monotonic() < deadline:
+        time.sleep(JOB_POLL_INTERVAL)
+        job.refresh_from_db()
@@ -1,21 +1,116 @@
 """
 Report Generation Utilities for APROVOVA
 Centralized utilities for generating and managing reports
+
+The stream_* and get_streaming_* methods take any iterable of row dicts,
+including a `.values()` queryset (read with `.iterator()`), and write one row
+at a time, so exports run in constant memory whatever their size.
+
+Parquet output (typed, compressed columns for loading into pandas) needs
+pyarrow, which requirements.txt installs; where it is missing, generators
+write those reports as CSV and report jobs refuse them.
 """
 
 import os
 import csv
 import json
+import logging
 from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from django.conf import settings
-from django.http import HttpResponse, FileResponse
+from django.core.exceptions import FieldDoesNotExist, FieldError
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.query import QuerySet, ValuesIterable
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+
+# Django field types with a fixed Arrow equivalent in Parquet reports
+_INTEGER_FIELDS = {
+    'AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField', 'SmallIntegerField',
+    'PositiveIntegerField', 'PositiveBigIntegerField', 'PositiveSmallIntegerField',
+}
+_STRING_FIELDS = {'CharField', 'TextField', 'SlugField'}
+
+
+def _arrow_type(field):
+    """Arrow type for a model field or expression output field, or None if unknown"""
+    internal_type = field.get_internal_type()
+    if internal_type in _INTEGER_FIELDS:
+        return pa.int64()
+    if internal_type in _STRING_FIELDS:
+        return pa.string()
+    if internal_type == 'BooleanField':
+        return pa.bool_()
+    if internal_type == 'FloatField':
+        return pa.float64()
+    if internal_type == 'DecimalField' and field.decimal_places is not None:
+        return pa.decimal128(38, field.decimal_places)
+    if internal_type == 'DateTimeField':
+        return pa.timestamp('us', tz='UTC' if settings.USE_TZ else None)
+    if internal_type == 'DateField':
+        return pa.date32()
+    return None
+
+
+def queryset_schema(queryset):
+    """
+    Arrow schema of a `.values()` queryset's rows, from its model fields and
+    annotations, so nullable columns keep their type however many rows are NULL
+
+    Returns:
+        pyarrow.Schema, or None without pyarrow, for other querysets, or when
+        a column's type is not known
+    """
+    if pa is None or not isinstance(queryset, QuerySet) or queryset._iterable_class is not ValuesIterable:
+        return None
+    query = queryset.query
+    fields = []
+    for name in [*query.extra_select, *query.values_select, *query.annotation_select]:
+        try:
+            if name in query.annotation_select:
+                field = query.annotation_select[name].output_field
+            elif name in query.extra_select:
+                return None
+            else:
+                *path, last = name.split(LOOKUP_SEP)
+                model = query.model
+                for part in path:
+                    model = model._meta.get_field(part).related_model
+                field = model._meta.get_field(last)
+                if field.is_relation:
+                    field = field.target_field
+        except (FieldDoesNotExist, FieldError, AttributeError):
+            return None
+        arrow_type = _arrow_type(field)
+        if arrow_type is None:
+            return None
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output"""
+    
+    def write(self, value: str) -> str:
+        return value
 
 
 class ReportGenerator:
     """Base class for generating reports in various formats"""
     
+    # Rows fetched per database round-trip when streaming a queryset
+    chunk_size = 2000
+    
     def __init__(self, report_type: str):
         """
         Initialize report generator
@@ -51,6 +146,41 @@ class ReportGenerator:
         prefix_str = f"{prefix}_" if prefix else ""
         return f"{prefix_str}{self.report_type}_report_{timestamp}.{format}"
     
+    def _iter_rows(self, data: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Iterate rows, reading querysets in chunks instead of caching them"""
+        if isinstance(data, QuerySet):
+            return data.iterator(chunk_size=self.chunk_size)
+        return iter(data)
+    
+    def _peek(self, data: Iterable[Dict[str, Any]]):
+        """
+        First row and an iterator over all rows
+        
+        Returns:
+            (first row or None, iterator including the first row)
+        """
+        rows = self._iter_rows(data)
+        first = next(rows, None)
+        if first is None:
+            return None, iter(())
+        return first, chain([first], rows)
+    
+    def _write_atomically(self, file_path: Path, write, binary: bool = False) -> str:
+        """Write through a hidden temporary file so list_reports never shows a partial report"""
+        partial_path = file_path.with_name(f".{file_path.name}.partial")
+        try:
+            if binary:
+                f = open(partial_path, 'wb')
+            else:
+                f = open(partial_path, 'w', newline='', encoding='utf-8')
+            with f:
+                write(f)
+            os.replace(partial_path, file_path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        return str(file_path)
+    
     def generate_csv(self, data: List[Dict[str, Any]], filename: Optional[str] = None) -> str:
         """
         Generate CSV report
@@ -62,29 +192,40 @@ class ReportGenerator:
         Returns:
             Path to generated CSV file
         """
-        if not data:
-            raise ValueError("No data provided for CSV generation")
+        return self.stream_csv(data, filename)
+    
+    def stream_csv(
+        self,
+        data: Iterable[Dict[str, Any]],
+        filename: Optional[str] = None,
+        fieldnames: Optional[List[str]] = None,
+    ) -> str:
+        """
+        Write a CSV report row by row
         
-        # Generate filename
-        if not filename:
-            filename = self._generate_filename('csv')
+        Args:
+            data: Iterable of row dictionaries (e.g. a `.values()` queryset)
+            filename: Optional custom filename
+            fieldnames: Column order (defaults to the first row's keys)
+            
+        Returns:
+            Path to generated CSV file
+        """
+        first, rows = self._peek(data)
+        if first is None:
+            raise ValueError("No data provided for CSV generation")
         
-        # Create CSV directory if it doesn't exist
         csv_dir = self.base_dir / 'csv'
         csv_dir.mkdir(parents=True, exist_ok=True)
+        file_path = csv_dir / (filename or self._generate_filename('csv'))
         
-        # Full file path
-        file_path = csv_dir / filename
-        
-        # Write CSV file
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            if data:
-                fieldnames = data[0].keys()
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
+        def write(csvfile):
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames or list(first.keys()))
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
         
-        return str(file_path)
+        return self._write_atomically(file_path, write)
     
     def generate_json(self, data: Any, filename: Optional[str] = None) -> str:
         """
@@ -114,6 +255,171 @@ class ReportGenerator:
         
         return str(file_path)
     
+    def generate_parquet(
+        self,
+        data: Iterable[Dict[str, Any]],
+        filename: Optional[str] = None,
+        compression: str = 'zstd',
+        schema=None,
+    ) -> str:
+        """
+        Generate Parquet report, or CSV when pyarrow is not installed
+        
+        Column types come from `schema`, or from the model fields of a
+        `.values()` queryset. Otherwise they are inferred from the rows:
+        chunks are held back while a column has only had NULLs, and written
+        once every column has a type or the rows run out. Each chunk is
+        written as one row group.
+        
+        Args:
+            data: Iterable of row dictionaries (e.g. a `.values()` queryset)
+            filename: Optional custom filename
+            compression: Parquet codec (zstd, snappy, gzip or none)
+            schema: Optional pyarrow.Schema
+            
+        Returns:
+            Path to generated Parquet (or CSV) file
+        """
+        if pq is None:
+            logger.warning("pyarrow is not installed, writing the report as CSV instead of Parquet")
+            return self.stream_csv(data, str(Path(filename).with_suffix('.csv')) if filename else None)
+        
+        if schema is None:
+            schema = queryset_schema(data)
+        first, rows = self._peek(data)
+        if first is None:
+            raise ValueError("No data provided for Parquet generation")
+        
+        parquet_dir = self.base_dir / 'parquet'
+        parquet_dir.mkdir(parents=True, exist_ok=True)
+        file_path = parquet_dir / (filename or self._generate_filename('parquet'))
+        
+        def write(parquetfile):
+            writer = None
+            pending = []
+            while chunk := list(islice(rows, self.chunk_size)):
+                if writer is not None:
+                    writer.write_table(pa.Table.from_pylist(chunk, schema=writer.schema))
+                    continue
+                if schema is not None:
+                    writer = pq.ParquetWriter(parquetfile, schema, compression=compression)
+                    writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                    continue
+                pending.append(pa.Table.from_pylist(chunk))
+                inferred = self._widen(pending)
+                if not any(pa.types.is_null(field.type) for field in inferred):
+                    writer = self._write_pending(parquetfile, inferred, pending, compression)
+                    pending = []
+            if writer is None:
+                # Some column is NULL in every row
+                writer = self._write_pending(parquetfile, self._widen(pending), pending, compression)
+            writer.close()
+        
+        return self._write_atomically(file_path, write, binary=True)
+    
+    def _widen(self, tables):
+        """
+        One schema for tables inferred from separate chunks: a column that
+        was NULL in some chunks takes the type found in the others
+        """
+        schema = pa.unify_schemas([table.schema for table in tables], promote_options='permissive')
+        # Inferred decimals only fit the digits seen so far
+        return pa.schema([
+            field.with_type(pa.decimal128(38, field.type.scale)) if pa.types.is_decimal(field.type) else field
+            for field in schema
+        ])
+    
+    def _write_pending(self, parquetfile, schema, tables, compression):
+        """Open a Parquet writer with `schema` and write the held-back tables, one row group each"""
+        writer = pq.ParquetWriter(parquetfile, schema, compression=compression)
+        for table in tables:
+            writer.write_table(table.cast(schema))
+        return writer
+    
+    def _json_chunks(self, rows: Iterable[Dict[str, Any]], lines: bool) -> Iterator[str]:
+        """Encode rows one at a time as JSON Lines or as the pieces of one array"""
+        if lines:
+            for row in rows:
+                yield json.dumps(row, default=str) + '\n'
+            return
+        
+        separator = '[\n'
+        for row in rows:
+            yield separator + json.dumps(row, default=str)
+            separator = ',\n'
+        yield '\n]\n' if separator == ',\n' else '[]\n'
+    
+    def stream_json(
+        self,
+        data: Iterable[Dict[str, Any]],
+        filename: Optional[str] = None,
+        lines: bool = True,
+    ) -> str:
+        """
+        Write a JSON report row by row
+        
+        Args:
+            data: Iterable of row dictionaries (e.g. a `.values()` queryset)
+            filename: Optional custom filename
+            lines: Write JSON Lines (.jsonl, one object per line) instead of one array
+            
+        Returns:
+            Path to generated JSON file
+        """
+        json_dir = self.base_dir / 'json'
+        json_dir.mkdir(parents=True, exist_ok=True)
+        file_path = json_dir / (filename or self._generate_filename('jsonl' if lines else 'json'))
+        
+        def write(jsonfile):
+            for chunk in self._json_chunks(self._iter_rows(data), lines):
+                jsonfile.write(chunk)
+        
+        return self._write_atomically(file_path, write)
+    
+    def _track(self, data: Iterable[Dict[str, Any]], progress) -> Iterator[Dict[str, Any]]:
+        """Pass rows through, reporting the count every chunk_size rows and at the end"""
+        written = 0
+        for row in self._iter_rows(data):
+            yield row
+            written += 1
+            if written % self.chunk_size == 0:
+                progress(written)
+        progress(written)
+    
+    def stream(
+        self,
+        data: Iterable[Dict[str, Any]],
+        format: str,
+        filename: Optional[str] = None,
+        progress=None,
+    ) -> str:
+        """
+        Write a tabular report in `format` (csv, json, jsonl or parquet)
+        
+        Args:
+            data: Iterable of row dictionaries (e.g. a `.values()` queryset)
+            format: File format
+            filename: Optional custom filename
+            progress: Called with the number of rows written so far
+            
+        Returns:
+            Path to generated file
+        """
+        # Read before progress tracking hides the queryset behind a generator
+        schema = queryset_schema(data) if format == 'parquet' else None
+        if progress is not None:
+            data = self._track(data, progress)
+        if format == 'csv':
+            return self.stream_csv(data, filename)
+        elif format == 'json':
+            return self.stream_json(data, filename, lines=False)
+        elif format == 'jsonl':
+            return self.stream_json(data, filename)
+        elif format == 'parquet':
+            return self.generate_parquet(data, filename, schema=schema)
+        else:
+            raise ValueError(f"Unsupported format: {format}")
+    
     def get_csv_response(self, data: List[Dict[str, Any]], filename: str) -> HttpResponse:
         """
         Generate CSV response for download
@@ -153,12 +459,66 @@ class ReportGenerator:
         
         return response
     
+    def get_streaming_csv_response(
+        self,
+        data: Iterable[Dict[str, Any]],
+        filename: str,
+        fieldnames: Optional[List[str]] = None,
+    ) -> StreamingHttpResponse:
+        """
+        Stream a CSV download, producing rows as the client reads them
+        
+        Args:
+            data: Iterable of row dictionaries (e.g. a `.values()` queryset)
+            filename: Filename for download
+            fieldnames: Column order (defaults to the first row's keys)
+            
+        Returns:
+            StreamingHttpResponse with CSV content
+        """
+        def content():
+            first, rows = self._peek(data)
+            if first is None:
+                return
+            writer = csv.DictWriter(_Echo(), fieldnames=fieldnames or list(first.keys()))
+            yield writer.writeheader()
+            for row in rows:
+                yield writer.writerow(row)
+        
+        response = StreamingHttpResponse(content(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    def get_streaming_json_response(
+        self,
+        data: Iterable[Dict[str, Any]],
+        filename: str,
+        lines: bool = False,
+    ) -> StreamingHttpResponse:
+        """
+        Stream a JSON download as one array, or as JSON Lines
+        
+        Args:
+            data: Iterable of row dictionaries (e.g. a `.values()` queryset)
+            filename: Filename for download
+            lines: Send JSON Lines (application/x-ndjson) instead of one array
+            
+        Returns:
+            StreamingHttpResponse with JSON content
+        """
+        response = StreamingHttpResponse(
+            self._json_chunks(self._iter_rows(data), lines),
+            content_type='application/x-ndjson' if lines else 'application/json',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
     def list_reports(self, format: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         List all reports in the directory
         
         Args:
-            format: Optional format filter (csv, pdf, json)
+            format: Optional format filter (csv, pdf, json, parquet)
             
         Returns:
             List of report metadata
@@ -173,6 +533,7 @@ class ReportGenerator:
                 self.base_dir / 'csv',
                 self.base_dir / 'pdf',
                 self.base_dir / 'json',
+                self.base_dir / 'parquet',
             ]
         
         for directory in dirs_to_scan:
@@ -205,7 +566,7 @@ class ReportGenerator:
             True if deleted successfully, False otherwise
         """
         # Search in all format directories
-        for format_dir in ['csv', 'pdf', 'json', 'invoices', 'charts']:
+        for format_dir in ['csv', 'pdf', 'json', 'parquet', 'invoices', 'charts']:
             file_path = self.base_dir / format_dir / filename
             if file_path.exists():
                 file_path.unlink()
@@ -228,7 +589,7 @@ class ReportGenerator:
         cutoff_date = datetime.now() - timedelta(days=days)
         deleted_count = 0
         
-        for format_dir in ['csv', 'pdf', 'json', 'invoices', 'charts']:
+        for format_dir in ['csv', 'pdf', 'json', 'parquet', 'invoices', 'charts']:
             directory = self.base_dir / format_dir
             if directory.exists():
                 for file_path in directory.iterdir():
@@ -244,38 +605,25 @@ class ReportGenerator:
 
 
 # Convenience functions for quick report generation
+# (tabular reports accept any iterable of row dicts, including querysets)
 
-def generate_user_report(data: List[Dict], format: str = 'csv') -> str:
+def _generate_rows_report(report_type: str, data: Iterable[Dict], format: str) -> str:
+    return ReportGenerator(report_type).stream(data, format)
+
+
+def generate_user_report(data: Iterable[Dict], format: str = 'csv') -> str:
     """Generate user report"""
-    generator = ReportGenerator('user')
-    if format == 'csv':
-        return generator.generate_csv(data)
-    elif format == 'json':
-        return generator.generate_json(data)
-    else:
-        raise ValueError(f"Unsupported format: {format}")
+    return _generate_rows_report('user', data, format)
 
 
-def generate_payment_report(data: List[Dict], format: str = 'csv') -> str:
+def generate_payment_report(data: Iterable[Dict], format: str = 'csv') -> str:
     """Generate payment report"""
-    generator = ReportGenerator('payment')
-    if format == 'csv':
-        return generator.generate_csv(data)
-    elif format == 'json':
-        return generator.generate_json(data)
-    else:
-        raise ValueError(f"Unsupported format: {format}")
+    return _generate_rows_report('payment', data, format)
 
 
-def generate_batch_report(data: List[Dict], format: str = 'csv') -> str:
+def generate_batch_report(data: Iterable[Dict], format: str = 'csv') -> str:
     """Generate batch report"""
-    generator = ReportGenerator('batch')
-    if format == 'csv':
-        return generator.generate_csv(data)
-    elif format == 'json':
-        return generator.generate_json(data)
-    else:
-        raise ValueError(f"Unsupported format: {format}")
+    return _generate_rows_report('batch', data, format)
 
 
 def generate_analytics_report(data: Any, format: str = 'json') -> str:
@@ -283,6 +631,8 @@ def generate_analytics_report(data: Any, format: str = 'json') -> str:
     generator = ReportGenerator('analytics')
     if format == 'csv' and isinstance(data, list):
         return generator.generate_csv(data)
+    elif format == 'parquet' and isinstance(data, list):
+        return generator.generate_parquet(data)
     elif format == 'json':
         return generator.generate_json(data)
     else:
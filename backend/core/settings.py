@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import json
 from pathlib import Path
 
 import dj_database_url
@@ -184,6 +185,104 @@ for directory in [
 ]:
     os.makedirs(directory, exist_ok=True)
 
+# Background report jobs: worker threads per process, and inline execution (tests/debugging)
+REPORT_JOB_WORKERS = config("REPORT_JOB_WORKERS", default=2, cast=int)
+REPORT_JOBS_EAGER = config("REPORT_JOBS_EAGER", default=False, cast=bool)
+# Identical requests reuse a finished report this recent instead of building a new one
+REPORT_CACHE_SECONDS = config("REPORT_CACHE_SECONDS", default=900, cast=int)
+# Jobs not updated for this long are treated as lost (e.g. worker restarted)
+REPORT_JOB_STALE_SECONDS = config("REPORT_JOB_STALE_SECONDS", default=600, cast=int)
+# Upper bound for the job status long-poll, kept well under the gunicorn timeout
+REPORT_JOB_MAX_WAIT = config("REPORT_JOB_MAX_WAIT", default=25, cast=int)
+
+# Cache Configuration
+# Redis is provisioned by docker-compose; without REDIS_URL fall back to a database table
+# (created by `manage.py createcachetable`). The cache must be shared by every gunicorn
+# worker: catalog invalidation and the workspace admission/pool locks live in it.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        }
+    }
+
+# Serialized curriculum catalog lifetime (entries are also invalidated on every edit)
+CURRICULUM_CATALOG_CACHE_TIMEOUT = config("CURRICULUM_CATALOG_CACHE_TIMEOUT", default=86400, cast=int)
+
+# Workspace (code-server) Configuration
+WORKSPACE_IMAGE = config("WORKSPACE_IMAGE", default="apra-nova-code-server:latest")
+# Share of students (by user id) whose new containers use the newest pinned image; the rest
+# keep the previous one until the rollout reaches 100
+WORKSPACE_IMAGE_ROLLOUT_PERCENT = config("WORKSPACE_IMAGE_ROLLOUT_PERCENT", default=100, cast=int)
+WORKSPACE_BASE_PATH = config("WORKSPACE_BASE_PATH", default="/app/workspaces")
+WORKSPACE_NETWORK = config("WORKSPACE_NETWORK", default="apranova_network")
+# Host ports leased to workspace containers (inclusive); keep the range free of other services
+WORKSPACE_PORT_RANGE_START = config("WORKSPACE_PORT_RANGE_START", default=20000, cast=int)
+WORKSPACE_PORT_RANGE_END = config("WORKSPACE_PORT_RANGE_END", default=29999, cast=int)
+# Routing gateway: when set, workspaces are served at <WORKSPACE_GATEWAY_URL>/<user id>/ through
+# nginx instead of publishing host ports; the backend writes the nginx map and reloads nginx
+WORKSPACE_GATEWAY_URL = config("WORKSPACE_GATEWAY_URL", default="")
+WORKSPACE_GATEWAY_MAP_PATH = config("WORKSPACE_GATEWAY_MAP_PATH", default="/app/nginx-gateway/workspaces.map")
+WORKSPACE_GATEWAY_NGINX_CONTAINER = config("WORKSPACE_GATEWAY_NGINX_CONTAINER", default="apranova_nginx")
+# Gateway access: nginx asks the backend before every workspace request. Workspace URLs carry a
+# signed link valid this many seconds, exchanged for a session cookie on that workspace's path
+WORKSPACE_GATEWAY_LINK_MAX_AGE = config("WORKSPACE_GATEWAY_LINK_MAX_AGE", default=600, cast=int)
+WORKSPACE_GATEWAY_SESSION_MAX_AGE = config("WORKSPACE_GATEWAY_SESSION_MAX_AGE", default=43200, cast=int)
+# Workspace volume snapshots: archive store, and a full snapshot after this many incrementals
+WORKSPACE_SNAPSHOT_PATH = config("WORKSPACE_SNAPSHOT_PATH", default="/app/workspace-snapshots")
+WORKSPACE_SNAPSHOT_FULL_EVERY = config("WORKSPACE_SNAPSHOT_FULL_EVERY", default=7, cast=int)
+# Additional Docker daemons for workspaces, as a JSON object:
+# {"worker-1": {"url": "tcp://10.0.0.5:2376", "address": "10.0.0.5"}}
+# The local daemon (/var/run/docker.sock) is always the "local" host; "address" is
+# how nginx reaches containers published on that host.
+WORKSPACE_DOCKER_HOSTS = config("WORKSPACE_DOCKER_HOSTS", default="{}", cast=json.loads)
+# Connections kept open to the Docker daemon, and the events-fed container state cache
+WORKSPACE_DOCKER_POOL_SIZE = config("WORKSPACE_DOCKER_POOL_SIZE", default=10, cast=int)
+WORKSPACE_STATE_CACHE = config("WORKSPACE_STATE_CACHE", default=True, cast=bool)
+# Background provisioning: worker threads per process, and inline execution (tests/debugging)
+WORKSPACE_JOB_WORKERS = config("WORKSPACE_JOB_WORKERS", default=4, cast=int)
+WORKSPACE_JOBS_EAGER = config("WORKSPACE_JOBS_EAGER", default=False, cast=bool)
+# Jobs not updated for this long are treated as lost (e.g. worker restarted)
+WORKSPACE_JOB_STALE_SECONDS = config("WORKSPACE_JOB_STALE_SECONDS", default=300, cast=int)
+# Upper bound for the job status long-poll, kept well under the gunicorn timeout
+WORKSPACE_JOB_MAX_WAIT = config("WORKSPACE_JOB_MAX_WAIT", default=25, cast=int)
+# Finished jobs are deleted after this many days (by reap_idle_workspaces)
+WORKSPACE_JOB_RETENTION_DAYS = config("WORKSPACE_JOB_RETENTION_DAYS", default=7, cast=int)
+# Warm pool of pre-started, unassigned containers handed to first-time students (0 disables)
+WORKSPACE_POOL_SIZE = config("WORKSPACE_POOL_SIZE", default=0, cast=int)
+# Idle workspaces are suspended ("stop" or "pause") after this many minutes without activity
+WORKSPACE_IDLE_TIMEOUT_MINUTES = config("WORKSPACE_IDLE_TIMEOUT_MINUTES", default=60, cast=int)
+WORKSPACE_IDLE_ACTION = config("WORKSPACE_IDLE_ACTION", default="stop")
+# Usage metrics: containers sampled in parallel per collection, and how long samples are kept
+WORKSPACE_METRICS_WORKERS = config("WORKSPACE_METRICS_WORKERS", default=8, cast=int)
+WORKSPACE_METRICS_RETENTION_DAYS = config("WORKSPACE_METRICS_RETENTION_DAYS", default=14, cast=int)
+# Container limits per student track (user.track); "default" applies to everyone else and the warm pool.
+# Override with a JSON object in WORKSPACE_RESOURCE_PROFILES.
+WORKSPACE_RESOURCE_PROFILES = {
+    "default": {"mem_limit": "2g", "nano_cpus": 1_000_000_000, "pids_limit": 512},
+    "DP": {"mem_limit": "4g", "nano_cpus": 2_000_000_000, "pids_limit": 1024},
+    "FSD": {"mem_limit": "3g", "nano_cpus": 2_000_000_000, "pids_limit": 1024},
+    **config("WORKSPACE_RESOURCE_PROFILES", default="{}", cast=json.loads),
+}
+# Host admission control: memory kept free for the backend itself, and how far
+# committed limits may exceed host memory/CPUs before new workspaces wait
+WORKSPACE_HOST_RESERVED_MEMORY = config("WORKSPACE_HOST_RESERVED_MEMORY", default="2g")
+WORKSPACE_MEMORY_OVERCOMMIT = config("WORKSPACE_MEMORY_OVERCOMMIT", default=1.0, cast=float)
+WORKSPACE_CPU_OVERCOMMIT = config("WORKSPACE_CPU_OVERCOMMIT", default=4.0, cast=float)
+# "queue" retries saturated requests until WORKSPACE_ADMISSION_MAX_WAIT seconds, "reject" fails them at once
+WORKSPACE_ADMISSION_POLICY = config("WORKSPACE_ADMISSION_POLICY", default="queue")
+WORKSPACE_ADMISSION_RETRY_SECONDS = config("WORKSPACE_ADMISSION_RETRY_SECONDS", default=10, cast=int)
+WORKSPACE_ADMISSION_MAX_WAIT = config("WORKSPACE_ADMISSION_MAX_WAIT", default=600, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -234,6 +333,8 @@ CORS_ALLOWED_ORIGINS = [
     "https://main.d1mmt360isf99v.amplifyapp.com"
 ]
 CORS_ALLOW_CREDENTIALS = True
+# Let browser clients read validators for conditional GETs
+CORS_EXPOSE_HEADERS = ["ETag"]
 
 # CSRF Settings
 CSRF_TRUSTED_ORIGINS = [
@@ -0,0 +1,208 @@
+"""
+Unit tests for report generation and background jobs
+"""
+import csv
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import CustomUser, ReportJob
+from core import report_utils
+from core.jobs import JobRunner, wait_for_status
+from core.report_utils import ReportGenerator
+
+
+class StreamingReportTestCase(TestCase):
+    """Test reports written and served row by row"""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.base_dir, ignore_errors=True)
+        self.generator = ReportGenerator('user')
+        self.generator.base_dir = self.base_dir
+        self.generator.chunk_size = 2
+        for number in range(5):
+            CustomUser.objects.create_user(
+                username=f'report{number}@example.com', email=f'report{number}@example.com',
+                password='TestPass123!@#', role='student'
+            )
+        self.users = CustomUser.objects.order_by('id').values('id', 'email', 'role', 'created_at')
+
+    def test_stream_csv_from_queryset(self):
+        """Test a queryset is written to CSV in chunks without caching it"""
+        with CaptureQueriesContext(connection) as queries:
+            path = self.generator.stream_csv(self.users, filename='users.csv')
+
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row['email'] for row in rows], [f'report{n}@example.com' for n in range(5)])
+        self.assertEqual(list(rows[0]), ['id', 'email', 'role', 'created_at'])
+        self.assertIsNone(self.users._result_cache)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([r['name'] for r in self.generator.list_reports('csv')], ['users.csv'])
+
+        with self.assertRaises(ValueError):
+            self.generator.stream_csv(CustomUser.objects.none().values())
+
+        print(f"✅ Test Passed: CSV streamed from queryset")
+
+    def test_stream_json_lines_and_array(self):
+        """Test JSON Lines and JSON array files parse back to the rows"""
+        lines_path = self.generator.stream_json(self.users)
+        array_path = self.generator.stream_json(self.users, filename='users.json', lines=False)
+        empty_path = self.generator.stream_json([], filename='empty.json', lines=False)
+
+        with open(lines_path) as f:
+            lines = [json.loads(line) for line in f]
+        with open(array_path) as f:
+            array = json.load(f)
+        with open(empty_path) as f:
+            self.assertEqual(json.load(f), [])
+        self.assertTrue(lines_path.endswith('.jsonl'))
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines, array)
+
+        print(f"✅ Test Passed: JSON streamed")
+
+    def test_streaming_responses(self):
+        """Test downloads are streamed and produce the same content"""
+        response = self.generator.get_streaming_csv_response(self.users, 'users.csv')
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(body.strip().splitlines()), 6)
+        self.assertIn('attachment; filename="users.csv"', response['Content-Disposition'])
+
+        response = self.generator.get_streaming_json_response(self.users, 'users.json')
+        self.assertEqual(len(json.loads(b''.join(response.streaming_content))), 5)
+
+        response = self.generator.get_streaming_json_response(iter([{'a': 1}]), 'rows.jsonl', lines=True)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(b''.join(response.streaming_content), b'{"a": 1}\n')
+
+        print(f"✅ Test Passed: Streaming responses")
+
+    def test_parquet_typed_columns(self):
+        """Test a Parquet report keeps column types and writes one row group per chunk"""
+        path = self.generator.generate_parquet(self.users, filename='users.parquet')
+
+        parquet = report_utils.pq.ParquetFile(path)
+        self.assertEqual(parquet.metadata.num_rows, 5)
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        self.assertEqual(parquet.metadata.row_group(0).column(0).compression, 'ZSTD')
+        schema = parquet.schema_arrow
+        self.assertTrue(report_utils.pa.types.is_integer(schema.field('id').type))
+        self.assertTrue(report_utils.pa.types.is_timestamp(schema.field('created_at').type))
+        self.assertEqual(parquet.read().column('email').to_pylist()[0], 'report0@example.com')
+        self.assertEqual([r['format'] for r in self.generator.list_reports()], ['parquet'])
+
+        print(f"✅ Test Passed: Parquet written with typed columns")
+
+    def test_parquet_nullable_columns_typed_from_model(self):
+        """Test a column NULL throughout the first chunk keeps its model type"""
+        trainer = CustomUser.objects.create_user(
+            username='trainer@example.com', email='trainer@example.com', password='TestPass123!@#', role='trainer'
+        )
+        CustomUser.objects.filter(email='report4@example.com').update(assigned_trainer=trainer, track='DP')
+        users = CustomUser.objects.filter(role='student').order_by('id').values(
+            'id', 'track', 'assigned_trainer__email', 'assigned_trainer', 'is_active', 'created_at',
+        )
+
+        path = self.generator.stream(users, 'parquet', filename='users.parquet', progress=lambda written: None)
+
+        table = report_utils.pq.read_table(path)
+        schema = table.schema
+        self.assertEqual(schema.field('assigned_trainer__email').type, report_utils.pa.string())
+        self.assertEqual(schema.field('assigned_trainer').type, report_utils.pa.int64())
+        self.assertEqual(schema.field('is_active').type, report_utils.pa.bool_())
+        self.assertTrue(report_utils.pa.types.is_timestamp(schema.field('created_at').type))
+        self.assertEqual(table.column('assigned_trainer__email').to_pylist(), [None] * 4 + ['trainer@example.com'])
+
+        print(f"✅ Test Passed: Nullable Parquet columns typed from the model")
+
+    def test_parquet_widens_null_columns(self):
+        """Test rows without a model take a NULL column's type from later chunks"""
+        rows = [
+            {'track': 'DP', 'last_activity': None, 'note': None},
+            {'track': 'FSD', 'last_activity': None, 'note': None},
+            {'track': 'DP', 'last_activity': None, 'note': None},
+            {'track': 'FSD', 'last_activity': 3, 'note': None},
+            {'track': 'DP', 'last_activity': 4, 'note': None},
+        ]
+
+        path = self.generator.generate_parquet(iter(rows), filename='rows.parquet')
+
+        parquet = report_utils.pq.ParquetFile(path)
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        table = parquet.read()
+        self.assertEqual(table.schema.field('last_activity').type, report_utils.pa.int64())
+        self.assertEqual(table.column('last_activity').to_pylist(), [None, None, None, 3, 4])
+        # A column NULL in every row stays untyped
+        self.assertTrue(report_utils.pa.types.is_null(table.schema.field('note').type))
+
+        print(f"✅ Test Passed: NULL Parquet columns widened from later chunks")
+
+    def test_parquet_falls_back_to_csv(self):
+        """Test Parquet reports are written as CSV without pyarrow"""
+        with mock.patch.object(report_utils, 'pq', None):
+            path = self.generator.stream(self.users, 'parquet', filename='users.parquet')
+
+        self.assertEqual(Path(path).name, 'users.csv')
+        with open(path, newline='') as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 5)
+
+        print(f"✅ Test Passed: Parquet falls back to CSV")
+
+
+class JobRunnerTestCase(TestCase):
+    """Test the runner and long-poll shared by workspace and report jobs"""
+
+    def setUp(self):
+        self.ran = []
+        self.runner = JobRunner(
+            'test-job',
+            self.ran.append,
+            workers_setting='REPORT_JOB_WORKERS',
+            eager_setting='REPORT_JOBS_EAGER',
+            stale_setting='REPORT_JOB_STALE_SECONDS',
+        )
+
+    @override_settings(REPORT_JOBS_EAGER=True, REPORT_JOB_STALE_SECONDS=60)
+    def test_stale_jobs_failed_and_eager_dispatch(self):
+        """Test jobs that stopped updating are failed and eager jobs run inline"""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        stale = ReportJob.objects.create(report_type='user', params_hash='stale')
+        ReportJob.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        fresh = ReportJob.objects.create(report_type='user', params_hash='fresh')
+
+        self.assertEqual(self.runner.fail_stale(ReportJob.objects.all(), 'Report job timed out'), 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'failed')
+        self.assertIsNotNone(stale.finished_at)
+
+        self.runner.dispatch(fresh)
+        self.assertEqual(self.ran, [fresh.pk])
+
+        print(f"✅ Test Passed: Stale jobs failed, eager jobs run inline")
+
+    def test_wait_for_status_returns_on_change(self):
+        """Test the long-poll returns as soon as the job's status changes"""
+        job = ReportJob.objects.create(report_type='user', params_hash='poll')
+
+        def finish(_):
+            ReportJob.objects.filter(pk=job.pk).update(status='done')
+
+        with mock.patch('core.jobs.time.sleep', side_effect=finish) as sleep:
+            wait_for_status(job, 'queued', 30)
+
+        self.assertEqual(job.status, 'done')
+        sleep.assert_called_once()
+
+        print(f"✅ Test Passed: Long-poll returned on status change")
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Track, Project, ProjectStep, Deliverable, StudentProgress, Submission
+from .models import (
+    Track, Project, ProjectStep, Deliverable, StudentProgress, ProjectProgressSummary, Submission,
+    SubmissionEvent,
+)
 
 
 @admin.register(Track)
@@ -51,6 +54,14 @@ class StudentProgressAdmin(admin.ModelAdmin):
     date_hierarchy = 'completed_at'
 
 
+@admin.register(ProjectProgressSummary)
+class ProjectProgressSummaryAdmin(admin.ModelAdmin):
+    list_display = ['student', 'project', 'completed_steps', 'total_steps', 'completed_at', 'updated_at']
+    list_filter = ['project__track', 'project']
+    search_fields = ['student__email', 'student__name']
+    readonly_fields = ['updated_at']
+
+
 @admin.register(Submission)
 class SubmissionAdmin(admin.ModelAdmin):
     list_display = ['student', 'deliverable', 'status', 'submitted_at', 'reviewed_by']
@@ -58,3 +69,21 @@ class SubmissionAdmin(admin.ModelAdmin):
     search_fields = ['student__email', 'student__name', 'deliverable__title']
     date_hierarchy = 'submitted_at'
     readonly_fields = ['submitted_at', 'updated_at']
+
+
+@admin.register(SubmissionEvent)
+class SubmissionEventAdmin(admin.ModelAdmin):
+    """Read-only: the log is append-only"""
+    list_display = ['submission', 'kind', 'status', 'actor', 'revision', 'wait_seconds', 'created_at']
+    list_filter = ['kind', 'status']
+    search_fields = ['submission__student__email', 'actor__email']
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
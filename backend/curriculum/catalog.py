@@ -0,0 +1,89 @@
+"""
+Versioned cache for the serialized curriculum catalog.
+
+Tracks, projects, steps and deliverables are edited rarely (populate_curriculum
+or the admin), so the student-independent part of the serialized tree is kept
+in the default cache (Redis when REDIS_URL is configured). Entries are keyed by
+a catalog version that signals bump whenever curriculum content changes, so
+stale entries are never read and simply expire. Per-student progress is laid
+over the cached payload at request time.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = 'curriculum:catalog:version'
+
+
+def get_catalog_version():
+    """Return the current catalog version, initialising it if missing"""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted version key never reuses old entries
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog entry"""
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        get_catalog_version()
+
+
+def catalog_cache_key(name):
+    return f'curriculum:catalog:{get_catalog_version()}:{name}'
+
+
+def get_cached_catalog(name, build):
+    """
+    Return the cached payload for `name`, building and storing it on a miss.
+
+    Args:
+        name: Entry name within the catalog (e.g. "tracks", "projects:DP")
+        build: Callable returning the serialized payload
+
+    Returns:
+        Serialized catalog data without student progress
+    """
+    try:
+        key = catalog_cache_key(name)
+        data = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Catalog cache unavailable: {e}")
+        return build()
+
+    if data is None:
+        data = build()
+        try:
+            cache.set(key, data, settings.CURRICULUM_CATALOG_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Could not store catalog entry {name}: {e}")
+    return data
+
+
+def overlay_project_progress(project, progress):
+    """Fill the student-specific fields of a serialized project in place"""
+    for step in project['steps']:
+        step['is_completed'] = progress.is_step_completed(step['id']) if progress else False
+    if progress:
+        project['progress_percentage'] = progress.project_percentage(project['id'])
+        project['is_unlocked'] = progress.is_project_unlocked(project['id'])
+    else:
+        project['progress_percentage'] = 0
+        project['is_unlocked'] = False
+    return project
+
+
+def overlay_track_progress(track, progress):
+    """Fill the student-specific fields of a serialized track in place"""
+    for project in track['projects']:
+        overlay_project_progress(project, progress)
+    track['overall_progress'] = progress.track_percentage(track['id']) if progress else 0
+    return track
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from curriculum.catalog import bump_catalog_version
 from curriculum.models import Track, Project, ProjectStep, Deliverable
 
 
@@ -262,5 +263,8 @@ class Command(BaseCommand):
         ])
         
         self.stdout.write(self.style.SUCCESS('✓ Full-Stack Developer track created'))
+        
+        # bulk_create skips post_save, so invalidate the cached catalog explicitly
+        bump_catalog_version()
         self.stdout.write(self.style.SUCCESS(f'✓ Total: {Track.objects.count()} tracks, {Project.objects.count()} projects'))
         self.stdout.write(self.style.SUCCESS(f'✓ {ProjectStep.objects.count()} steps, {Deliverable.objects.count()} deliverables'))
@@ -0,0 +1,17 @@
+"""
+Django management command to recount every student's project progress summaries
+"""
+from django.core.management.base import BaseCommand
+
+from curriculum.models import Project
+from curriculum.progress import rebuild_project_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recount ProjectProgressSummary rows from StudentProgress (after bulk imports or manual SQL)'
+
+    def handle(self, *args, **options):
+        projects = list(Project.objects.values_list('id', flat=True))
+        for project_id in projects:
+            rebuild_project_summaries(project_id)
+        self.stdout.write(self.style.SUCCESS(f"✓ Rebuilt progress summaries for {len(projects)} project(s)"))
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def backfill_summaries(apps, schema_editor):
+    """Summarize progress recorded before the table existed"""
+    Project = apps.get_model('curriculum', 'Project')
+    StudentProgress = apps.get_model('curriculum', 'StudentProgress')
+    ProjectProgressSummary = apps.get_model('curriculum', 'ProjectProgressSummary')
+
+    totals = dict(Project.objects.annotate(total=Count('steps')).values_list('id', 'total'))
+    rows = StudentProgress.objects.filter(step__isnull=False).order_by().values('student_id', 'project_id').annotate(
+        completed=Count('id', filter=Q(is_completed=True))
+    )
+    now = timezone.now()
+    ProjectProgressSummary.objects.bulk_create(
+        [
+            ProjectProgressSummary(
+                student_id=row['student_id'],
+                project_id=row['project_id'],
+                completed_steps=row['completed'],
+                total_steps=totals[row['project_id']],
+                completed_at=now if totals[row['project_id']] and row['completed'] >= totals[row['project_id']] else None,
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectProgressSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_steps', models.PositiveIntegerField(default=0)),
+                ('total_steps', models.PositiveIntegerField(default=0)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_summaries', to='curriculum.project')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Project progress summaries',
+                'unique_together': {('student', 'project')},
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0002_project_progress_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['status', 'submitted_at'], name='curriculum__status_a32a2d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', 'status', 'submitted_at'], name='curriculum__student_e56265_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['deliverable', 'status', 'submitted_at'], name='curriculum__deliver_ef295e_idx'),
+        ),
+    ]
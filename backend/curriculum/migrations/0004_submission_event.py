@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_events(apps, schema_editor):
+    """Start the log of existing submissions from what their rows still show"""
+    Submission = apps.get_model('curriculum', 'Submission')
+    SubmissionEvent = apps.get_model('curriculum', 'SubmissionEvent')
+
+    Submission.objects.update(last_submitted_at=F('submitted_at'))
+    events = []
+    for submission in Submission.objects.iterator():
+        events.append(SubmissionEvent(
+            submission_id=submission.pk, kind='SUBMITTED', status='PENDING', actor_id=submission.student_id,
+            created_at=submission.submitted_at,
+        ))
+        if submission.reviewed_at and submission.status != 'PENDING':
+            events.append(SubmissionEvent(
+                submission_id=submission.pk, kind='REVIEWED', status=submission.status,
+                actor_id=submission.reviewed_by_id, feedback=submission.feedback, created_at=submission.reviewed_at,
+                wait_seconds=max(int((submission.reviewed_at - submission.submitted_at).total_seconds()), 0),
+            ))
+    SubmissionEvent.objects.bulk_create(events, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0003_submission_review_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='last_submitted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='revision',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='SubmissionEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SUBMITTED', 'Submitted'), ('REVIEWED', 'Reviewed'), ('RESUBMITTED', 'Resubmitted')], max_length=20)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending Review'), ('APPROVED', 'Approved'), ('REJECTED', 'Needs Revision')], max_length=20)),
+                ('feedback', models.TextField(blank=True)),
+                ('revision', models.PositiveIntegerField(default=1)),
+                ('wait_seconds', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submission_events', to=settings.AUTH_USER_MODEL)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='curriculum.submission')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['submission', 'created_at'], name='curriculum__submiss_1f15e4_idx'), models.Index(fields=['kind', 'created_at'], name='curriculum__kind_58d9ed_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 
 class Track(models.Model):
@@ -122,6 +123,32 @@ class StudentProgress(models.Model):
         return f"{self.student.email} - {self.project.title}"
 
 
+class ProjectProgressSummary(models.Model):
+    """
+    Per-student completion of one project, kept in step with StudentProgress
+    and the project's steps (see curriculum.progress) so reads need no counting
+    """
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='project_summaries')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='progress_summaries')
+    completed_steps = models.PositiveIntegerField(default=0)
+    total_steps = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)  # Set once every step is complete
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['student', 'project']
+        verbose_name_plural = 'Project progress summaries'
+    
+    @property
+    def percentage(self):
+        if self.total_steps == 0:
+            return 0
+        return int((self.completed_steps / self.total_steps) * 100)
+    
+    def __str__(self):
+        return f"{self.student.email} - {self.project.title}: {self.completed_steps}/{self.total_steps}"
+
+
 class Submission(models.Model):
     """Student submission for project deliverables"""
     STATUS_CHOICES = [
@@ -146,10 +173,63 @@ class Submission(models.Model):
     )
     reviewed_at = models.DateTimeField(null=True, blank=True)
     submitted_at = models.DateTimeField(auto_now_add=True)
+    # Projections of the event log: latest (re)submission and how many there were
+    last_submitted_at = models.DateTimeField(null=True, blank=True)
+    revision = models.PositiveIntegerField(default=1)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-submitted_at']
+        # Back the trainer review queue: status filter plus submitted_at order,
+        # per student and per deliverable
+        indexes = [
+            models.Index(fields=['status', 'submitted_at']),
+            models.Index(fields=['student', 'status', 'submitted_at']),
+            models.Index(fields=['deliverable', 'status', 'submitted_at']),
+        ]
     
     def __str__(self):
         return f"{self.student.email} - {self.deliverable.title} ({self.status})"
+
+
+class SubmissionEvent(models.Model):
+    """
+    Append-only history of a submission. Submission holds the current state;
+    these rows are never updated, so review cycles and turnaround survive
+    """
+    KIND_CHOICES = [
+        ('SUBMITTED', 'Submitted'),
+        ('REVIEWED', 'Reviewed'),
+        ('RESUBMITTED', 'Resubmitted'),
+    ]
+    
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=Submission.STATUS_CHOICES)  # Status after the event
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='submission_events'
+    )
+    feedback = models.TextField(blank=True)
+    revision = models.PositiveIntegerField(default=1)
+    # Reviews only: seconds the submission waited since it was last (re)submitted
+    wait_seconds = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['submission', 'created_at']),
+            models.Index(fields=['kind', 'created_at']),
+        ]
+    
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Submission events are append-only")
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return f"Submission {self.submission_id} {self.kind.lower()} ({self.status})"
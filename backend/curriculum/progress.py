@@ -0,0 +1,329 @@
+"""
+Student progress resolution for the curriculum serializers.
+
+Rendering a track tree used to issue one COUNT/EXISTS query per step and per
+project. ProgressIndex loads everything the serializers need for one student
+in a fixed number of queries and answers the per-object questions from memory.
+set_step_progress applies many step changes at once for the bulk endpoint.
+
+ProjectProgressSummary holds each student's completed/total step counts per
+project. The refresh functions below recount only the rows a change touches;
+signals call them for single saves and deletes, bulk paths call them directly.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .catalog import get_cached_catalog
+from .models import Project, ProjectProgressSummary, ProjectStep, StudentProgress, Submission
+
+
+PROGRESS_CONTEXT_KEY = 'progress_index'
+
+# Students with progress or submissions within this many days count as active
+ACTIVE_DAYS = 7
+
+
+def load_catalog_shape():
+    """Per-project step totals and (id, track, number) for every project"""
+    step_totals = list(ProjectStep.objects.order_by().values('project_id').annotate(
+        total=Count('id')
+    ).values_list('project_id', 'total'))
+
+    projects = list(Project.objects.order_by().values_list('id', 'track_id', 'number'))
+
+    return step_totals, projects
+
+
+class ProgressIndex:
+    """In-memory view of a student's completed steps and project step totals"""
+
+    def __init__(self, completed_steps, step_totals, projects):
+        """
+        Args:
+            completed_steps: Iterable of (project_id, step_id) completed by the student
+            step_totals: Mapping of project_id -> number of steps in the project
+            projects: Iterable of (project_id, track_id, number) for every project
+        """
+        self.completed_step_ids = set()
+        self.completed_by_project = defaultdict(int)
+        for project_id, step_id in completed_steps:
+            self.completed_step_ids.add(step_id)
+            self.completed_by_project[project_id] += 1
+
+        self.step_totals = dict(step_totals)
+        self.projects = {}
+        self.project_by_number = {}
+        self.track_projects = defaultdict(list)
+        for project_id, track_id, number in projects:
+            self.projects[project_id] = (track_id, number)
+            self.project_by_number[(track_id, number)] = project_id
+            self.track_projects[track_id].append(project_id)
+
+    @classmethod
+    def for_student(cls, user):
+        """Build the index for a student; only the completed steps are per-student"""
+        completed_steps = StudentProgress.objects.filter(
+            student=user,
+            step__isnull=False,
+            is_completed=True
+        ).order_by().values_list('project_id', 'step_id')
+
+        step_totals, projects = get_cached_catalog('progress-shape', load_catalog_shape)
+
+        return cls(completed_steps, step_totals, projects)
+
+    @staticmethod
+    def _percentage(completed, total):
+        if total == 0:
+            return 0
+        return int((completed / total) * 100)
+
+    def is_step_completed(self, step_id):
+        return step_id in self.completed_step_ids
+
+    def project_percentage(self, project_id):
+        return self._percentage(
+            self.completed_by_project.get(project_id, 0),
+            self.step_totals.get(project_id, 0)
+        )
+
+    def is_project_complete(self, project_id):
+        total = self.step_totals.get(project_id, 0)
+        return self.completed_by_project.get(project_id, 0) == total
+
+    def is_project_unlocked(self, project_id):
+        """First project is always unlocked, later ones need the previous one completed"""
+        if project_id not in self.projects:
+            return False
+        track_id, number = self.projects[project_id]
+        if number == 1:
+            return True
+        previous_id = self.project_by_number.get((track_id, number - 1))
+        if previous_id is None:
+            return False
+        return self.is_project_complete(previous_id)
+
+    def track_percentage(self, track_id):
+        project_ids = self.track_projects.get(track_id, [])
+        total = sum(self.step_totals.get(pid, 0) for pid in project_ids)
+        completed = sum(self.completed_by_project.get(pid, 0) for pid in project_ids)
+        return self._percentage(completed, total)
+
+
+def _upsert_summaries(rows, finished):
+    """
+    Write (student_id, project_id, completed, total) rows, keeping the
+    completion time of projects that were already complete
+    """
+    now = timezone.now()
+    ProjectProgressSummary.objects.bulk_create(
+        [
+            ProjectProgressSummary(
+                student_id=student_id,
+                project_id=project_id,
+                completed_steps=completed,
+                total_steps=total,
+                completed_at=(finished.get((student_id, project_id)) or now) if total and completed >= total else None,
+            )
+            for student_id, project_id, completed, total in rows
+        ],
+        update_conflicts=True,
+        unique_fields=['student', 'project'],
+        update_fields=['completed_steps', 'total_steps', 'completed_at', 'updated_at'],
+    )
+
+
+def _finished(summaries):
+    return {
+        (student_id, project_id): completed_at
+        for student_id, project_id, completed_at in summaries.filter(completed_at__isnull=False).values_list(
+            'student_id', 'project_id', 'completed_at'
+        )
+    }
+
+
+def refresh_project_summaries(student_id, project_ids):
+    """Recount one student's summaries for the given projects"""
+    totals = dict(Project.objects.filter(id__in=set(project_ids)).annotate(
+        total=Count('steps')
+    ).order_by().values_list('id', 'total'))
+    if not totals:
+        return
+    completed = dict(StudentProgress.objects.filter(
+        student_id=student_id, project_id__in=totals, step__isnull=False, is_completed=True
+    ).order_by().values('project_id').annotate(count=Count('id')).values_list('project_id', 'count'))
+    finished = _finished(ProjectProgressSummary.objects.filter(student_id=student_id, project_id__in=totals))
+
+    _upsert_summaries(
+        [(student_id, project_id, completed.get(project_id, 0), total) for project_id, total in totals.items()],
+        finished,
+    )
+
+
+def rebuild_project_summaries(project_id):
+    """Recount every student's summary for a project, e.g. after steps were added or removed"""
+    total = ProjectStep.objects.filter(project_id=project_id).count()
+    # Joining the step skips progress rows of a step deleted in the same cascade
+    completed = dict(StudentProgress.objects.filter(
+        project_id=project_id, step__project_id=project_id, is_completed=True
+    ).order_by().values('student_id').annotate(count=Count('id')).values_list('student_id', 'count'))
+    summaries = ProjectProgressSummary.objects.filter(project_id=project_id)
+    finished = _finished(summaries)
+    students = set(completed) | set(summaries.values_list('student_id', flat=True))
+
+    _upsert_summaries(
+        [(student_id, project_id, completed.get(student_id, 0), total) for student_id in students],
+        finished,
+    )
+
+
+def annotate_student_progress(students, active_days=ACTIVE_DAYS):
+    """
+    Annotate a user queryset with track progress and activity, as one query
+
+    Adds completed_steps, total_steps and progress_percentage (share of the steps on
+    the student's own track, from the summaries), last_activity (latest
+    progress change or submission), pending_submissions, and activity_status
+    ("Active" when last active within `active_days`, else "Inactive").
+    """
+    track_steps = ProjectStep.objects.filter(
+        project__track__code=OuterRef('track')
+    ).order_by().values('project__track__code').annotate(count=Count('id')).values('count')
+    completed_steps = ProjectProgressSummary.objects.filter(
+        student=OuterRef('pk'), project__track__code=OuterRef('track')
+    ).order_by().values('student').annotate(done=Sum('completed_steps')).values('done')
+    last_progress = StudentProgress.objects.filter(
+        student=OuterRef('pk')
+    ).order_by('-updated_at').values('updated_at')[:1]
+    last_submission = Submission.objects.filter(
+        student=OuterRef('pk')
+    ).order_by('-submitted_at').values('submitted_at')[:1]
+    pending = Submission.objects.filter(
+        student=OuterRef('pk'), status='PENDING'
+    ).order_by().values('student').annotate(count=Count('id')).values('count')
+
+    cutoff = timezone.now() - timedelta(days=active_days)
+    return students.annotate(
+        total_steps=Coalesce(Subquery(track_steps), 0),
+        completed_steps=Coalesce(Subquery(completed_steps), 0),
+        # GREATEST returns NULL if either side is NULL on SQLite and MySQL
+        last_activity=Greatest(
+            Coalesce(Subquery(last_progress), Subquery(last_submission)),
+            Coalesce(Subquery(last_submission), Subquery(last_progress)),
+        ),
+        pending_submissions=Coalesce(Subquery(pending), 0),
+    ).annotate(
+        progress_percentage=Case(
+            When(total_steps__gt=0, then=F('completed_steps') * 100 / F('total_steps')),
+            default=Value(0),
+        ),
+        activity_status=Case(
+            When(last_activity__gte=cutoff, then=Value('Active')),
+            default=Value('Inactive'),
+        ),
+    )
+
+
+def invalid_step_items(items):
+    """Items whose step does not exist or belongs to another project (one query)"""
+    step_projects = dict(ProjectStep.objects.filter(
+        id__in={item['step_id'] for item in items}
+    ).order_by().values_list('id', 'project_id'))
+    return [item for item in items if step_projects.get(item['step_id']) != item['project_id']]
+
+
+def set_step_progress(user, items):
+    """
+    Mark many steps complete or incomplete in one transaction
+
+    Completed steps are upserted; incomplete ones only update existing rows,
+    as there is nothing to undo for a step never started. When a step appears
+    more than once the last item wins.
+
+    Args:
+        items: Validated dicts with project_id, step_id and completed
+
+    Returns:
+        Number of steps changed
+    """
+    latest = {item['step_id']: item for item in items}
+    complete = [item for item in latest.values() if item['completed']]
+    incomplete = [step_id for step_id, item in latest.items() if not item['completed']]
+    now = timezone.now()
+
+    with transaction.atomic():
+        StudentProgress.objects.bulk_create(
+            [
+                StudentProgress(
+                    student=user, project_id=item['project_id'], step_id=item['step_id'],
+                    is_completed=True, completed_at=now
+                )
+                for item in complete
+            ],
+            update_conflicts=True,
+            unique_fields=['student', 'project', 'step'],
+            update_fields=['is_completed', 'completed_at', 'updated_at'],
+        )
+        StudentProgress.objects.filter(student=user, step_id__in=incomplete).update(
+            is_completed=False, completed_at=None, updated_at=now
+        )
+        # Bulk writes send no signals
+        refresh_project_summaries(user.id, {item['project_id'] for item in latest.values()})
+    return len(latest)
+
+
+def progress_summary(user, project_ids):
+    """Completion of the given projects and their tracks after an update"""
+    index = ProgressIndex.for_student(user)
+    track_ids = sorted({index.projects[pid][0] for pid in project_ids if pid in index.projects})
+    return {
+        'projects': [
+            {
+                'project_id': project_id,
+                'completed_steps': index.completed_by_project.get(project_id, 0),
+                'total_steps': index.step_totals.get(project_id, 0),
+                'progress_percentage': index.project_percentage(project_id),
+                'is_completed': index.is_project_complete(project_id),
+            }
+            for project_id in sorted(project_ids)
+        ],
+        'tracks': [
+            {'track_id': track_id, 'overall_progress': index.track_percentage(track_id)}
+            for track_id in track_ids
+        ],
+    }
+
+
+def progress_fingerprint(user):
+    """
+    Cheap version of a student's progress: latest update plus row count, so
+    deletions change it too. Used for ETags on curriculum reads.
+    """
+    stats = StudentProgress.objects.filter(student=user).order_by().aggregate(
+        latest=Max('updated_at'),
+        rows=Count('id')
+    )
+    latest = stats['latest'].isoformat() if stats['latest'] else ''
+    return latest, stats['rows']
+
+
+def get_progress_index(context):
+    """
+    Return the ProgressIndex for the requesting student, building it once per
+    serializer tree. Nested serializers share the root context, so the index
+    is loaded a single time no matter how many tracks/projects/steps render.
+    """
+    if PROGRESS_CONTEXT_KEY in context:
+        return context[PROGRESS_CONTEXT_KEY]
+
+    request = context.get('request')
+    index = None
+    if request and request.user.is_authenticated:
+        index = ProgressIndex.for_student(request.user)
+    context[PROGRESS_CONTEXT_KEY] = index
+    return index
@@ -0,0 +1,120 @@
+"""
+Submission lifecycle recorded as an append-only event log.
+
+Every submission, review and resubmission appends a SubmissionEvent in the
+same transaction that updates the Submission row, which stays the projection
+of the current state. Each review event stores how long the submission
+waited, so turnaround metrics are an aggregate over indexed review events
+rather than a scan of submissions.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q
+from django.utils import timezone
+
+from .models import Submission, SubmissionEvent
+
+
+def record_submission(submission, actor):
+    """Log a new submission"""
+    submission.last_submitted_at = submission.submitted_at
+    Submission.objects.filter(pk=submission.pk).update(last_submitted_at=submission.last_submitted_at)
+    return SubmissionEvent.objects.create(
+        submission=submission, kind='SUBMITTED', status=submission.status, actor=actor,
+        revision=submission.revision, created_at=submission.submitted_at,
+    )
+
+
+def resubmit(submission, actor):
+    """Send a submission back for review after the student changed it"""
+    now = timezone.now()
+    with transaction.atomic():
+        submission.status = 'PENDING'
+        submission.revision += 1
+        submission.last_submitted_at = now
+        submission.save(update_fields=['status', 'revision', 'last_submitted_at', 'updated_at'])
+        SubmissionEvent.objects.create(
+            submission=submission, kind='RESUBMITTED', status='PENDING', actor=actor,
+            revision=submission.revision, created_at=now,
+        )
+    return submission
+
+
+def review_event(submission, reviewer, new_status, feedback, now):
+    """Apply a review to the submission in memory and return its unsaved event"""
+    waited = now - (submission.last_submitted_at or submission.submitted_at)
+    submission.status = new_status
+    submission.feedback = feedback
+    submission.reviewed_by = reviewer
+    submission.reviewed_at = now
+    return SubmissionEvent(
+        submission=submission, kind='REVIEWED', status=new_status, actor=reviewer, feedback=feedback,
+        revision=submission.revision, wait_seconds=max(int(waited.total_seconds()), 0), created_at=now,
+    )
+
+
+def review_submission(submission, reviewer, new_status, feedback=''):
+    """Record a trainer's decision"""
+    with transaction.atomic():
+        event = review_event(submission, reviewer, new_status, feedback, timezone.now())
+        submission.save(update_fields=['status', 'feedback', 'reviewed_by', 'reviewed_at', 'updated_at'])
+        event.save()
+    return submission
+
+
+def review_submissions(reviews, reviewer):
+    """
+    Record many decisions with one bulk update and one bulk insert
+
+    Args:
+        reviews: (submission, status, feedback) tuples
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        events = [review_event(submission, reviewer, new_status, feedback, now)
+                  for submission, new_status, feedback in reviews]
+        submissions = [submission for submission, _, _ in reviews]
+        for submission in submissions:
+            # bulk_update skips auto_now
+            submission.updated_at = now
+        Submission.objects.bulk_update(
+            submissions, ['status', 'feedback', 'reviewed_by', 'reviewed_at', 'updated_at'], batch_size=500
+        )
+        SubmissionEvent.objects.bulk_create(events, batch_size=500)
+    return submissions
+
+
+def review_metrics(submissions, days=30):
+    """
+    Review turnaround over the last `days` plus the current backlog
+
+    Args:
+        submissions: Submission queryset to measure (e.g. one trainer's students)
+    """
+    since = timezone.now() - timedelta(days=days)
+    reviews = SubmissionEvent.objects.filter(
+        submission__in=submissions, kind='REVIEWED', created_at__gte=since
+    ).order_by().aggregate(
+        reviews=Count('id'),
+        approved=Count('id', filter=Q(status='APPROVED')),
+        rejected=Count('id', filter=Q(status='REJECTED')),
+        avg_wait_seconds=Avg('wait_seconds'),
+        max_wait_seconds=Max('wait_seconds'),
+    )
+    backlog = submissions.filter(status='PENDING').order_by().aggregate(
+        pending=Count('id'),
+        oldest_pending_at=Min('last_submitted_at'),
+    )
+    resubmissions = SubmissionEvent.objects.filter(
+        submission__in=submissions, kind='RESUBMITTED', created_at__gte=since
+    ).count()
+
+    avg_wait = reviews['avg_wait_seconds']
+    return {
+        'window_days': days,
+        **reviews,
+        'avg_wait_seconds': round(avg_wait) if avg_wait is not None else None,
+        'resubmissions': resubmissions,
+        **backlog,
+    }
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Track, Project, ProjectStep, Deliverable, StudentProgress, Submission
+from .models import Track, Project, ProjectStep, Deliverable, StudentProgress, Submission, SubmissionEvent
+from .progress import get_progress_index
 
 
 class DeliverableSerializer(serializers.ModelSerializer):
@@ -17,13 +18,9 @@ class ProjectStepSerializer(serializers.ModelSerializer):
                   'resources', 'order', 'is_completed']
     
     def get_is_completed(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return StudentProgress.objects.filter(
-                student=request.user,
-                step=obj,
-                is_completed=True
-            ).exists()
+        progress = get_progress_index(self.context)
+        if progress:
+            return progress.is_step_completed(obj.id)
         return False
 
 
@@ -40,44 +37,16 @@ class ProjectSerializer(serializers.ModelSerializer):
                   'progress_percentage', 'is_unlocked']
     
     def get_progress_percentage(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            total_steps = obj.steps.count()
-            if total_steps == 0:
-                return 0
-            completed_steps = StudentProgress.objects.filter(
-                student=request.user,
-                project=obj,
-                step__isnull=False,
-                is_completed=True
-            ).count()
-            return int((completed_steps / total_steps) * 100)
+        progress = get_progress_index(self.context)
+        if progress:
+            return progress.project_percentage(obj.id)
         return 0
     
     def get_is_unlocked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            # First project is always unlocked
-            if obj.number == 1:
-                return True
-            
-            # Check if previous project is completed
-            previous_project = Project.objects.filter(
-                track=obj.track,
-                number=obj.number - 1
-            ).first()
-            
-            if previous_project:
-                total_steps = previous_project.steps.count()
-                if total_steps == 0:
-                    return True
-                completed_steps = StudentProgress.objects.filter(
-                    student=request.user,
-                    project=previous_project,
-                    step__isnull=False,
-                    is_completed=True
-                ).count()
-                return completed_steps == total_steps
+        progress = get_progress_index(self.context)
+        if progress:
+            # First project is always unlocked, later ones need the previous project completed
+            return progress.is_project_unlocked(obj.id)
         return False
 
 
@@ -91,18 +60,9 @@ class TrackSerializer(serializers.ModelSerializer):
                   'projects', 'overall_progress']
     
     def get_overall_progress(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            total_steps = ProjectStep.objects.filter(project__track=obj).count()
-            if total_steps == 0:
-                return 0
-            completed_steps = StudentProgress.objects.filter(
-                student=request.user,
-                project__track=obj,
-                step__isnull=False,
-                is_completed=True
-            ).count()
-            return int((completed_steps / total_steps) * 100)
+        progress = get_progress_index(self.context)
+        if progress:
+            return progress.track_percentage(obj.id)
         return 0
 
 
@@ -117,6 +77,13 @@ class StudentProgressSerializer(serializers.ModelSerializer):
         read_only_fields = ['completed_at', 'created_at']
 
 
+class StepProgressItemSerializer(serializers.Serializer):
+    """One entry of a bulk step progress update"""
+    project_id = serializers.IntegerField()
+    step_id = serializers.IntegerField()
+    completed = serializers.BooleanField(default=True)
+
+
 class SubmissionSerializer(serializers.ModelSerializer):
     deliverable_title = serializers.CharField(source='deliverable.title', read_only=True)
     deliverable_type = serializers.CharField(source='deliverable.deliverable_type', read_only=True)
@@ -129,5 +96,24 @@ class SubmissionSerializer(serializers.ModelSerializer):
         fields = ['id', 'deliverable', 'deliverable_title', 'deliverable_type', 'project_title', 
                   'submission_url', 'submission_text', 'submission_file', 
                   'status', 'feedback', 'student_name', 'reviewer_name',
-                  'reviewed_at', 'submitted_at', 'updated_at']
-        read_only_fields = ['student', 'reviewed_by', 'reviewed_at', 'submitted_at', 'updated_at']
+                  'reviewed_at', 'submitted_at', 'last_submitted_at', 'revision', 'updated_at']
+        # Status and feedback only change through reviews (curriculum.reviews)
+        read_only_fields = ['student', 'status', 'feedback', 'reviewed_by', 'reviewed_at', 'submitted_at',
+                            'last_submitted_at', 'revision', 'updated_at']
+
+
+class SubmissionReviewItemSerializer(serializers.Serializer):
+    """One entry of a bulk review"""
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=['APPROVED', 'REJECTED'])
+    feedback = serializers.CharField(allow_blank=True, default='')
+
+
+class SubmissionEventSerializer(serializers.ModelSerializer):
+    actor_name = serializers.CharField(source='actor.name', read_only=True)
+    
+    class Meta:
+        model = SubmissionEvent
+        fields = ['id', 'kind', 'status', 'actor', 'actor_name', 'feedback', 'revision',
+                  'wait_seconds', 'created_at']
+        read_only_fields = fields
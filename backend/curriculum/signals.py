@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .catalog import bump_catalog_version
+from .models import Track, Project, ProjectStep, Deliverable, StudentProgress
+from .progress import rebuild_project_summaries, refresh_project_summaries
+
+
+@receiver(post_save, sender=Track)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=ProjectStep)
+@receiver(post_save, sender=Deliverable)
+@receiver(post_delete, sender=Track)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=ProjectStep)
+@receiver(post_delete, sender=Deliverable)
+def invalidate_catalog(sender, **kwargs):
+    """Bump the catalog version when curriculum content changes"""
+    bump_catalog_version()
+    # Bump again after commit so entries rebuilt from pre-commit data are dropped too
+    transaction.on_commit(bump_catalog_version)
+
+
+def _deleted_directly(origin, model):
+    """
+    Whether a delete started from `model` itself rather than cascading from a
+    student or project, whose summaries are being deleted along with it
+    """
+    return isinstance(origin, model) or getattr(origin, 'model', None) is model
+
+
+@receiver(post_save, sender=StudentProgress)
+def update_summary_on_progress_save(sender, instance, **kwargs):
+    refresh_project_summaries(instance.student_id, [instance.project_id])
+
+
+@receiver(post_delete, sender=StudentProgress)
+def update_summary_on_progress_delete(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(origin, StudentProgress):
+        refresh_project_summaries(instance.student_id, [instance.project_id])
+
+
+@receiver(post_save, sender=ProjectStep)
+def update_summaries_on_step_added(sender, instance, created, **kwargs):
+    if created:
+        rebuild_project_summaries(instance.project_id)
+
+
+@receiver(post_delete, sender=ProjectStep)
+def update_summaries_on_step_removed(sender, instance, origin=None, **kwargs):
+    # The step's progress rows are deleted before this runs
+    if _deleted_directly(origin, ProjectStep):
+        rebuild_project_summaries(instance.project_id)
@@ -1,3 +1,689 @@
-from django.test import TestCase
+"""
+Unit tests for curriculum tracks, projects and student progress
+"""
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from accounts.models import CustomUser
+from curriculum.models import (
+    Track, Project, ProjectStep, Deliverable, StudentProgress, ProjectProgressSummary, Submission,
+    SubmissionEvent,
+)
+from curriculum.reviews import record_submission, review_submission
+
+
+def database_queries(context):
+    """Queries captured by `context`, leaving out the database cache backend's own"""
+    return [q for q in context.captured_queries if 'django_cache' not in q['sql']]
+
+
+class CurriculumTestMixin:
+    """Shared curriculum fixtures"""
+
+    def setUp(self):
+        cache.clear()
+
+    def create_track(self, code='DP', projects=3, steps_per_project=3):
+        track = Track.objects.create(code=code, name=f'{code} Track', description='Track')
+        for number in range(1, projects + 1):
+            project = Project.objects.create(
+                track=track,
+                number=number,
+                title=f'{code} Project {number}',
+                description='Project',
+                order=number
+            )
+            ProjectStep.objects.bulk_create([
+                ProjectStep(project=project, step_number=step, title=f'Step {step}',
+                            description='Step', order=step)
+                for step in range(1, steps_per_project + 1)
+            ])
+            Deliverable.objects.create(project=project, title='Repo', deliverable_type='GITHUB')
+        return track
+
+    def complete_steps(self, user, project, count):
+        for step in project.steps.all()[:count]:
+            StudentProgress.objects.create(
+                student=user, project=project, step=step, is_completed=True
+            )
+
+
+class ProgressAnnotationTestCase(CurriculumTestMixin, APITestCase):
+    """Test progress fields on the track/project serializer tree"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='progress@example.com',
+            email='progress@example.com',
+            password='TestPass123!@#',
+            role='student'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.track = self.create_track()
+
+    def test_progress_values(self):
+        """Test step, project and track progress are resolved correctly"""
+        projects = list(self.track.projects.order_by('number'))
+        self.complete_steps(self.user, projects[0], 3)
+        self.complete_steps(self.user, projects[1], 1)
+
+        response = self.client.get('/api/curriculum/tracks/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        track = response.data[0]
+        self.assertEqual(track['overall_progress'], 44)
+
+        first, second, third = track['projects']
+        self.assertEqual(first['progress_percentage'], 100)
+        self.assertTrue(first['is_unlocked'])
+        self.assertTrue(all(step['is_completed'] for step in first['steps']))
+
+        self.assertEqual(second['progress_percentage'], 33)
+        self.assertTrue(second['is_unlocked'])
+        self.assertEqual([step['is_completed'] for step in second['steps']], [True, False, False])
+
+        self.assertEqual(third['progress_percentage'], 0)
+        self.assertFalse(third['is_unlocked'])
+
+        print(f"✅ Test Passed: Progress annotations resolved")
+
+    def test_track_list_query_count_is_constant(self):
+        """Test listing tracks does not issue per-step/per-project queries"""
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/curriculum/tracks/')
+
+        self.create_track(code='FSD', projects=6, steps_per_project=8)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/curriculum/tracks/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(small), len(large))
+
+        print(f"✅ Test Passed: Track list rendered in {len(large)} queries")
+
+    def test_project_list_filtered_by_track(self):
+        """Test project listing with track filter keeps progress fields"""
+        self.create_track(code='FSD', projects=2)
+        project = self.track.projects.get(number=1)
+        self.complete_steps(self.user, project, 3)
+
+        response = self.client.get('/api/curriculum/projects/?track=DP')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertTrue(response.data[1]['is_unlocked'])
+
+        print(f"✅ Test Passed: Project list filtered by track")
+
+
+class CatalogCacheTestCase(CurriculumTestMixin, APITestCase):
+    """Test the versioned curriculum catalog cache"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='catalog@example.com',
+            email='catalog@example.com',
+            password='TestPass123!@#',
+            role='student'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.track = self.create_track()
+
+    def test_cached_catalog_skips_catalog_queries(self):
+        """Test a warm catalog only queries the student's progress"""
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get('/api/curriculum/tracks/')
+        with CaptureQueriesContext(connection) as warm:
+            response = self.client.get('/api/curriculum/tracks/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLess(len(warm), len(cold))
+        self.assertFalse(any('curriculum_projectstep' in q['sql'] for q in warm.captured_queries))
+
+        print(f"✅ Test Passed: Warm catalog served in {len(warm)} queries")
+
+    def test_progress_overlaid_on_cached_catalog(self):
+        """Test cached payload still reflects each student's progress"""
+        self.client.get('/api/curriculum/tracks/')
+        project = self.track.projects.get(number=1)
+        self.complete_steps(self.user, project, 3)
+
+        response = self.client.get('/api/curriculum/tracks/')
+        first = response.data[0]['projects'][0]
+        self.assertEqual(first['progress_percentage'], 100)
+        self.assertTrue(response.data[0]['projects'][1]['is_unlocked'])
+
+        other = CustomUser.objects.create_user(
+            username='other@example.com',
+            email='other@example.com',
+            password='TestPass123!@#',
+            role='student'
+        )
+        self.client.force_authenticate(user=other)
+        response = self.client.get('/api/curriculum/tracks/')
+        self.assertEqual(response.data[0]['projects'][0]['progress_percentage'], 0)
+        self.assertFalse(response.data[0]['projects'][1]['is_unlocked'])
+
+        print(f"✅ Test Passed: Progress overlaid per student")
+
+    def test_catalog_edit_invalidates_cache(self):
+        """Test editing curriculum content is visible on the next request"""
+        self.client.get('/api/curriculum/projects/?track=DP')
+        step = ProjectStep.objects.filter(project__track=self.track).first()
+        step.title = 'Renamed step'
+        step.save()
+
+        response = self.client.get(f'/api/curriculum/projects/{step.project_id}/?track=DP')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        titles = [s['title'] for s in response.data['steps']]
+        self.assertIn('Renamed step', titles)
+
+        Project.objects.filter(pk=step.project_id).delete()
+        response = self.client.get('/api/curriculum/projects/?track=DP')
+        self.assertEqual(len(response.data), 2)
+
+        print(f"✅ Test Passed: Catalog invalidated on edit")
+
+
+class ConditionalGetTestCase(CurriculumTestMixin, APITestCase):
+    """Test ETag / If-None-Match handling on curriculum reads"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='etag@example.com',
+            email='etag@example.com',
+            password='TestPass123!@#',
+            role='student'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.track = self.create_track()
+
+    def test_not_modified_before_serialization(self):
+        """Test matching If-None-Match returns 304 without catalog queries"""
+        response = self.client.get('/api/curriculum/tracks/')
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/curriculum/tracks/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(database_queries(queries)), 1)
+
+        print(f"✅ Test Passed: 304 served in {len(database_queries(queries))} query")
+
+    def test_progress_change_invalidates_etag(self):
+        """Test completing a step changes the ETag"""
+        response = self.client.get('/api/curriculum/projects/?track=DP')
+        etag = response['ETag']
+
+        self.complete_steps(self.user, self.track.projects.get(number=1), 1)
+        response = self.client.get('/api/curriculum/projects/?track=DP', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        print(f"✅ Test Passed: Progress change invalidated ETag")
+
+    def test_catalog_change_invalidates_etag(self):
+        """Test editing the catalog changes the ETag"""
+        response = self.client.get('/api/curriculum/tracks/')
+        etag = response['ETag']
+
+        self.track.name = 'Renamed'
+        self.track.save()
+        response = self.client.get('/api/curriculum/tracks/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['name'], 'Renamed')
+
+        print(f"✅ Test Passed: Catalog change invalidated ETag")
+
+
+class BulkProgressTestCase(CurriculumTestMixin, APITestCase):
+    """Test marking many steps at once"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='bulk@example.com',
+            email='bulk@example.com',
+            password='TestPass123!@#',
+            role='student'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.track = self.create_track()
+        self.project = self.track.projects.get(number=1)
+        self.steps = list(self.project.steps.order_by('step_number'))
+        self.url = '/api/curriculum/progress/bulk_update/'
+
+    def item(self, step, completed=True, project=None):
+        return {'project_id': (project or self.project).id, 'step_id': step.id, 'completed': completed}
+
+    def test_bulk_update_applies_items(self):
+        """Test steps are completed and un-completed in one request"""
+        self.complete_steps(self.user, self.project, 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'items': [
+                self.item(self.steps[0], completed=False),
+                self.item(self.steps[1]),
+                self.item(self.steps[2]),
+                self.item(self.steps[2]),
+            ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(response.data['projects'][0]['completed_steps'], 2)
+        self.assertEqual(response.data['projects'][0]['progress_percentage'], 66)
+        self.assertEqual(response.data['tracks'][0]['overall_progress'], 22)
+        completed = StudentProgress.objects.filter(student=self.user, is_completed=True)
+        self.assertEqual(set(completed.values_list('step_id', flat=True)), {self.steps[1].id, self.steps[2].id})
+        self.assertLess(len(database_queries(queries)), 16)
+
+        print(f"✅ Test Passed: Bulk progress applied in {len(database_queries(queries))} queries")
+
+    def test_bulk_update_is_all_or_nothing(self):
+        """Test a step from another project rejects the whole batch"""
+        other_project = self.track.projects.get(number=2)
+
+        response = self.client.post(self.url, {'items': [
+            self.item(self.steps[0]),
+            self.item(self.steps[1], project=other_project),
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(len(response.data['invalid']), 1)
+        self.assertFalse(StudentProgress.objects.filter(student=self.user).exists())
+
+        response = self.client.post(self.url, {'items': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        print(f"✅ Test Passed: Invalid batch rejected")
+
+
+class ProgressSummaryTestCase(CurriculumTestMixin, APITestCase):
+    """Test ProjectProgressSummary stays in step with progress and steps"""
+
+    def setUp(self):
+        super().setUp()
+        self.trainer = CustomUser.objects.create_user(
+            username='summary-trainer@example.com',
+            email='summary-trainer@example.com',
+            password='TestPass123!@#',
+            role='trainer'
+        )
+        self.user = CustomUser.objects.create_user(
+            username='summary@example.com',
+            email='summary@example.com',
+            password='TestPass123!@#',
+            role='student',
+            track='DP',
+            assigned_trainer=self.trainer
+        )
+        self.track = self.create_track()
+        self.project = self.track.projects.get(number=1)
+
+    def summary(self):
+        return ProjectProgressSummary.objects.get(student=self.user, project=self.project)
+
+    def test_summary_follows_progress_rows(self):
+        """Test saves and deletes of progress rows update the counts"""
+        self.complete_steps(self.user, self.project, 3)
+        self.assertEqual((self.summary().completed_steps, self.summary().total_steps), (3, 3))
+        completed_at = self.summary().completed_at
+        self.assertIsNotNone(completed_at)
+
+        progress = StudentProgress.objects.filter(student=self.user).first()
+        progress.is_completed = False
+        progress.save()
+        self.assertEqual(self.summary().completed_steps, 2)
+        self.assertIsNone(self.summary().completed_at)
+
+        progress.delete()
+        self.assertEqual(self.summary().completed_steps, 2)
+
+        print(f"✅ Test Passed: Summary follows progress rows")
+
+    def test_summary_follows_steps(self):
+        """Test adding and removing steps changes totals"""
+        self.complete_steps(self.user, self.project, 3)
+
+        step = ProjectStep.objects.create(
+            project=self.project, step_number=4, title='Step 4', description='Step', order=4
+        )
+        self.assertEqual(self.summary().total_steps, 4)
+        self.assertIsNone(self.summary().completed_at)
+
+        step.delete()
+        self.project.steps.first().delete()
+        self.assertEqual((self.summary().completed_steps, self.summary().total_steps), (2, 2))
+        self.assertIsNotNone(self.summary().completed_at)
+
+        print(f"✅ Test Passed: Summary follows steps")
+
+    def test_bulk_update_and_trainer_dashboard(self):
+        """Test bulk updates refresh summaries and trainers see real progress"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.post('/api/curriculum/progress/bulk_update/', {'items': [
+            {'project_id': self.project.id, 'step_id': step.id} for step in self.project.steps.all()[:2]
+        ]}, format='json')
+        self.assertEqual(self.summary().completed_steps, 2)
+
+        client.force_authenticate(user=self.trainer)
+        response = client.get('/api/users/my-students/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['students'][0]['progress'], 22)
+
+        self.user.delete()
+        self.assertFalse(ProjectProgressSummary.objects.exists())
+
+        print(f"✅ Test Passed: Trainer dashboard shows summarized progress")
+
+
+class TrainerRosterTestCase(CurriculumTestMixin, APITestCase):
+    """Test the trainer's student list with progress, activity and paging"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.trainer = CustomUser.objects.create_user(
+            username='roster-trainer@example.com',
+            email='roster-trainer@example.com',
+            password='TestPass123!@#',
+            role='trainer'
+        )
+        self.client.force_authenticate(user=self.trainer)
+        self.track = self.create_track()
+        self.students = [self.add_student(i) for i in range(3)]
+        projects = list(self.track.projects.order_by('number'))
+        self.complete_steps(self.students[1], projects[0], 3)
+        self.complete_steps(self.students[2], projects[0], 3)
+        self.complete_steps(self.students[2], projects[1], 3)
+
+    def add_student(self, number):
+        return CustomUser.objects.create_user(
+            username=f'roster{number}@example.com',
+            email=f'roster{number}@example.com',
+            password='TestPass123!@#',
+            role='student',
+            track='DP',
+            assigned_trainer=self.trainer
+        )
+
+    def test_progress_and_status(self):
+        """Test progress, last activity and status come from real data"""
+        StudentProgress.objects.filter(student=self.students[1]).update(
+            updated_at=timezone.now() - timedelta(days=30)
+        )
+
+        response = self.client.get('/api/users/my-students/?ordering=-progress')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        rows = response.data['students']
+        self.assertEqual([row['email'] for row in rows], [s.email for s in reversed(self.students)])
+        self.assertEqual([row['progress'] for row in rows], [66, 33, 0])
+        self.assertEqual([row['status'] for row in rows], ['Active', 'Inactive', 'Inactive'])
+        self.assertIsNone(rows[2]['last_activity'])
+
+        print(f"✅ Test Passed: Roster progress and status computed")
+
+    def test_pagination_in_one_query(self):
+        """Test pages are served with a constant number of queries"""
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/users/my-students/?page_size=2')
+        for number in range(3, 8):
+            self.add_student(number)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/users/my-students/?page_size=2&page=2&ordering=email')
+        # The next request resets connection.queries, which `large` reads from
+        query_count = len(large)
+
+        self.assertEqual(len(small), query_count)
+        self.assertEqual(query_count, 1)
+        self.assertEqual(response.data['count'], 8)
+        self.assertEqual(response.data['num_pages'], 4)
+        self.assertEqual([row['email'] for row in response.data['students']],
+                         ['roster2@example.com', 'roster3@example.com'])
+
+        response = self.client.get('/api/users/my-students/?ordering=password')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        print(f"✅ Test Passed: Roster page served in {query_count} query")
+
+
+class ReviewQueueTestCase(CurriculumTestMixin, APITestCase):
+    """Test the trainer review queue"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.trainer = CustomUser.objects.create_user(
+            username='queue-trainer@example.com',
+            email='queue-trainer@example.com',
+            password='TestPass123!@#',
+            role='trainer'
+        )
+        self.client.force_authenticate(user=self.trainer)
+        student = CustomUser.objects.create_user(
+            username='queue@example.com', email='queue@example.com', password='TestPass123!@#',
+            role='student', assigned_trainer=self.trainer
+        )
+        outsider = CustomUser.objects.create_user(
+            username='outsider@example.com', email='outsider@example.com', password='TestPass123!@#',
+            role='student'
+        )
+        track = self.create_track()
+        self.fsd = self.create_track(code='FSD', projects=1)
+        deliverables = list(Deliverable.objects.filter(project__track=track).order_by('project__number'))
+        fsd_deliverable = Deliverable.objects.get(project__track=self.fsd)
+
+        start = timezone.now() - timedelta(days=10)
+        statuses = ['PENDING', 'PENDING', 'APPROVED', 'PENDING', 'REJECTED']
+        for day, submission_status in enumerate(statuses):
+            submission = Submission.objects.create(
+                student=student, deliverable=deliverables[day % 3], status=submission_status
+            )
+            Submission.objects.filter(pk=submission.pk).update(submitted_at=start + timedelta(days=day))
+        Submission.objects.create(student=student, deliverable=fsd_deliverable)
+        Submission.objects.create(student=outsider, deliverable=deliverables[0])
+        self.url = '/api/curriculum/submissions/review_queue/'
+
+    def test_queue_pages_by_cursor(self):
+        """Test pending submissions come oldest first across cursor pages"""
+        response = self.client.get(self.url, {'status': 'PENDING', 'track': 'DP', 'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['counts'], {'PENDING': 3, 'APPROVED': 1, 'REJECTED': 1})
+        first_page = [row['id'] for row in response.data['results']]
+        self.assertEqual(len(first_page), 2)
+
+        response = self.client.get(response.data['next'])
+        second_page = [row['id'] for row in response.data['results']]
+        self.assertEqual(len(second_page), 1)
+        self.assertIsNone(response.data['next'])
+
+        ordered = list(Submission.objects.filter(
+            status='PENDING', deliverable__project__track__code='DP', student__assigned_trainer=self.trainer
+        ).order_by('submitted_at').values_list('id', flat=True))
+        self.assertEqual(first_page + second_page, ordered)
+
+        print(f"✅ Test Passed: Review queue paged by cursor")
+
+    def test_queue_filters_and_access(self):
+        """Test project filter, bad filters and non-trainer access"""
+        project = self.fsd.projects.get()
+        response = self.client.get(self.url, {'project': project.id})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['counts']['PENDING'], 1)
+
+        self.assertEqual(self.client.get(self.url, {'status': 'LOST'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'project': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=CustomUser.objects.get(email='queue@example.com'))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        print(f"✅ Test Passed: Review queue filtered")
+
+
+class SubmissionHistoryTestCase(CurriculumTestMixin, APITestCase):
+    """Test the submission event log and review metrics"""
+
+    def setUp(self):
+        super().setUp()
+        self.trainer = CustomUser.objects.create_user(
+            username='history-trainer@example.com',
+            email='history-trainer@example.com',
+            password='TestPass123!@#',
+            role='trainer'
+        )
+        self.student = CustomUser.objects.create_user(
+            username='history@example.com', email='history@example.com', password='TestPass123!@#',
+            role='student', assigned_trainer=self.trainer
+        )
+        self.create_track(projects=1)
+        self.deliverable = Deliverable.objects.get()
+        self.trainer_client = APIClient()
+        self.trainer_client.force_authenticate(user=self.trainer)
+        self.student_client = APIClient()
+        self.student_client.force_authenticate(user=self.student)
+
+    def test_review_cycle_is_logged(self):
+        """Test submit, reject, resubmit and approve each append an event"""
+        response = self.student_client.post('/api/curriculum/submissions/', {
+            'deliverable': self.deliverable.id, 'submission_url': 'https://github.com/a/b', 'status': 'APPROVED'
+        }, format='json')
+        submission_id = response.data['id']
+        self.assertEqual(response.data['status'], 'PENDING')
+        url = f'/api/curriculum/submissions/{submission_id}/'
+
+        self.trainer_client.post(f'{url}review/', {'status': 'REJECTED', 'feedback': 'Add tests'}, format='json')
+        response = self.trainer_client.patch(url, {'submission_text': 'Sneaky'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.student_client.patch(url, {'submission_url': 'https://github.com/a/c'}, format='json')
+        self.assertEqual(response.data['status'], 'PENDING')
+        self.assertEqual(response.data['revision'], 2)
+        self.trainer_client.post(f'{url}review/', {'status': 'APPROVED'}, format='json')
+
+        response = self.student_client.get(f'{url}history/')
+        self.assertEqual(
+            [(event['kind'], event['status']) for event in response.data],
+            [('SUBMITTED', 'PENDING'), ('REVIEWED', 'REJECTED'), ('RESUBMITTED', 'PENDING'), ('REVIEWED', 'APPROVED')]
+        )
+        self.assertEqual(response.data[1]['feedback'], 'Add tests')
+        self.assertEqual(response.data[3]['revision'], 2)
+        self.assertIsNotNone(response.data[3]['wait_seconds'])
+
+        event = SubmissionEvent.objects.first()
+        event.status = 'APPROVED'
+        with self.assertRaises(ValueError):
+            event.save()
+
+        print(f"✅ Test Passed: Review cycle logged")
+
+    def test_review_metrics(self):
+        """Test turnaround is read from review events"""
+        first = Submission.objects.create(student=self.student, deliverable=self.deliverable)
+        record_submission(first, self.student)
+        second = Submission.objects.create(student=self.student, deliverable=self.deliverable)
+        record_submission(second, self.student)
+        Submission.objects.filter(pk=first.pk).update(last_submitted_at=timezone.now() - timedelta(hours=2))
+        first.refresh_from_db()
+        review_submission(first, self.trainer, 'APPROVED')
+
+        response = self.trainer_client.get('/api/curriculum/submissions/review_metrics/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['reviews'], 1)
+        self.assertEqual(response.data['approved'], 1)
+        self.assertAlmostEqual(response.data['avg_wait_seconds'], 7200, delta=5)
+        self.assertEqual(response.data['pending'], 1)
+        self.assertEqual(
+            self.student_client.get('/api/curriculum/submissions/review_metrics/').status_code,
+            status.HTTP_403_FORBIDDEN
+        )
+
+        print(f"✅ Test Passed: Review metrics from events")
+
+
+class BulkReviewTestCase(CurriculumTestMixin, APITestCase):
+    """Test reviewing many submissions in one request"""
+
+    def setUp(self):
+        super().setUp()
+        self.trainer = CustomUser.objects.create_user(
+            username='bulk-trainer@example.com',
+            email='bulk-trainer@example.com',
+            password='TestPass123!@#',
+            role='trainer'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.trainer)
+        self.create_track()
+        student = CustomUser.objects.create_user(
+            username='bulk-review@example.com', email='bulk-review@example.com', password='TestPass123!@#',
+            role='student', assigned_trainer=self.trainer
+        )
+        outsider = CustomUser.objects.create_user(
+            username='bulk-outsider@example.com', email='bulk-outsider@example.com', password='TestPass123!@#',
+            role='student'
+        )
+        self.submissions = [
+            Submission.objects.create(student=student, deliverable=deliverable)
+            for deliverable in Deliverable.objects.all()
+        ]
+        self.foreign = Submission.objects.create(student=outsider, deliverable=Deliverable.objects.first())
+        self.url = '/api/curriculum/submissions/bulk_review/'
+
+    def test_bulk_review_applies_decisions(self):
+        """Test every decision is stored and logged with a fixed number of queries"""
+        reviews = [{'id': s.id, 'status': 'APPROVED'} for s in self.submissions]
+        reviews[0] = {'id': self.submissions[0].id, 'status': 'REJECTED', 'feedback': 'Missing README'}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'reviews': reviews}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['reviewed'], 3)
+        self.submissions[0].refresh_from_db()
+        self.assertEqual(self.submissions[0].status, 'REJECTED')
+        self.assertEqual(self.submissions[0].feedback, 'Missing README')
+        self.assertEqual(self.submissions[0].reviewed_by, self.trainer)
+        self.assertEqual(Submission.objects.filter(status='APPROVED').count(), 2)
+        self.assertEqual(SubmissionEvent.objects.filter(kind='REVIEWED').count(), 3)
+        self.assertLessEqual(len(database_queries(queries)), 8)
+
+        print(f"✅ Test Passed: Bulk review applied in {len(database_queries(queries))} queries")
+
+    def test_bulk_review_rejects_foreign_submissions(self):
+        """Test a submission from another trainer's student fails the whole batch"""
+        response = self.client.post(self.url, {'reviews': [
+            {'id': self.submissions[0].id, 'status': 'APPROVED'},
+            {'id': self.foreign.id, 'status': 'APPROVED'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['missing'], [self.foreign.id])
+        self.assertFalse(Submission.objects.filter(status='APPROVED').exists())
+
+        response = self.client.post(self.url, {'reviews': [
+            {'id': self.submissions[0].id, 'status': 'PENDING'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        print(f"✅ Test Passed: Foreign submissions rejected")
@@ -1,22 +1,113 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.db.models import Count, Q
 from django.utils import timezone
 from .models import Track, Project, ProjectStep, Deliverable, StudentProgress, Submission
+from core.conditional import ConditionalGetMixin, make_etag
+from .catalog import (
+    get_cached_catalog, get_catalog_version, overlay_track_progress, overlay_project_progress
+)
+from .progress import (
+    get_progress_index, invalid_step_items, progress_fingerprint, progress_summary, set_step_progress,
+    PROGRESS_CONTEXT_KEY
+)
 from .serializers import (
     TrackSerializer, ProjectSerializer, ProjectStepSerializer,
-    DeliverableSerializer, StudentProgressSerializer, SubmissionSerializer
+    DeliverableSerializer, StudentProgressSerializer, StepProgressItemSerializer, SubmissionSerializer,
+    SubmissionEventSerializer, SubmissionReviewItemSerializer
 )
+from .reviews import record_submission, resubmit, review_metrics, review_submission, review_submissions
+
+# Upper bounds on items accepted by one bulk progress update / bulk review
+MAX_BULK_PROGRESS_ITEMS = 500
+MAX_BULK_REVIEW_ITEMS = 500
 
 
-class TrackViewSet(viewsets.ReadOnlyModelViewSet):
+class ReviewQueuePagination(CursorPagination):
+    """
+    Keyset pages over submitted_at: each page starts after the last row seen,
+    so deep pages cost the same as the first. Oldest first by default.
+    """
+    ordering = 'submitted_at'
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get('ordering') == '-submitted_at':
+            return ('-submitted_at',)
+        return (self.ordering,)
+
+
+class CatalogCacheMixin:
+    """
+    Serve list/retrieve from the versioned catalog cache and overlay the
+    requesting student's progress on the cached payload
+
+    Subclasses set progress_overlay to a function (item, progress index)
+    that fills in one serialized item's student fields.
+    """
+    catalog_name = None
+    progress_overlay = None
+    
+    def get_catalog_name(self):
+        return self.catalog_name
+    
+    def get_etag(self, request):
+        """Catalog version plus the student's progress fingerprint"""
+        return make_etag(
+            get_catalog_version(), request.user.pk, *progress_fingerprint(request.user)
+        )
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        get_progress_index(context)
+        return context
+    
+    def serialize_catalog(self, instance, many=False):
+        """Serialize without student data so the result can be shared"""
+        context = super().get_serializer_context()
+        context[PROGRESS_CONTEXT_KEY] = None
+        serializer = self.get_serializer_class()(instance, many=many, context=context)
+        return serializer.data
+    
+    def list(self, request, *args, **kwargs):
+        data = get_cached_catalog(
+            self.get_catalog_name(),
+            lambda: self.serialize_catalog(self.filter_queryset(self.get_queryset()), many=True)
+        )
+        progress = get_progress_index(self.get_serializer_context())
+        for item in data:
+            self.progress_overlay(item, progress)
+        return Response(data)
+    
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        data = get_cached_catalog(
+            f"{self.get_catalog_name()}:{lookup}",
+            lambda: self.serialize_catalog(self.get_object())
+        )
+        progress = get_progress_index(self.get_serializer_context())
+        self.progress_overlay(data, progress)
+        return Response(data)
+
+
+class TrackViewSet(ConditionalGetMixin, CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for viewing learning tracks
     """
-    queryset = Track.objects.filter(is_active=True)
+    queryset = Track.objects.filter(is_active=True).prefetch_related(
+        'projects__steps', 'projects__deliverables'
+    )
     serializer_class = TrackSerializer
     permission_classes = [IsAuthenticated]
+    catalog_name = 'tracks'
+    progress_overlay = staticmethod(overlay_track_progress)
     
     @action(detail=True, methods=['get'])
     def my_progress(self, request, pk=None):
@@ -30,13 +121,18 @@ class TrackViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for viewing projects
     """
-    queryset = Project.objects.filter(is_active=True)
+    queryset = Project.objects.filter(is_active=True).prefetch_related('steps', 'deliverables')
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
+    progress_overlay = staticmethod(overlay_project_progress)
+    
+    def get_catalog_name(self):
+        track_code = self.request.query_params.get('track', None)
+        return f"projects:{track_code or '*'}"
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -123,6 +219,40 @@ class StudentProgressViewSet(viewsets.ModelViewSet):
                 {'error': 'Progress not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update(self, request):
+        """
+        Mark many steps complete or incomplete at once.
+        Body: {"items": [{"project_id": 1, "step_id": 2, "completed": true}, ...]}
+        Nothing is applied unless every item is valid.
+        """
+        items = request.data.get('items')
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'error': 'items must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > MAX_BULK_PROGRESS_ITEMS:
+            return Response(
+                {'error': f'At most {MAX_BULK_PROGRESS_ITEMS} items per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = StepProgressItemSerializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data
+        
+        invalid = invalid_step_items(items)
+        if invalid:
+            return Response(
+                {'error': 'Step not found', 'invalid': invalid},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        updated = set_step_progress(request.user, items)
+        summary = progress_summary(request.user, {item['project_id'] for item in items})
+        return Response({'updated': updated, **summary}, status=status.HTTP_200_OK)
 
 
 class SubmissionViewSet(viewsets.ModelViewSet):
@@ -145,7 +275,68 @@ class SubmissionViewSet(viewsets.ModelViewSet):
             ).select_related('deliverable', 'reviewed_by')
     
     def perform_create(self, serializer):
-        serializer.save(student=self.request.user)
+        with transaction.atomic():
+            submission = serializer.save(student=self.request.user)
+            record_submission(submission, self.request.user)
+    
+    def perform_update(self, serializer):
+        """Students edit their own work; a reviewed submission goes back to the queue"""
+        if serializer.instance.student_id != self.request.user.id:
+            raise PermissionDenied('Only the student can change a submission')
+        with transaction.atomic():
+            submission = serializer.save()
+            if submission.status != 'PENDING':
+                resubmit(submission, self.request.user)
+    
+    @action(detail=False, methods=['get'])
+    def review_queue(self, request):
+        """
+        Trainer's submissions to review, paged by cursor.
+        Filters: status, track (code), project, deliverable.
+        `counts` gives the number per status under the other filters.
+        """
+        if request.user.role != 'trainer':
+            return Response(
+                {'error': 'Only trainers can review submissions'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        queryset = Submission.objects.filter(student__assigned_trainer=request.user)
+        params = request.query_params
+        try:
+            if params.get('track'):
+                queryset = queryset.filter(deliverable__project__track__code=params['track'])
+            if params.get('project'):
+                queryset = queryset.filter(deliverable__project_id=int(params['project']))
+            if params.get('deliverable'):
+                queryset = queryset.filter(deliverable_id=int(params['deliverable']))
+        except ValueError:
+            return Response(
+                {'error': 'project and deliverable must be ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        statuses = [choice for choice, _ in Submission.STATUS_CHOICES]
+        counts = queryset.order_by().aggregate(**{
+            choice: Count('id', filter=Q(status=choice)) for choice in statuses
+        })
+        
+        submission_status = params.get('status')
+        if submission_status:
+            if submission_status not in statuses:
+                return Response(
+                    {'error': f"Invalid status. Must be one of {', '.join(statuses)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            queryset = queryset.filter(status=submission_status)
+        
+        paginator = ReviewQueuePagination()
+        page = paginator.paginate_queryset(
+            queryset.select_related('student', 'deliverable__project', 'reviewed_by'), request, view=self
+        )
+        response = paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+        response.data['counts'] = counts
+        return response
     
     @action(detail=True, methods=['post'])
     def review(self, request, pk=None):
@@ -166,11 +357,82 @@ class SubmissionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        submission.status = new_status
-        submission.feedback = feedback
-        submission.reviewed_by = request.user
-        submission.reviewed_at = timezone.now()
-        submission.save()
+        review_submission(submission, request.user, new_status, feedback)
         
         serializer = self.get_serializer(submission)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_review(self, request):
+        """
+        Review many submissions at once.
+        Body: {"reviews": [{"id": 1, "status": "APPROVED", "feedback": "..."}, ...]}
+        Nothing is applied unless every submission belongs to the trainer's students.
+        """
+        if request.user.role != 'trainer':
+            return Response(
+                {'error': 'Only trainers can review submissions'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        reviews = request.data.get('reviews')
+        if not isinstance(reviews, list) or not reviews:
+            return Response(
+                {'error': 'reviews must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(reviews) > MAX_BULK_REVIEW_ITEMS:
+            return Response(
+                {'error': f'At most {MAX_BULK_REVIEW_ITEMS} reviews per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = SubmissionReviewItemSerializer(data=reviews, many=True)
+        serializer.is_valid(raise_exception=True)
+        # The last decision for a submission wins
+        decisions = {item['id']: item for item in serializer.validated_data}
+        
+        with transaction.atomic():
+            # Lock the submissions only, not the student rows joined by the filter
+            submissions = {
+                submission.id: submission
+                for submission in Submission.objects.select_for_update(of=('self',)).filter(
+                    id__in=decisions, student__assigned_trainer=request.user
+                )
+            }
+            missing = sorted(set(decisions) - set(submissions))
+            if missing:
+                return Response(
+                    {'error': 'Submissions not found', 'missing': missing},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            review_submissions(
+                [(submissions[id_], item['status'], item['feedback']) for id_, item in decisions.items()],
+                request.user
+            )
+        
+        return Response({
+            'reviewed': len(decisions),
+            'results': [{'id': id_, 'status': item['status']} for id_, item in decisions.items()],
+        })
+    
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """Every submission, review and resubmission of this submission, oldest first"""
+        submission = self.get_object()
+        events = submission.events.select_related('actor')
+        return Response(SubmissionEventSerializer(events, many=True).data)
+    
+    @action(detail=False, methods=['get'])
+    def review_metrics(self, request):
+        """Review turnaround for the trainer's students over the last `days` (default 30)"""
+        if request.user.role != 'trainer':
+            return Response(
+                {'error': 'Only trainers can view review metrics'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        submissions = Submission.objects.filter(student__assigned_trainer=request.user)
+        return Response(review_metrics(submissions, days=days))
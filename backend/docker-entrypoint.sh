@@ -23,7 +23,7 @@ echo "✅ Database is ready!"
 
 # Run database migrations
 echo "Running database migrations..."
-python manage.py migrate --noinput
+python manage.py migrate --noinput && python manage.py createcachetable
 
 if [ $? -eq 0 ]; then
     echo "✅ Migrations completed successfully!"
@@ -35,6 +35,10 @@ fi
 echo "Collecting static files..."
 python manage.py collectstatic --noinput || true
 
+# Pull and pin the workspace image so the first student launch is not a cold pull
+echo "Refreshing workspace image..."
+python manage.py refresh_workspace_image || echo "⚠️  Workspace image not refreshed, continuing..."
+
 echo "✅ Initialization complete!"
 echo "============================================"
 echo ""
@@ -63,12 +63,22 @@ export default function WorkspacePage() {
                   setErrorMessage("");
                   try {
                     const res = await apiClient.post("/users/workspace/create/");
-                    setWorkspaceUrl(res.data.url || ""); // Save the dynamic URL
-                    setTimeout(() => {
-                      setState("ready");
-                      const workspaceUrl = res.data.url;
-                      window.open(res.data.url, "_blank", "noopener,noreferrer");
-                    }, 3000);
+                    // Provisioning runs in the background; long-poll the job until it finishes
+                    let job = res.data;
+                    while (job.status !== "running" && job.status !== "failed") {
+                      const poll = await apiClient.get(`/users/workspace/jobs/${job.job_id}/`, {
+                        params: { wait: 20, status: job.status },
+                      });
+                      job = poll.data;
+                    }
+                    if (job.status === "failed") {
+                      setState("error");
+                      setErrorMessage(job.error?.message || job.error?.error || "Failed to provision workspace");
+                      return;
+                    }
+                    setWorkspaceUrl(job.url || ""); // Save the dynamic URL
+                    setState("ready");
+                    window.open(job.url, "_blank", "noopener,noreferrer");
                   } catch (err: any) {
                     setState("error");
                     const message = err.response?.data?.message || err.response?.data?.error || "Failed to provision workspace";
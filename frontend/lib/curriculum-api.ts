@@ -58,6 +58,27 @@ export interface StudentProgress {
   created_at: string
 }
 
+export interface StepProgressUpdate {
+  project_id: number
+  step_id: number
+  completed: boolean
+}
+
+export interface BulkProgressResult {
+  updated: number
+  projects: {
+    project_id: number
+    completed_steps: number
+    total_steps: number
+    progress_percentage: number
+    is_completed: boolean
+  }[]
+  tracks: {
+    track_id: number
+    overall_progress: number
+  }[]
+}
+
 export interface Submission {
   id: number
   deliverable: number
@@ -73,9 +94,18 @@ export interface Submission {
   reviewer_name: string | null
   reviewed_at: string | null
   submitted_at: string
+  last_submitted_at: string | null
+  revision: number
   updated_at: string
 }
 
+export interface ReviewQueuePage {
+  next: string | null
+  previous: string | null
+  results: Submission[]
+  counts: Record<'PENDING' | 'APPROVED' | 'REJECTED', number>
+}
+
 export const curriculumApi = {
   // Get all tracks with projects
   getTracks: async (): Promise<Track[]> => {
@@ -132,12 +162,37 @@ export const curriculumApi = {
     return response.data
   },
 
+  // Mark many steps complete or incomplete in one request
+  updateStepsProgress: async (items: StepProgressUpdate[]): Promise<BulkProgressResult> => {
+    const response = await apiClient.post('/curriculum/progress/bulk_update/', { items })
+    return response.data
+  },
+
   // Get submissions
   getSubmissions: async (): Promise<Submission[]> => {
     const response = await apiClient.get('/curriculum/submissions/')
     return response.data
   },
 
+  // Get a page of the trainer's review queue (pass the previous page's `next` URL as cursorUrl)
+  getReviewQueue: async (
+    filters: { status?: string; track?: string; project?: number; deliverable?: number; page_size?: number } = {},
+    cursorUrl?: string
+  ): Promise<ReviewQueuePage> => {
+    const response = cursorUrl
+      ? await apiClient.get(cursorUrl)
+      : await apiClient.get('/curriculum/submissions/review_queue/', { params: filters })
+    return response.data
+  },
+
+  // Approve or reject many submissions in one request
+  bulkReview: async (
+    reviews: { id: number; status: 'APPROVED' | 'REJECTED'; feedback?: string }[]
+  ): Promise<{ reviewed: number; results: { id: number; status: string }[] }> => {
+    const response = await apiClient.post('/curriculum/submissions/bulk_review/', { reviews })
+    return response.data
+  },
+
   // Create submission
   createSubmission: async (data: {
     deliverable: number
@@ -135,7 +135,7 @@ echo ""
 # ============================================
 echo "[5/9] Running database migrations..."
 
-docker exec apranova_backend python manage.py migrate --noinput
+docker exec apranova_backend sh -c "python manage.py migrate --noinput && python manage.py createcachetable"
 
 if [ $? -ne 0 ]; then
     echo "⚠️  Migration failed, but continuing..."